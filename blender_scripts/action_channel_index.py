@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+动作通道索引 - 一次解析动作的全部F曲线，按骨骼分组
+
+F曲线的 data_path 形如 pose.bones["Spine"].rotation_quaternion，逐条调用 find 解析并与骨骼列表比较，
+在100+骨骼、上千条曲线的骨架上是平方级开销。ActionChannelIndex 对每个动作只解析一次：
+    骨骼名 → [(属性, 分量索引, F曲线)]
+并提供骨骼覆盖率统计，供 FBXMerger 的校验/报告/过滤和渲染流程的动作列表共用。
+
+使用示例（Blender内）：
+    index = ActionChannelIndex(armature_obj.data.bones.keys())
+    for action in bpy.data.actions:
+        stats = index.coverage(action)
+        print(action.name, stats["matched_bones"], stats["coverage"])
+"""
+
+from collections import defaultdict
+
+POSE_BONE_PREFIX = 'pose.bones["'
+
+
+def parse_bone_data_path(data_path):
+    """解析 pose.bones["骨骼名"].属性 → (骨骼名, 属性)；不是骨骼通道时返回 (None, data_path)"""
+    if not data_path.startswith(POSE_BONE_PREFIX):
+        return None, data_path
+    name_end = data_path.find('"]', len(POSE_BONE_PREFIX))
+    if name_end < 0:
+        return None, data_path
+    bone_name = data_path[len(POSE_BONE_PREFIX):name_end]
+    property_name = data_path[name_end + 3:] if data_path[name_end + 2:name_end + 3] == '.' else ""
+    return bone_name, property_name
+
+
+def action_key(action):
+    """动作的缓存键：session_uid 在本次会话内不会复用；旧版本退回到 (地址, 动作名)"""
+    session_uid = getattr(action, 'session_uid', None)
+    if session_uid is not None:
+        return session_uid
+    pointer = action.as_pointer() if hasattr(action, 'as_pointer') else id(action)
+    return pointer, getattr(action, 'name', None)
+
+
+class ActionChannels:
+    """单个动作的通道表"""
+
+    __slots__ = ('bones', 'other_channels', 'fcurve_count')
+
+    def __init__(self, action):
+        self.bones = defaultdict(list)    # 骨骼名 -> [(属性, 分量索引, F曲线)]
+        self.other_channels = []          # 非骨骼通道（对象变换、自定义属性等）
+        self.fcurve_count = 0
+
+        for fcurve in action.fcurves:
+            self.fcurve_count += 1
+            bone_name, property_name = parse_bone_data_path(fcurve.data_path)
+            if bone_name is None:
+                self.other_channels.append(fcurve)
+            else:
+                self.bones[bone_name].append((property_name, fcurve.array_index, fcurve))
+
+    def bone_names(self):
+        return set(self.bones.keys())
+
+    def channel_count(self, bone_names=None):
+        """骨骼通道数量；指定 bone_names 时只统计这些骨骼"""
+        if bone_names is None:
+            return sum(len(channels) for channels in self.bones.values())
+        return sum(len(channels) for bone_name, channels in self.bones.items() if bone_name in bone_names)
+
+
+class ActionChannelIndex:
+    """多个动作的通道索引，按动作缓存解析结果"""
+
+    def __init__(self, bone_names=None):
+        self.bone_names = set(bone_names) if bone_names is not None else None
+        self.entries = {}
+
+    def set_bone_names(self, bone_names):
+        """更换目标骨骼集合（解析缓存仍然有效）"""
+        self.bone_names = set(bone_names)
+
+    def channels(self, action):
+        """动作的通道表（首次访问时解析）"""
+        key = action_key(action)
+        entry = self.entries.get(key)
+        # 曲线数量变化时重新解析（改名不影响通道）
+        if entry is None or entry.fcurve_count != len(action.fcurves):
+            entry = ActionChannels(action)
+            self.entries[key] = entry
+        return entry
+
+    def invalidate(self, action=None):
+        """动作被修改/删除后清除缓存；不传参数时清空全部"""
+        if action is None:
+            self.entries = {}
+        else:
+            self.entries.pop(action_key(action), None)
+
+    def matched_bones(self, action, bone_names=None):
+        """动作中属于目标骨骼集合的骨骼"""
+        targets = bone_names if bone_names is not None else self.bone_names
+        keyed = self.channels(action).bone_names()
+        return keyed if targets is None else keyed & set(targets)
+
+    def matched_channel_count(self, action, bone_names=None):
+        """动作中属于目标骨骼的通道数量"""
+        targets = bone_names if bone_names is not None else self.bone_names
+        return self.channels(action).channel_count(targets)
+
+    def targets_armature(self, action):
+        """动作是否包含目标骨骼的通道"""
+        return bool(self.matched_bones(action))
+
+    def coverage(self, action):
+        """骨骼覆盖率统计"""
+        entry = self.channels(action)
+        keyed = entry.bone_names()
+        stats = {
+            "action": action.name,
+            "fcurves": entry.fcurve_count,
+            "bone_channels": entry.channel_count(),
+            "other_channels": len(entry.other_channels),
+            "keyed_bones": len(keyed)
+        }
+        if self.bone_names is not None:
+            matched = keyed & self.bone_names
+            stats.update({
+                "matched_bones": len(matched),
+                "matched_channels": entry.channel_count(self.bone_names),
+                "unknown_bones": sorted(keyed - self.bone_names),
+                "unkeyed_bones": len(self.bone_names - keyed),
+                "coverage": round(len(matched) / len(self.bone_names), 3) if self.bone_names else 0.0
+            })
+        return stats
+
+    def filter_actions(self, actions):
+        """只保留包含目标骨骼通道的动作"""
+        return [action for action in actions if self.targets_armature(action)]
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Blender后台工作进程池
+
+以有界并发数运行多个 `blender -b -P 脚本 -- 参数` 子进程，每个任务的输出写入独立日志。
+不依赖bpy，可以在普通Python中使用，也可以在Blender内部调用（自动使用当前Blender可执行文件）。
+
+使用示例：
+    pool = BlenderWorkerPool(max_workers=4, log_dir="logs")
+    pool.submit("male", "fbx_merge_blender.py", ["--config", "male.json"])
+    pool.submit("female", "fbx_merge_blender.py", ["--config", "female.json"])
+    results = pool.run()
+"""
+
+import os
+import sys
+import time
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def find_blender_executable(preferred=None):
+    """查找Blender可执行文件：参数 > 环境变量 > 当前Blender进程 > PATH"""
+    candidates = [
+        preferred,
+        os.getenv('BLENDER_EXECUTABLE'),
+        os.getenv('BLENDER_PATH')
+    ]
+
+    # 在Blender内部运行时直接使用当前可执行文件
+    try:
+        import bpy
+        candidates.append(bpy.app.binary_path)
+    except ImportError:
+        pass
+
+    candidates.append(shutil.which('blender'))
+
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def default_worker_count():
+    """默认并发数：CPU核心数的一半（Blender导入/导出本身会占用多个线程）"""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+class BlenderWorkerPool:
+    """有界的Blender后台进程池"""
+
+    def __init__(self, blender_executable=None, max_workers=None, log_dir=None, timeout=None):
+        self.blender_executable = find_blender_executable(blender_executable)
+        if not self.blender_executable:
+            raise FileNotFoundError(
+                "未找到Blender可执行文件，请通过参数或环境变量 BLENDER_EXECUTABLE 指定"
+            )
+
+        self.max_workers = max(1, int(max_workers or default_worker_count()))
+        self.log_dir = log_dir
+        self.timeout = timeout  # 单个任务超时（秒），None表示不限制
+        self.jobs = []
+
+        if self.log_dir:
+            os.makedirs(self.log_dir, exist_ok=True)
+
+    def build_command(self, script_path, script_args=None, blend_file=None):
+        """构建 blender -b [文件.blend] -P 脚本 -- 参数 命令"""
+        command = [self.blender_executable, '-b']
+        if blend_file:
+            command.append(blend_file)
+        # 脚本抛出异常时返回非零退出码，便于判断失败
+        command += ['--python-exit-code', '1', '-P', os.path.abspath(script_path)]
+        if script_args:
+            command.append('--')
+            command += [str(arg) for arg in script_args]
+        return command
+
+    def submit(self, name, script_path, script_args=None, blend_file=None):
+        """添加一个任务（调用run后才会执行）"""
+        log_path = None
+        if self.log_dir:
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+            log_path = os.path.join(self.log_dir, f"{safe_name}.log")
+
+        self.jobs.append({
+            "name": name,
+            "command": self.build_command(script_path, script_args, blend_file),
+            "log_path": log_path
+        })
+
+    def run_job(self, job):
+        """执行单个任务，返回结果字典"""
+        start = time.time()
+        result = {
+            "name": job["name"],
+            "command": job["command"],
+            "log_path": job["log_path"],
+            "returncode": None,
+            "status": "failed"
+        }
+
+        log_file = open(job["log_path"], 'w', encoding='utf-8', errors='replace') if job["log_path"] else subprocess.DEVNULL
+        try:
+            completed = subprocess.run(
+                job["command"],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                timeout=self.timeout
+            )
+            result["returncode"] = completed.returncode
+            result["status"] = "ok" if completed.returncode == 0 else "failed"
+        except subprocess.TimeoutExpired:
+            result["status"] = "timeout"
+            result["error"] = f"超过 {self.timeout} 秒未完成"
+        except Exception as e:
+            result["error"] = str(e)
+        finally:
+            if job["log_path"]:
+                log_file.close()
+
+        result["seconds"] = round(time.time() - start, 3)
+        return result
+
+    def run(self, on_complete=None):
+        """并发执行所有已提交任务（最多 max_workers 个同时运行），按提交顺序返回结果
+
+        Args:
+            on_complete: 可选回调 on_complete(result, finished_count, total)
+        """
+        jobs = list(self.jobs)
+        self.jobs = []
+        if not jobs:
+            return []
+
+        print(f"🚀 启动Blender工作进程池: {len(jobs)} 个任务, 并发 {self.max_workers}")
+        print(f"  ├─ Blender: {self.blender_executable}")
+
+        results = [None] * len(jobs)
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.run_job, job): index for index, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                index = futures[future]
+                result = future.result()
+                results[index] = result
+                finished += 1
+
+                status_icon = "✓" if result["status"] == "ok" else "❌"
+                print(f"  ├─ {status_icon} [{finished}/{len(jobs)}] {result['name']} ({result['seconds']:.1f}秒)")
+                if on_complete:
+                    on_complete(result, finished, len(jobs))
+
+        failed = [r for r in results if r["status"] != "ok"]
+        print(f"  └─ 完成: {len(results) - len(failed)} 成功, {len(failed)} 失败")
+        return results
+
+
+if __name__ == "__main__":
+    print("blender_workers 是供其他脚本使用的模块，例如 fbx_batch_merge.py")
+    sys.exit(0)
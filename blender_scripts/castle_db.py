@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CastleDB 读取 - 从 .cdb 文件读取表格行
+
+不依赖bpy。武器图层渲染、武器批量生成和武器图标图集共用，
+默认读取 Unity 工程中的 Assets/StreamingAssets/Data/CastleDB/castle_db_example.cdb。
+
+使用示例：
+    from castle_db import load_weapons
+    for weapon in load_weapons():
+        print(weapon["id"], weapon["weaponType"], weapon["iconPath"])
+"""
+
+import os
+import json
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CASTLE_DB = os.path.normpath(os.path.join(
+    SCRIPT_DIR, "..", "Assets", "StreamingAssets", "Data", "CastleDB", "castle_db_example.cdb"
+))
+
+
+def resolve_castle_db(cdb_path=None):
+    """.cdb 路径：参数 > 环境变量 DEADCELLS_CASTLE_DB > 工程内默认文件；相对路径以脚本目录为基准"""
+    path = cdb_path or os.getenv('DEADCELLS_CASTLE_DB') or DEFAULT_CASTLE_DB
+    if not os.path.isabs(path):
+        path = os.path.join(SCRIPT_DIR, path)
+    return os.path.normpath(path)
+
+
+def load_sheet(sheet_name, cdb_path=None):
+    """读取指定表格的所有行（字典列表）"""
+    path = resolve_castle_db(cdb_path)
+    with open(path, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    for sheet in database.get('sheets', []):
+        if sheet.get('name') == sheet_name:
+            return list(sheet.get('lines', []))
+    raise ValueError(f"CastleDB 中没有表格 '{sheet_name}': {path}")
+
+
+def load_weapons(cdb_path=None, weapon_ids=None):
+    """读取 weapons 表；weapon_ids 非空时只返回这些武器（保持表格顺序）"""
+    weapons = load_sheet('weapons', cdb_path)
+    if weapon_ids:
+        wanted = set(weapon_ids)
+        missing = wanted - {weapon.get('id') for weapon in weapons}
+        if missing:
+            print(f"⚠ CastleDB 中没有这些武器: {', '.join(sorted(missing))}")
+        weapons = [weapon for weapon in weapons if weapon.get('id') in wanted]
+    return weapons
@@ -3,9 +3,176 @@ import os
 import json
 import sys
 import time
+import array
+import hashlib
+from contextlib import contextmanager
 from mathutils import Vector
 import math
 
+# 简化网格磁盘缓存格式版本（缓存内容变化时提高）
+RENDER_MESH_CACHE_VERSION = 2
+
+# 可选渲染后端：auto 在EEVEE可用时使用EEVEE，否则使用Workbench平面着色（避免CPU节点退化为Cycles路径追踪）
+RENDER_BACKENDS = ('auto', 'eevee', 'cycles_cpu', 'workbench_flat')
+
+# 守护进程默认spool目录名（位于 output_path 下）
+SPOOL_DIR_NAME = "_spool"
+
+# 计时报告目录名（位于 output_path 下）
+PROFILING_DIR_NAME = "_profiling"
+
+# 简化网格磁盘缓存的默认目录名（位于 output_path 下）
+MESH_CACHE_DIR_NAME = "_mesh_cache"
+
+# output_path 下不是动画帧的目录（生成精灵图集时跳过）
+NON_ANIMATION_DIRS = ("SpritesheetS", "Weapons", SPOOL_DIR_NAME, PROFILING_DIR_NAME, MESH_CACHE_DIR_NAME)
+
+
+class StageProfiler:
+    """流水线阶段计时器：嵌套阶段计时、逐帧渲染耗时统计与可选的cProfile采集"""
+    
+    def __init__(self):
+        self.cprofile = None
+        self.reset()
+    
+    def reset(self):
+        """清空所有计时数据（守护进程每个任务调用一次）"""
+        self.stage_stack = []
+        self.stage_timings = {}      # 阶段路径 -> [耗时秒]
+        self.frame_timings = {}      # 动画名 -> [每帧渲染耗时秒]
+        self.animation_metrics = {}  # 动画名 -> {指标名: 秒}
+        self.run_started = time.time()
+        self.run_perf_start = time.perf_counter()
+        
+        # cProfile也按任务重新采集，每份 .prof 只包含本任务
+        if self.cprofile is not None:
+            import cProfile
+            self.cprofile.disable()
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+    
+    @contextmanager
+    def stage(self, name):
+        """计时一个阶段，嵌套调用时以 父/子 路径记录"""
+        self.stage_stack.append(name)
+        path = "/".join(self.stage_stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_stack.pop()
+            self.stage_timings.setdefault(path, []).append(elapsed)
+    
+    def record_frame(self, animation_name, seconds):
+        """记录单帧渲染耗时"""
+        self.frame_timings.setdefault(animation_name, []).append(seconds)
+    
+    def record_animation_metric(self, animation_name, metric, seconds):
+        """记录动画级别的单项耗时（如边界采样）"""
+        metrics = self.animation_metrics.setdefault(animation_name, {})
+        metrics[metric] = metrics.get(metric, 0.0) + seconds
+    
+    def enable_cprofile(self):
+        """开启cProfile采集（--profile）"""
+        import cProfile
+        if self.cprofile is None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+            print("🔬 已开启cProfile采集")
+    
+    @staticmethod
+    def percentile(values, q):
+        """线性插值百分位数（q取0-100）"""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        if len(ordered) == 1:
+            return ordered[0]
+        rank = (len(ordered) - 1) * q / 100.0
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+    
+    def summarize(self, values):
+        """计算一组耗时的统计摘要（单位：毫秒）"""
+        total = sum(values)
+        return {
+            "count": len(values),
+            "total_ms": round(total * 1000, 3),
+            "mean_ms": round(total / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(self.percentile(values, 50) * 1000, 3),
+            "p90_ms": round(self.percentile(values, 90) * 1000, 3),
+            "p99_ms": round(self.percentile(values, 99) * 1000, 3),
+            "max_ms": round(max(values) * 1000, 3) if values else 0.0
+        }
+    
+    def build_report(self, extra=None):
+        """生成机器可读的计时报告字典"""
+        wall_seconds = time.perf_counter() - self.run_perf_start
+        
+        animations = {}
+        for name, frame_times in self.frame_timings.items():
+            summary = self.summarize(frame_times)
+            render_seconds = sum(frame_times)
+            summary["frames_per_second"] = round(len(frame_times) / render_seconds, 3) if render_seconds > 0 else 0.0
+            for metric, seconds in self.animation_metrics.get(name, {}).items():
+                summary[f"{metric}_ms"] = round(seconds * 1000, 3)
+            animations[name] = summary
+        
+        report = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.run_started)),
+            "wall_seconds": round(wall_seconds, 3),
+            "blender_version": bpy.app.version_string,
+            "stages": {path: self.summarize(times) for path, times in self.stage_timings.items()},
+            "animations": animations
+        }
+        if extra:
+            report.update(extra)
+        return report
+    
+    def write_report(self, output_dir, extra=None):
+        """写出JSON计时报告（以及cProfile统计），返回报告路径"""
+        profile_dir = os.path.join(output_dir, PROFILING_DIR_NAME)
+        os.makedirs(profile_dir, exist_ok=True)
+        
+        # 文件名包含毫秒和任务ID，同一秒内完成的守护进程任务不会互相覆盖
+        milliseconds = int((self.run_started % 1) * 1000)
+        stamp = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.run_started))}_{milliseconds:03d}"
+        job_id = (extra or {}).get('job_id')
+        if job_id:
+            stamp += "_" + "".join(c if c.isalnum() or c in "-_" else "_" for c in str(job_id))
+        base_stamp, counter = stamp, 1
+        while os.path.exists(os.path.join(profile_dir, f"profile_report_{stamp}.json")):
+            stamp = f"{base_stamp}_{counter}"
+            counter += 1
+        
+        report = self.build_report(extra)
+        
+        if self.cprofile is not None:
+            import pstats
+            import io
+            self.cprofile.disable()
+            prof_path = os.path.join(profile_dir, f"profile_{stamp}.prof")
+            self.cprofile.dump_stats(prof_path)
+            
+            stream = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=stream)
+            stats.sort_stats('cumulative').print_stats(30)
+            report["cprofile"] = {
+                "stats_file": prof_path,
+                "top_cumulative": stream.getvalue().splitlines()
+            }
+            self.cprofile.enable()
+        
+        report_path = os.path.join(profile_dir, f"profile_report_{stamp}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        
+        print(f"📊 计时报告已生成: {report_path}")
+        return report_path
+
+
 class DeadCellsRenderPipeline:
     """死亡细胞风格角色渲染流水线"""
     
@@ -14,6 +181,10 @@ class DeadCellsRenderPipeline:
         self.script_dir = self.detect_script_directory()
         print(f"检测到的脚本目录: {self.script_dir}")
         
+        # 同目录辅助模块（fbx_inspector、action_channel_index 等）
+        if self.script_dir not in sys.path:
+            sys.path.append(self.script_dir)
+        
         # 加载配置并设置路径
         self.load_config_and_setup()
         
@@ -129,14 +300,33 @@ class DeadCellsRenderPipeline:
         self.render_mesh = None    # 渲染用低精度网格
         self.smart_camera = None   # 智能相机对象
         
+        # 简化网格缓存：(源网格几何哈希, 简化比例) -> 带伪用户的网格数据（守护进程跨任务复用）
+        self.decimated_mesh_cache = {}
+        
+        # 武器图层（weapon_layers.enabled 时在渲染动画前创建）
+        self.weapon_layers = None
+        
         # 超时控制
         self.start_time = time.time()
         self.timeout_seconds = 10 * 60  # 10分钟
         self.timeout_warned = False
         self.should_abort = False
         
-        # 检测EEVEE版本（在配置加载完成后）
-        self.eevee_engine = self.detect_eevee_engine()
+        # 逐帧渲染回调 callback(animation_name, frame, start_frame, end_frame)
+        self.frame_callback = None
+        
+        # 阶段计时（--profile 时额外采集cProfile）
+        self.profiler = StageProfiler()
+        if '--profile' in sys.argv:
+            self.profiler.enable_cprofile()
+        
+        # 渲染后端（在配置加载完成后解析）；eevee_engine 保存后端实际使用的引擎标识
+        self.render_backend = None
+        self.eevee_engine = None
+        self.post_process_enabled = False
+        self.post_process_palette_image = None
+        self.material_color_types = set()
+        self.set_render_backend(self.resolve_render_backend())
     
     def detect_eevee_engine(self):
         """检测可用的EEVEE渲染引擎版本"""
@@ -150,6 +340,9 @@ class DeadCellsRenderPipeline:
             if 'BLENDER_EEVEE_NEXT' in available_engines:
                 print("✓ 检测到 BLENDER_EEVEE_NEXT")
                 return 'BLENDER_EEVEE_NEXT'
+            elif 'BLENDER_EEVEE' in available_engines:
+                print("✓ 检测到 BLENDER_EEVEE")
+                return 'BLENDER_EEVEE'
             elif 'EEVEE' in available_engines:
                 print("✓ 检测到 EEVEE")
                 return 'EEVEE'
@@ -187,13 +380,78 @@ class DeadCellsRenderPipeline:
         if hasattr(scene, 'eevee') and self.eevee_engine == 'BLENDER_EEVEE_NEXT':
             return scene.eevee
         # 尝试旧版本的EEVEE设置
-        elif hasattr(scene, 'eevee') and self.eevee_engine == 'EEVEE':
+        elif hasattr(scene, 'eevee') and self.eevee_engine in ('BLENDER_EEVEE', 'EEVEE'):
             return scene.eevee
         # 如果都不可用，返回None（使用Cycles等其他引擎）
         else:
             print("⚠ EEVEE设置不可用，跳过EEVEE特定配置")
             return None
     
+    def resolve_render_backend(self):
+        """解析渲染后端：命令行 > 环境变量 > 配置文件 > auto"""
+        # 1. 命令行参数
+        for i, arg in enumerate(sys.argv):
+            if arg == '--render-backend' and i + 1 < len(sys.argv):
+                print(f"使用命令行渲染后端: {sys.argv[i + 1]}")
+                return sys.argv[i + 1]
+        
+        # 2. 环境变量
+        env_backend = os.getenv('DEADCELLS_RENDER_BACKEND')
+        if env_backend:
+            print(f"使用环境变量渲染后端: {env_backend}")
+            return env_backend
+        
+        # 3. 配置文件
+        return self.config.get('render_settings', {}).get('render_backend', 'auto')
+    
+    def set_render_backend(self, backend):
+        """切换渲染后端并确定对应的渲染引擎（守护进程可按任务切换）"""
+        backend = (backend or 'auto').lower()
+        if backend not in RENDER_BACKENDS:
+            print(f"⚠ 未知渲染后端 '{backend}'，可选: {', '.join(RENDER_BACKENDS)}，使用 auto")
+            backend = 'auto'
+        
+        if backend == 'auto':
+            engine = self.detect_eevee_engine()
+            if engine in ('BLENDER_EEVEE_NEXT', 'BLENDER_EEVEE', 'EEVEE'):
+                backend = 'eevee'
+            else:
+                print("💡 EEVEE不可用，自动使用Workbench平面着色后端（替代Cycles路径追踪）")
+                backend = 'workbench_flat'
+                engine = 'BLENDER_WORKBENCH'
+        elif backend == 'eevee':
+            engine = self.detect_eevee_engine()
+        elif backend == 'cycles_cpu':
+            engine = 'CYCLES'
+        else:
+            engine = 'BLENDER_WORKBENCH'
+        
+        self.render_backend = backend
+        self.eevee_engine = engine
+        self.post_process_enabled = self.should_post_process()
+        print(f"✓ 渲染后端: {backend} ({engine}){' + 后处理' if self.post_process_enabled else ''}")
+        return backend
+    
+    def get_post_process_config(self):
+        """获取帧后处理配置（调色板量化 + 描边）"""
+        defaults = {
+            "backends": ["workbench_flat"],
+            "palette_quantize": True,
+            "outline": True,
+            "outline_width": 1,
+            "outline_color": [0.05, 0.04, 0.06, 1.0],
+            "alpha_threshold": 0.5
+        }
+        defaults.update(self.config.get('render_settings', {}).get('post_process', {}))
+        return defaults
+    
+    def should_post_process(self):
+        """当前后端是否需要帧后处理"""
+        post_config = self.get_post_process_config()
+        if self.render_backend not in post_config['backends']:
+            return False
+        return bool(post_config['palette_quantize'] or post_config['outline'])
+    
     def load_config(self, config_path):
         """加载JSON配置文件"""
         try:
@@ -223,7 +481,20 @@ class DeadCellsRenderPipeline:
             "character_name": "DeadCellsCharacter",
             "render_settings": {
                 "resolution": [256, 256],
-                "frame_rate": 12
+                "frame_rate": 12,
+                "render_backend": "auto",  # auto | eevee | cycles_cpu | workbench_flat
+                "cycles_samples": 8,
+                "workbench": {
+                    "lighting": "STUDIO"   # STUDIO由后处理量化为色阶，FLAT为纯色
+                },
+                "post_process": {
+                    "backends": ["workbench_flat"],
+                    "palette_quantize": True,
+                    "outline": True,
+                    "outline_width": 1,
+                    "outline_color": [0.05, 0.04, 0.06, 1.0],
+                    "alpha_threshold": 0.5
+                }
             },
             "dead_cells_colors": {
                 "skin": [0.8, 0.6, 0.4, 1.0],
@@ -250,7 +521,33 @@ class DeadCellsRenderPipeline:
                 "per_animation_adjustment": True,
                 "clip_start": 0.01,
                 "clip_end_multiplier": 10.0,
-                "min_clip_end": 100.0
+                "min_clip_end": 100.0,
+                "render_border": {
+                    "enabled": True,      # 逐帧只渲染角色所在区域
+                    "margin_pixels": 4,
+                    "crop": False         # True时输出裁剪帧并还原为完整画布
+                }
+            },
+            "daemon": {
+                "spool_dir": "",       # 为空时使用 output_path/_spool
+                "poll_interval": 1.0   # 轮询任务目录的间隔（秒）
+            },
+            "render_optimization": {
+                "decimate_mode": "adaptive",   # adaptive 按屏幕像素计算简化比例 | fixed 固定比例
+                "decimate_ratio": 0.3,         # fixed 模式的保留面数比例
+                "triangles_per_pixel": 0.5,    # adaptive 模式下角色投影每像素保留的三角形数
+                "min_ratio": 0.05,
+                "max_ratio": 1.0,
+                "cache_entries": 8,            # 内存中缓存的简化网格数量
+                "disk_cache": True,            # 简化网格写入 .blend 缓存，之后的运行直接链接
+                "disk_cache_dir": ""           # 为空时使用 output_path/_mesh_cache（或环境变量 DEADCELLS_MESH_CACHE）
+            },
+            "weapon_layers": {
+                "enabled": False,      # 角色和武器分开渲染，导出每帧手部挂点数据（output_path/Weapons）
+                "castle_db": "",       # 为空时使用工程内的 castle_db_example.cdb（或环境变量 DEADCELLS_CASTLE_DB）
+                "attach_bone": "",     # 为空时自动查找右手骨骼
+                "weapon_ids": [],      # 为空时渲染 weapons 表中的全部武器
+                "weapon_scale": 0.25
             }
         }
         
@@ -295,9 +592,37 @@ class DeadCellsRenderPipeline:
         except Exception as e:
             print(f"❌ 无法创建输出目录: {e}")
             return False
-            
+        
+        self.print_fbx_preview()
         return True
     
+    def print_fbx_preview(self):
+        """导入前用二进制FBX检查器预读动画片段、骨骼和网格（不可用时静默跳过）"""
+        try:
+            import fbx_inspector
+        except ImportError:
+            return
+        
+        info = fbx_inspector.inspect_fbx(self.fbx_path)
+        if info.get("error"):
+            print(f"⚠ FBX预读失败（不影响导入）: {info['error']}")
+            return
+        
+        stacks = info["animation_stacks"]
+        print(f"📄 FBX预读: 版本 {info['version']}, 帧率 {info['frame_rate']}")
+        print(f"  ├─ 动画片段: {len(stacks)} 个")
+        for stack in stacks[:5]:
+            if "start_frame" in stack:
+                print(f"  │   - {stack['name']}: {stack['start_frame']:g}-{stack['end_frame']:g} 帧")
+            else:
+                print(f"  │   - {stack['name']}")
+        if len(stacks) > 5:
+            print(f"  │   ... 还有 {len(stacks) - 5} 个")
+        print(f"  ├─ 骨骼: {info['bone_count']} 个")
+        print(f"  └─ 网格: {info['mesh_count']} 个, 共 {sum(mesh['vertices'] for mesh in info['meshes'])} 顶点")
+        if not stacks:
+            print("⚠ FBX中没有动画片段，渲染阶段将没有可用动画")
+    
     def find_armature(self):
         """查找骨骼对象"""
         for obj in bpy.context.scene.objects:
@@ -562,11 +887,15 @@ class DeadCellsRenderPipeline:
     
     def clear_scene(self):
         """清理场景"""
-        if bpy.context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete(use_global=False)
+        try:
+            # 直接删除数据块，守护进程/批处理中不会累积网格、动作和图像
+            from scene_reset import reset_scene
+            reset_scene(keep_types={'materials'})
+        except ImportError:
+            if bpy.context.mode != 'OBJECT':
+                bpy.ops.object.mode_set(mode='OBJECT')
+            bpy.ops.object.select_all(action='SELECT')
+            bpy.ops.object.delete(use_global=False)
         
         # 安全清理材质（只清理项目相关材质，避免删除库材质）
         self.safe_clear_materials()
@@ -576,6 +905,10 @@ class DeadCellsRenderPipeline:
         self.original_mesh = None
         self.render_mesh = None
         self.smart_camera = None
+        
+        # 材质随场景重建，后处理调色板需重新生成
+        self.material_color_types = set()
+        self.post_process_palette_image = None
     
     def safe_clear_materials(self, prefix_filters=None):
         """安全清理材质，避免删除外部库材质
@@ -835,14 +1168,12 @@ class DeadCellsRenderPipeline:
                     print(f"  ├─ 从场景找到骨骼: {self.armature.name}")
                     self.ensure_armature_modifier_points_to(render_mesh, self.armature)
         
-        # 5. 添加Decimate修改器到渲染副本（会被放置在Armature之后）
-        decimate = render_mesh.modifiers.new("RenderDecimate", 'DECIMATE')
-        decimate.ratio = 0.3  # 保留30%的面数
-        decimate.use_collapse_triangulate = True  # 更好的三角化
-        
-        # 6. 设置为活动对象并应用Decimate
-        bpy.context.view_layer.objects.active = render_mesh
-        bpy.ops.object.modifier_apply(modifier="RenderDecimate")
+        # 5-6. 按屏幕尺寸简化渲染副本（相同源网格和比例直接复用缓存）
+        ratio = self.compute_decimate_ratio(original_mesh)
+        if ratio < 1.0:
+            self.decimate_render_mesh(original_mesh, render_mesh, ratio)
+        else:
+            print("  ├─ 角色在画面中足够大，不简化网格")
         
         # 7. 隐藏原始网格，显示渲染网格
         original_mesh.hide_viewport = True
@@ -856,6 +1187,236 @@ class DeadCellsRenderPipeline:
         
         return render_mesh
     
+    def get_render_optimization_config(self):
+        """渲染网格简化设置（缺省值与默认配置一致）"""
+        defaults = {
+            "decimate_mode": "adaptive",
+            "decimate_ratio": 0.3,
+            "triangles_per_pixel": 0.5,
+            "min_ratio": 0.05,
+            "max_ratio": 1.0,
+            "cache_entries": 8,
+            "disk_cache": True,
+            "disk_cache_dir": ""
+        }
+        defaults.update(self.config.get('render_optimization', {}))
+        return defaults
+    
+    def compute_decimate_ratio(self, original_mesh):
+        """简化比例：fixed 使用固定值；adaptive 按角色在最终画面中的投影像素数 × 每像素三角形数计算"""
+        config = self.get_render_optimization_config()
+        if config['decimate_mode'] != 'adaptive':
+            return float(config['decimate_ratio'])
+        
+        triangles = self.triangle_count(original_mesh.data)
+        if triangles == 0:
+            return 1.0
+        
+        # 相机尚未创建，按相同规则从静态边界估算正交缩放（动画通常更大，估算偏保守）
+        bounds = self.calculate_character_bounds(original_mesh)
+        ortho_scale = self.compute_ortho_scale(bounds)
+        resolution_x, resolution_y = self.render_resolution
+        pixel_size = ortho_scale / max(resolution_x, resolution_y)
+        
+        # 侧视相机沿X轴观察，画面上是 深度(Y) × 高度(Z)
+        projected_pixels = min(
+            (bounds['depth'] / pixel_size) * (bounds['height'] / pixel_size),
+            resolution_x * resolution_y
+        )
+        target_triangles = projected_pixels * float(config['triangles_per_pixel'])
+        ratio = max(float(config['min_ratio']), min(float(config['max_ratio']), target_triangles / triangles))
+        # 取两位小数，缓存键稳定
+        ratio = round(ratio, 2)
+        
+        print(f"  ├─ 自适应简化: 投影约 {projected_pixels:.0f} 像素, 目标 {target_triangles:.0f} / {triangles} 三角形 → 比例 {ratio:.2f}")
+        return ratio
+    
+    def triangle_count(self, mesh_data):
+        """网格三角化后的三角形数"""
+        loop_totals = array.array('i', [0]) * len(mesh_data.polygons)
+        mesh_data.polygons.foreach_get('loop_total', loop_totals)
+        return sum(total - 2 for total in loop_totals)
+    
+    def mesh_geometry_hash(self, mesh_obj):
+        """源网格哈希：简化结果保存的全部数据（顶点坐标、面拓扑、材质索引、顶点组名和权重、UV、形状键）
+        
+        只改蒙皮权重或UV、几何不变的FBX也会得到新的哈希，不会读取到过期的缓存网格。
+        """
+        mesh_data = mesh_obj.data
+        coordinates = array.array('f', [0.0]) * (len(mesh_data.vertices) * 3)
+        mesh_data.vertices.foreach_get('co', coordinates)
+        loop_vertices = array.array('i', [0]) * len(mesh_data.loops)
+        mesh_data.loops.foreach_get('vertex_index', loop_vertices)
+        loop_totals = array.array('i', [0]) * len(mesh_data.polygons)
+        mesh_data.polygons.foreach_get('loop_total', loop_totals)
+        
+        material_indices = array.array('i', [0]) * len(mesh_data.polygons)
+        mesh_data.polygons.foreach_get('material_index', material_indices)
+        
+        digest = hashlib.sha1()
+        digest.update(coordinates.tobytes())
+        digest.update(loop_vertices.tobytes())
+        digest.update(loop_totals.tobytes())
+        digest.update(material_indices.tobytes())
+        digest.update("|".join(group.name for group in mesh_obj.vertex_groups).encode('utf-8'))
+        
+        # 蒙皮权重：(顶点, 顶点组, 权重)
+        weight_groups = array.array('i')
+        weight_values = array.array('f')
+        for vertex in mesh_data.vertices:
+            for element in vertex.groups:
+                weight_groups.append(vertex.index)
+                weight_groups.append(element.group)
+                weight_values.append(element.weight)
+        digest.update(weight_groups.tobytes())
+        digest.update(weight_values.tobytes())
+        
+        for uv_layer in mesh_data.uv_layers:
+            uvs = array.array('f', [0.0]) * (len(uv_layer.data) * 2)
+            uv_layer.data.foreach_get('uv', uvs)
+            digest.update(uv_layer.name.encode('utf-8'))
+            digest.update(uvs.tobytes())
+        
+        if mesh_data.shape_keys:
+            for key_block in mesh_data.shape_keys.key_blocks:
+                shape_coordinates = array.array('f', [0.0]) * (len(key_block.data) * 3)
+                key_block.data.foreach_get('co', shape_coordinates)
+                digest.update(key_block.name.encode('utf-8'))
+                digest.update(shape_coordinates.tobytes())
+        return digest.hexdigest()
+    
+    def decimate_render_mesh(self, original_mesh, render_mesh, ratio):
+        """简化渲染副本；命中缓存（内存 → 磁盘）时直接复制已简化的网格数据"""
+        geometry_hash = self.mesh_geometry_hash(original_mesh)
+        cache_key = (geometry_hash, ratio)
+        
+        master = self.get_memory_cached_mesh(cache_key)
+        source = "内存"
+        if master is None:
+            master = self.load_disk_cached_mesh(geometry_hash, ratio)
+            source = "磁盘"
+            if master is not None:
+                self.remember_decimated_mesh(cache_key, master)
+        
+        if master is not None:
+            self.assign_cached_mesh(render_mesh, master, original_mesh)
+            print(f"  ├─ ✓ 复用简化网格缓存（{source}）: {master.name}")
+            return
+        
+        # Decimate修改器会被放置在Armature之后
+        decimate = render_mesh.modifiers.new("RenderDecimate", 'DECIMATE')
+        decimate.ratio = ratio
+        decimate.use_collapse_triangulate = True  # 更好的三角化
+        
+        # 设置为活动对象并应用Decimate
+        bpy.context.view_layer.objects.active = render_mesh
+        with self.profiler.stage("decimate"):
+            bpy.ops.object.modifier_apply(modifier="RenderDecimate")
+        
+        # 保存一份带伪用户的副本，场景清理时保留
+        master = render_mesh.data.copy()
+        master.name = f"{original_mesh.name}_Decimated_{ratio:.2f}"
+        master.use_fake_user = True
+        self.remember_decimated_mesh(cache_key, master)
+        self.write_disk_cached_mesh(geometry_hash, ratio, master)
+    
+    def get_memory_cached_mesh(self, cache_key):
+        """内存缓存中的简化网格；已被删除时清除该条目"""
+        master = self.decimated_mesh_cache.get(cache_key)
+        if master is None:
+            return None
+        try:
+            master.name  # 访问已删除的数据块会抛出 ReferenceError
+            return master
+        except ReferenceError:
+            # 缓存的网格已被删除（例如场景用模板重新加载）
+            self.decimated_mesh_cache.pop(cache_key, None)
+            return None
+    
+    def remember_decimated_mesh(self, cache_key, master):
+        """加入内存缓存，超过缓存数量时删除最早的条目"""
+        self.decimated_mesh_cache[cache_key] = master
+        max_entries = max(1, int(self.get_render_optimization_config()['cache_entries']))
+        while len(self.decimated_mesh_cache) > max_entries:
+            oldest_key = next(iter(self.decimated_mesh_cache))
+            oldest = self.decimated_mesh_cache.pop(oldest_key)
+            try:
+                bpy.data.meshes.remove(oldest)
+            except ReferenceError:
+                pass
+    
+    def assign_cached_mesh(self, render_mesh, master, original_mesh):
+        """把缓存网格的本地副本设为渲染副本的数据，材质槽沿用原始网格"""
+        old_data = render_mesh.data
+        render_mesh.data = master.copy()
+        bpy.data.meshes.remove(old_data)
+        
+        materials = render_mesh.data.materials
+        for index, material in enumerate(original_mesh.data.materials):
+            if index < len(materials):
+                materials[index] = material
+            else:
+                materials.append(material)
+    
+    def get_disk_cache_path(self, geometry_hash, ratio):
+        """磁盘缓存文件路径：源网格几何哈希 + 简化设置哈希；未启用时返回None"""
+        config = self.get_render_optimization_config()
+        if not config.get('disk_cache', True):
+            return None
+        cache_dir = os.getenv('DEADCELLS_MESH_CACHE') or config.get('disk_cache_dir') or os.path.join(self.output_path, MESH_CACHE_DIR_NAME)
+        
+        # 简化算法随Blender版本变化，版本号计入设置
+        settings = json.dumps({
+            "version": RENDER_MESH_CACHE_VERSION,
+            "blender": bpy.app.version[:2],
+            "mode": "COLLAPSE",
+            "triangulate": True,
+            "ratio": ratio
+        }, sort_keys=True)
+        settings_hash = hashlib.sha1(settings.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(cache_dir, f"{geometry_hash[:20]}_{settings_hash}.blend")
+    
+    def load_disk_cached_mesh(self, geometry_hash, ratio):
+        """从磁盘缓存链接简化网格（只读，由 assign_cached_mesh 复制为本地数据）"""
+        cache_path = self.get_disk_cache_path(geometry_hash, ratio)
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        
+        mesh_name = "RenderCache_" + os.path.splitext(os.path.basename(cache_path))[0]
+        try:
+            with bpy.data.libraries.load(cache_path, link=True) as (data_from, data_to):
+                if mesh_name not in data_from.meshes:
+                    return None
+                data_to.meshes = [mesh_name]
+        except (OSError, RuntimeError) as e:
+            print(f"  ├─ ⚠ 读取简化网格缓存失败: {e}")
+            return None
+        return data_to.meshes[0]
+    
+    def write_disk_cached_mesh(self, geometry_hash, ratio, master):
+        """把简化网格写入磁盘缓存（只保存几何，材质槽置空）"""
+        cache_path = self.get_disk_cache_path(geometry_hash, ratio)
+        if not cache_path:
+            return
+        
+        geometry_only = master.copy()
+        geometry_only.name = "RenderCache_" + os.path.splitext(os.path.basename(cache_path))[0]
+        for index in range(len(geometry_only.materials)):
+            geometry_only.materials[index] = None
+        
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            bpy.data.libraries.write(temp_path, {geometry_only}, fake_user=True)
+            os.replace(temp_path, cache_path)
+            print(f"  ├─ 简化网格已写入缓存: {os.path.basename(cache_path)}")
+        except (OSError, RuntimeError) as e:
+            print(f"  ├─ ⚠ 写入简化网格缓存失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            bpy.data.meshes.remove(geometry_only)
+    
     def optimize_character_mesh(self, character_mesh):
         """优化角色网格 - 使用安全的副本方式"""
         if not character_mesh:
@@ -914,6 +1475,10 @@ class DeadCellsRenderPipeline:
         
         # 设置Dead Cells调色板颜色
         palette = self.dead_cells_palette[color_type]
+        self.material_color_types.add(color_type)
+        
+        # Workbench后端只使用视口颜色
+        material.diffuse_color = palette['mid']
         
         # 3色映射：暗 → 中 → 亮
         palette_positions = [0.0, 0.5, 1.0]
@@ -1939,6 +2504,17 @@ class DeadCellsRenderPipeline:
         print("  blender -b -P character_DeadCellTest.py -- --render-limit 10")
         print("  blender -b -P character_DeadCellTest.py -- --render-limit -1  # 渲染全部")
         print()
+        print("守护进程模式（常驻后台，监听spool目录中的任务文件）:")
+        print("  blender -b -P character_DeadCellTest.py -- --daemon")
+        print("  blender -b -P character_DeadCellTest.py -- --daemon --spool-dir D:\\render_spool")
+        print()
+        print("渲染后端（auto | eevee | cycles_cpu | workbench_flat）:")
+        print("  blender -b -P character_DeadCellTest.py -- --render-backend workbench_flat")
+        print("  DEADCELLS_RENDER_BACKEND=workbench_flat blender -b -P character_DeadCellTest.py")
+        print()
+        print("性能分析（计时报告始终写入 output_path/_profiling，--profile 额外采集cProfile）:")
+        print("  blender -b -P character_DeadCellTest.py -- --auto-render --profile")
+        print()
         print("配置文件:")
         print('  在config.json中设置 "automation": {"auto_render": true}')
         print('  设置 "render_limit": -1 表示渲染全部动画')
@@ -2077,8 +2653,6 @@ class DeadCellsRenderPipeline:
         """根据边界框配置相机位置和参数"""
         config = self.config.get('camera_settings', {})
         margin_ratio = config.get('margin_ratio', 0.15)
-        min_ortho_scale = config.get('min_ortho_scale', 0.5)
-        max_ortho_scale = config.get('max_ortho_scale', 15.0)
         
         # 计算相机位置（侧视图）
         # 对于正交相机，距离不影响画面，但影响裁剪面
@@ -2111,9 +2685,7 @@ class DeadCellsRenderPipeline:
         # 计算正交缩放
         # 需要包含角色的宽度和高度，取较大值
         required_scale = max(bounds['width'], bounds['height']) * (1 + margin_ratio)
-        
-        # 应用限制
-        ortho_scale = max(min_ortho_scale, min(max_ortho_scale, required_scale))
+        ortho_scale = self.compute_ortho_scale(bounds)
         camera.data.ortho_scale = ortho_scale
         
         print(f"  ├─ 相机位置: ({camera_x:.2f}, {camera_y:.2f}, {camera_z:.2f})")
@@ -2121,6 +2693,16 @@ class DeadCellsRenderPipeline:
         print(f"  ├─ 裁剪面: {camera.data.clip_start:.2f} ~ {camera.data.clip_end:.1f}")
         print(f"  ├─ 边距比例: {margin_ratio*100:.1f}%")
     
+    def compute_ortho_scale(self, bounds):
+        """按边界框计算正交缩放（包含宽度和高度的较大值 + 边距，并应用上下限）"""
+        config = self.config.get('camera_settings', {})
+        margin_ratio = config.get('margin_ratio', 0.15)
+        min_ortho_scale = config.get('min_ortho_scale', 0.5)
+        max_ortho_scale = config.get('max_ortho_scale', 15.0)
+        
+        required_scale = max(bounds['width'], bounds['height']) * (1 + margin_ratio)
+        return max(min_ortho_scale, min(max_ortho_scale, required_scale))
+    
     def update_camera_for_action(self, action):
         """为指定动作更新相机设置（安全版本：直接使用action对象）"""
         if not self.smart_camera:
@@ -2149,6 +2731,97 @@ class DeadCellsRenderPipeline:
         print(f"  ✓ 相机已更新适配动画: {action.name}")
         return True
     
+    def get_render_border_config(self):
+        """获取逐帧渲染区域裁剪配置"""
+        border_config = {
+            "enabled": True,
+            "margin_pixels": 4,   # 投影边界外扩像素，覆盖描边和取整误差
+            "crop": False         # True时输出裁剪后的帧并由PIL还原为完整画布
+        }
+        border_config.update(self.config.get('camera_settings', {}).get('render_border', {}))
+        return border_config
+    
+    def calculate_frame_screen_rect(self, mesh):
+        """把当前帧已评估网格的包围盒投影到相机空间，返回像素矩形 (min_x, min_y, max_x, max_y)，原点在左下角"""
+        from bpy_extras.object_utils import world_to_camera_view
+        
+        scene = bpy.context.scene
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        evaluated_obj = mesh.evaluated_get(depsgraph)
+        
+        # 已评估对象的包围盒已包含骨骼变形，无需遍历顶点
+        world_matrix = evaluated_obj.matrix_world
+        projected = [
+            world_to_camera_view(scene, scene.camera, world_matrix @ Vector(corner))
+            for corner in evaluated_obj.bound_box
+        ]
+        
+        scale = scene.render.resolution_percentage / 100.0
+        res_x = int(scene.render.resolution_x * scale)
+        res_y = int(scene.render.resolution_y * scale)
+        
+        min_x = math.floor(min(p.x for p in projected) * res_x)
+        max_x = math.ceil(max(p.x for p in projected) * res_x)
+        min_y = math.floor(min(p.y for p in projected) * res_y)
+        max_y = math.ceil(max(p.y for p in projected) * res_y)
+        return min_x, min_y, max_x, max_y, res_x, res_y
+    
+    def apply_frame_render_border(self, mesh, border_config):
+        """根据当前帧边界设置 render.use_border，返回像素矩形；无法裁剪时渲染整帧并返回None"""
+        render = bpy.context.scene.render
+        try:
+            min_x, min_y, max_x, max_y, res_x, res_y = self.calculate_frame_screen_rect(mesh)
+        except Exception as e:
+            print(f"  ⚠ 渲染区域计算失败，渲染整帧: {e}")
+            render.use_border = False
+            return None
+        
+        margin = int(border_config['margin_pixels'])
+        min_x = max(0, min_x - margin)
+        min_y = max(0, min_y - margin)
+        max_x = min(res_x, max_x + margin)
+        max_y = min(res_y, max_y + margin)
+        
+        # 角色不在画面内或覆盖整帧时不使用区域渲染
+        if max_x <= min_x or max_y <= min_y or (min_x == 0 and min_y == 0 and max_x == res_x and max_y == res_y):
+            render.use_border = False
+            return None
+        
+        # 使用整像素对应的比例，保证输出与像素矩形一致
+        render.border_min_x = min_x / res_x
+        render.border_max_x = max_x / res_x
+        render.border_min_y = min_y / res_y
+        render.border_max_y = max_y / res_y
+        render.use_border = True
+        render.use_crop_to_border = bool(border_config['crop'])
+        return (min_x, min_y, max_x, max_y)
+    
+    def clear_render_border(self):
+        """恢复整帧渲染"""
+        render = bpy.context.scene.render
+        render.use_border = False
+        render.use_crop_to_border = False
+    
+    def recomposite_cropped_frame(self, image_path, border_rect):
+        """把裁剪渲染的帧贴回完整透明画布（左上角为图像原点）"""
+        try:
+            from PIL import Image
+        except ImportError:
+            print("⚠ Pillow不可用，无法还原裁剪帧，改为不裁剪输出")
+            self.config.setdefault('camera_settings', {}).setdefault('render_border', {})['crop'] = False
+            return False
+        
+        scene = bpy.context.scene
+        scale = scene.render.resolution_percentage / 100.0
+        canvas_size = (int(scene.render.resolution_x * scale), int(scene.render.resolution_y * scale))
+        min_x, _, _, max_y = border_rect
+        
+        with Image.open(image_path) as cropped:
+            canvas = Image.new('RGBA', canvas_size, (0, 0, 0, 0))
+            canvas.paste(cropped.convert('RGBA'), (min_x, canvas_size[1] - max_y))
+        canvas.save(image_path)
+        return True
+    
     def calculate_animation_bounds_with_action(self, mesh, action):
         """计算动画过程中的最大边界框（安全版本：直接使用action对象）"""
         if not self.armature or not action:
@@ -2486,20 +3159,161 @@ class DeadCellsRenderPipeline:
             os.makedirs(self.output_path)
         scene.render.filepath = os.path.join(self.output_path, "frame_")
         
-        print("渲染设置完成（EEVEE + 像素艺术优化）")
+        # 后端特定设置
+        self.apply_render_backend_settings()
+        
+        print(f"渲染设置完成（{self.render_backend} 后端 + 像素艺术优化）")
+    
+    def apply_render_backend_settings(self):
+        """应用当前渲染后端的引擎设置"""
+        scene = bpy.context.scene
+        render_config = self.config.get('render_settings', {})
+        
+        if self.render_backend == 'cycles_cpu' and hasattr(scene, 'cycles'):
+            scene.cycles.device = 'CPU'
+            scene.cycles.samples = render_config.get('cycles_samples', 8)
+            if hasattr(scene.cycles, 'use_denoising'):
+                scene.cycles.use_denoising = False
+            print(f"  ├─ Cycles CPU: {scene.cycles.samples} 采样")
+        elif self.render_backend == 'workbench_flat':
+            self.setup_workbench_flat_settings()
+    
+    def setup_workbench_flat_settings(self):
+        """Workbench平面/无光照卡通配置：着色由后处理量化到调色板，描边同样由后处理完成"""
+        scene = bpy.context.scene
+        workbench_config = self.config.get('render_settings', {}).get('workbench', {})
+        
+        shading = scene.display.shading
+        self.safe_set_enum_property(shading, 'light', [workbench_config.get('lighting', 'STUDIO'), 'STUDIO'], 'FLAT')
+        shading.color_type = 'MATERIAL'  # 使用材质视口颜色（调色板中间色）
+        for prop in ('show_shadows', 'show_cavity', 'show_object_outline', 'show_specular_highlight', 'show_xray', 'use_dof'):
+            if hasattr(shading, prop):
+                setattr(shading, prop, False)
+        
+        # 关闭抗锯齿，保证像素硬边
+        if hasattr(scene.display, 'render_aa'):
+            scene.display.render_aa = 'OFF'
+        
+        # 描边由后处理生成，关闭Freestyle
+        scene.render.use_freestyle = False
+        
+        try:
+            scene.view_settings.view_transform = 'Standard'
+            scene.view_settings.look = 'None'
+        except Exception as e:
+            print(f"  ⚠ 色彩管理配置警告: {e}")
+        
+        print(f"  ├─ Workbench平面着色: 光照 {shading.light}, 抗锯齿关闭")
+    
+    def linear_to_srgb8(self, color):
+        """线性颜色转8位sRGB元组"""
+        result = []
+        for channel in color[:3]:
+            channel = max(0.0, min(1.0, channel))
+            if channel <= 0.0031308:
+                srgb = channel * 12.92
+            else:
+                srgb = 1.055 * (channel ** (1 / 2.4)) - 0.055
+            result.append(int(round(srgb * 255)))
+        return tuple(result)
+    
+    def get_post_process_palette_image(self, Image):
+        """构建（并缓存）用于量化的调色板图像，颜色取自当前材质使用的色阶"""
+        if self.post_process_palette_image is not None:
+            return self.post_process_palette_image
+        
+        color_types = sorted(self.material_color_types) or ['skin']
+        colors = []
+        for color_type in color_types:
+            palette = self.dead_cells_palette.get(color_type, {})
+            for key in ('shadow', 'mid', 'highlight'):
+                if key in palette:
+                    colors.append(self.linear_to_srgb8(palette[key]))
+        
+        # 调色板需填满256项，用首色填充避免出现多余的黑色
+        flat_palette = []
+        for i in range(256):
+            flat_palette.extend(colors[i] if i < len(colors) else colors[0])
+        
+        palette_image = Image.new('P', (1, 1))
+        palette_image.putpalette(flat_palette)
+        self.post_process_palette_image = palette_image
+        print(f"  ├─ 后处理调色板: {len(colors)} 色 ({', '.join(color_types)})")
+        return palette_image
+    
+    def post_process_frame(self, image_path):
+        """帧后处理：alpha二值化 → 调色板量化 → 外描边"""
+        try:
+            from PIL import Image, ImageChops, ImageFilter
+        except ImportError:
+            print("⚠ Pillow不可用，跳过帧后处理（可先运行一次精灵图集生成自动安装）")
+            self.post_process_enabled = False
+            return False
+        
+        post_config = self.get_post_process_config()
+        
+        with Image.open(image_path) as source:
+            image = source.convert('RGBA')
+        r, g, b, a = image.split()
+        
+        # alpha二值化：像素艺术不保留半透明边缘
+        threshold = int(255 * post_config['alpha_threshold'])
+        alpha = a.point(lambda v: 255 if v >= threshold else 0)
+        
+        rgb = Image.merge('RGB', (r, g, b))
+        if post_config['palette_quantize']:
+            rgb = rgb.quantize(palette=self.get_post_process_palette_image(Image), dither=0).convert('RGB')
+        
+        result = Image.merge('RGBA', rgb.split() + (alpha,))
+        
+        if post_config['outline']:
+            size = int(post_config['outline_width']) * 2 + 1
+            dilated = alpha.filter(ImageFilter.MaxFilter(size))
+            outline_mask = ImageChops.subtract(dilated, alpha)
+            outline_color = self.linear_to_srgb8(post_config['outline_color']) + (255,)
+            outline_layer = Image.new('RGBA', image.size, outline_color)
+            result = Image.composite(outline_layer, result, outline_mask)
+        
+        result.save(image_path)
+        return True
     
     def get_animation_list(self):
-        """获取可用的动画列表"""
+        """获取可用的动画列表（跳过只包含其他骨架骨骼通道的动作）"""
         animations = []
+        coverage = {}
+        skipped = []
+        
+        armature = self.armature or self.find_armature()
+        channel_index = None
+        if armature:
+            try:
+                from action_channel_index import ActionChannelIndex
+                channel_index = ActionChannelIndex(bone.name for bone in armature.data.bones)
+            except ImportError:
+                pass
         
         # 查找动画数据
         for action in bpy.data.actions:
-            if action.name not in animations:
-                animations.append(action.name)
+            if action.name in animations:
+                continue
+            if channel_index:
+                stats = channel_index.coverage(action)
+                # 有骨骼通道但没有一个属于当前骨架：无法驱动角色
+                if stats["keyed_bones"] and not stats["matched_bones"]:
+                    skipped.append(action.name)
+                    continue
+                coverage[action.name] = stats
+            animations.append(action.name)
         
         print(f"发现 {len(animations)} 个动画:")
         for i, anim in enumerate(animations):
-            print(f"  {i+1}. {anim}")
+            if anim in coverage:
+                stats = coverage[anim]
+                print(f"  {i+1}. {anim} ({stats['matched_bones']}/{len(channel_index.bone_names)} 骨骼, {stats['fcurves']} 曲线)")
+            else:
+                print(f"  {i+1}. {anim}")
+        if skipped:
+            print(f"⚠ 跳过 {len(skipped)} 个不匹配当前骨架的动作: {', '.join(skipped[:5])}{'...' if len(skipped) > 5 else ''}")
         
         return animations
     
@@ -2532,7 +3346,10 @@ class DeadCellsRenderPipeline:
         
         # 为当前动画更新相机设置（传递action对象而非名称）
         if self.smart_camera:
-            self.update_camera_for_action(action)
+            bounds_start = time.perf_counter()
+            with self.profiler.stage("bounds_sampling"):
+                self.update_camera_for_action(action)
+            self.profiler.record_animation_metric(animation_name, "bounds", time.perf_counter() - bounds_start)
         
         # 设置动画帧范围
         scene.frame_start = start_frame
@@ -2553,26 +3370,77 @@ class DeadCellsRenderPipeline:
         print(f"  ├─ 帧范围: {start_frame} - {end_frame}")
         print(f"  ├─ 输出目录: {animation_output_dir}")
         
+        # 逐帧渲染区域：只着色角色所在的像素
+        border_config = self.get_render_border_config()
+        border_mesh = self.render_mesh if self.render_mesh else self.original_mesh
+        use_render_border = border_config['enabled'] and border_mesh is not None and scene.camera is not None
+        shaded_fraction_total = 0.0
+        
+        if self.weapon_layers:
+            self.weapon_layers.begin_animation()
+        
         # 渲染每一帧（手动逐帧确保动作正确评估）
         for frame in range(start_frame, end_frame + 1):
             # 设置当前帧
-            scene.frame_set(frame)
+            with self.profiler.stage("frame_set"):
+                scene.frame_set(frame)
+                
+                # 关键！强制更新视图层以确保动作和修改器正确评估
+                bpy.context.view_layer.update()
             
-            # 关键！强制更新视图层以确保动作和修改器正确评估
-            bpy.context.view_layer.update()
+            # 记录手部挂点（复用本帧已评估的姿态）
+            if self.weapon_layers:
+                self.weapon_layers.record_frame(frame)
             
             # 设置输出文件名
             frame_filename = f"{safe_animation_name}_{frame:04d}.png"
             scene.render.filepath = os.path.join(animation_output_dir, frame_filename)
             
+            # 投影当前帧边界到屏幕空间，设置渲染区域
+            border_rect = None
+            if use_render_border:
+                with self.profiler.stage("render_border"):
+                    border_rect = self.apply_frame_render_border(border_mesh, border_config)
+                if border_rect:
+                    rect_width = border_rect[2] - border_rect[0]
+                    rect_height = border_rect[3] - border_rect[1]
+                    shaded_fraction_total += (rect_width * rect_height) / float(scene.render.resolution_x * scene.render.resolution_y)
+                else:
+                    shaded_fraction_total += 1.0
+            
             # 渲染当前帧
-            bpy.ops.render.render(write_still=True)
+            frame_start_time = time.perf_counter()
+            with self.profiler.stage("frame_render"):
+                bpy.ops.render.render(write_still=True)
+            self.profiler.record_frame(animation_name, time.perf_counter() - frame_start_time)
+            
+            # 裁剪输出的帧还原为完整画布，保证精灵图集帧尺寸一致
+            if border_rect and border_config['crop']:
+                with self.profiler.stage("recomposite"):
+                    self.recomposite_cropped_frame(scene.render.filepath, border_rect)
+            
+            # 平面着色后端：调色板量化 + 描边
+            if self.post_process_enabled:
+                with self.profiler.stage("post_process"):
+                    self.post_process_frame(scene.render.filepath)
+            
+            # 逐帧回调（守护进程用于输出JSON进度）
+            if self.frame_callback:
+                self.frame_callback(animation_name, frame, start_frame, end_frame)
             
             # 可选：显示进度（对于长动画有用）
             if frame % 10 == 0 or frame == end_frame:
                 progress = ((frame - start_frame + 1) / (end_frame - start_frame + 1)) * 100
                 print(f"  ├─ 渲染进度: {progress:.1f}% (帧 {frame}/{end_frame})")
         
+        if use_render_border:
+            self.clear_render_border()
+            average_fraction = shaded_fraction_total / (end_frame - start_frame + 1)
+            print(f"  ├─ 渲染区域裁剪: 平均着色 {average_fraction * 100:.1f}% 画布像素")
+        
+        if self.weapon_layers:
+            self.weapon_layers.write_animation(animation_name, safe_animation_name)
+        
         print(f"✓ 动画渲染完成: {animation_name} ({end_frame - start_frame + 1} 帧)")
     
     def apply_render_limit(self, animations):
@@ -2590,13 +3458,26 @@ class DeadCellsRenderPipeline:
         
         return animations[:render_limit]
     
-    def render_all_animations(self):
-        """渲染所有动画"""
-        animations = self.get_animation_list()
+    def render_all_animations(self, animations=None):
+        """渲染所有动画
+        
+        Args:
+            animations: 指定要渲染的动画名列表；为None时渲染全部（受render_limit限制）
         
-        # 应用渲染限制（默认无限制）
-        animations_to_render = self.apply_render_limit(animations)
+        Returns:
+            成功渲染的动画名列表
+        """
+        if animations is None:
+            animations = self.get_animation_list()
+            
+            # 应用渲染限制（默认无限制）
+            animations_to_render = self.apply_render_limit(animations)
+        else:
+            animations_to_render = list(animations)
         
+        self.weapon_layers = self.create_weapon_layers()
+        
+        rendered_animations = []
         for i, animation in enumerate(animations_to_render):
             try:
                 # 检查超时和更新进度
@@ -2618,9 +3499,33 @@ class DeadCellsRenderPipeline:
                     
                     print(f"  ├─ 渲染帧范围: {start_frame} - {end_frame}")
                     # 传递原始名称用于文件名，action对象用于相机边界计算
-                    self.render_animation_with_action(animation, action, start_frame, end_frame)
+                    with self.profiler.stage("animation"):
+                        self.render_animation_with_action(animation, action, start_frame, end_frame)
+                    rendered_animations.append(animation)
             except Exception as e:
                 print(f"渲染动画 {animation} 时出错: {e}")
+        
+        # 武器每种只渲染一张（N个动画 + M种武器，而不是 N×M）
+        if self.weapon_layers:
+            try:
+                with self.profiler.stage("weapon_layers"):
+                    self.weapon_layers.render_weapon_sprites()
+            except Exception as e:
+                print(f"⚠ 武器图层渲染失败: {e}")
+        
+        return rendered_animations
+    
+    def create_weapon_layers(self):
+        """按配置创建武器图层渲染器，未启用或不可用时返回None"""
+        weapon_config = self.config.get('weapon_layers', {})
+        if not weapon_config.get('enabled', False):
+            return None
+        try:
+            from weapon_layers import WeaponLayerRenderer
+        except ImportError as e:
+            print(f"⚠ 无法加载武器图层模块，跳过: {e}")
+            return None
+        return WeaponLayerRenderer(self, weapon_config)
     
     def generate_sprite_sheets(self):
         """生成Unity精灵图集"""
@@ -2632,7 +3537,7 @@ class DeadCellsRenderPipeline:
             for item in os.listdir(self.output_path):
                 item_path = os.path.join(self.output_path, item)
                 # 排除SpritesheetS输出目录，只包含实际的动画渲染目录
-                if os.path.isdir(item_path) and item != "SpritesheetS":
+                if os.path.isdir(item_path) and item not in NON_ANIMATION_DIRS:
                     render_dirs.append(item_path)
         
         if not render_dirs:
@@ -2646,7 +3551,9 @@ class DeadCellsRenderPipeline:
         for render_dir in render_dirs:
             try:
                 animation_name = os.path.basename(render_dir)
-                if self.create_sprite_sheet(render_dir, sprite_sheets_path, animation_name):
+                with self.profiler.stage("sprite_sheet"):
+                    sheet_created = self.create_sprite_sheet(render_dir, sprite_sheets_path, animation_name)
+                if sheet_created:
                     success_count += 1
                     print(f"✓ 已生成 {animation_name} 精灵图集")
             except Exception as e:
@@ -2670,7 +3577,7 @@ class DeadCellsRenderPipeline:
         render_dirs = []
         for item in os.listdir(self.output_path):
             item_path = os.path.join(self.output_path, item)
-            if os.path.isdir(item_path) and item != "SpritesheetS":  # 排除已存在的输出目录
+            if os.path.isdir(item_path) and item not in NON_ANIMATION_DIRS:  # 排除已存在的输出目录
                 # 检查是否包含PNG文件
                 png_files = [f for f in os.listdir(item_path) if f.lower().endswith('.png')]
                 if png_files:
@@ -2713,7 +3620,9 @@ class DeadCellsRenderPipeline:
                 render_dir = os.path.join(self.output_path, anim_name)
                 
                 print(f"  ├─ 处理动画: {anim_name} ({frame_count} 帧)")
-                if self.create_sprite_sheet(render_dir, sprite_sheets_path, anim_name):
+                with self.profiler.stage("sprite_sheet"):
+                    sheet_created = self.create_sprite_sheet(render_dir, sprite_sheets_path, anim_name)
+                if sheet_created:
                     success_count += 1
                     print(f"  ├─ ✓ 已生成 {anim_name} 精灵图集")
                 else:
@@ -3082,7 +3991,7 @@ TextureImporter:
             print("💡 未找到精灵图集，从渲染输出生成预备脚本")
             for item in os.listdir(self.output_path):
                 item_path = os.path.join(self.output_path, item)
-                if os.path.isdir(item_path) and item != "SpritesheetS":
+                if os.path.isdir(item_path) and item not in NON_ANIMATION_DIRS:
                     png_files = [f for f in os.listdir(item_path) if f.lower().endswith('.png')]
                     if png_files:
                         animations_info.append({
@@ -3576,6 +4485,328 @@ public class CharacterAnimationSetup : EditorWindow
             world.color = (0.05, 0.05, 0.05)
             print("✓ 已设置为纯色背景模式")
 
+    def prepare_render_scene(self):
+        """清理场景、导入角色并完成渲染前的全部设置（可被守护进程复用）
+
+        Returns:
+            导入的角色网格对象，失败时返回None
+        """
+        # 1. 清理场景
+        self.update_progress("清理场景")
+        with self.profiler.stage("clear_scene"):
+            self.clear_scene()
+
+        # 2. 导入FBX角色
+        self.update_progress("导入FBX角色")
+        with self.profiler.stage("import_fbx"):
+            character = self.import_fbx_character()
+        if not character:
+            return None
+
+        # 3. 创建渲染优化网格
+        self.update_progress("创建渲染优化网格")
+        with self.profiler.stage("create_render_copy"):
+            render_mesh = self.optimize_character_mesh(character)
+        if render_mesh:
+            self.get_render_stats()  # 显示优化统计
+
+        # 4. 设置材质
+        self.update_progress("设置死亡细胞风格材质")
+        with self.profiler.stage("setup_materials"):
+            self.setup_dead_cells_materials(character)
+
+        # 5. 设置相机
+        self.update_progress("设置正交相机")
+        with self.profiler.stage("setup_camera"):
+            self.setup_orthographic_camera()
+
+        # 6. 设置光照
+        self.update_progress("设置光照")
+        with self.profiler.stage("setup_lighting"):
+            self.setup_lighting()
+
+        # 7. 设置世界环境
+        self.update_progress("设置世界环境")
+        with self.profiler.stage("setup_world"):
+            self.setup_world_settings()
+
+        # 8. 设置渲染参数
+        self.update_progress("设置渲染参数")
+        with self.profiler.stage("setup_render_settings"):
+            self.setup_render_settings()
+
+        return character
+
+
+class RenderJobDaemon:
+    """常驻后台渲染守护进程
+
+    在 blender -b 中保持已导入角色、材质、相机和灯光的"热"状态，
+    轮询本地spool目录中的任务文件并逐个执行，进度以JSON行输出。
+
+    spool目录结构:
+        incoming/    待处理任务（*.json）
+        processing/  正在执行的任务
+        done/        已完成任务
+        failed/      失败任务
+        progress.jsonl  所有进度事件
+    """
+
+    def __init__(self, spool_dir=None, poll_interval=None):
+        self.pipeline = DeadCellsRenderPipeline()
+
+        daemon_config = self.pipeline.config.get('daemon', {})
+        self.spool_dir = os.path.abspath(spool_dir or self.resolve_spool_dir(daemon_config))
+        self.poll_interval = poll_interval or daemon_config.get('poll_interval', 1.0)
+
+        self.incoming_dir = os.path.join(self.spool_dir, "incoming")
+        self.processing_dir = os.path.join(self.spool_dir, "processing")
+        self.done_dir = os.path.join(self.spool_dir, "done")
+        self.failed_dir = os.path.join(self.spool_dir, "failed")
+        self.progress_log = os.path.join(self.spool_dir, "progress.jsonl")
+
+        for directory in (self.incoming_dir, self.processing_dir, self.done_dir, self.failed_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        self.loaded_fbx_path = None
+        self.current_job_id = None
+        self.running = True
+        self.default_render_backend = self.pipeline.render_backend
+        self.default_output_path = self.pipeline.output_path
+
+        # 逐帧进度回调
+        self.pipeline.frame_callback = self.on_frame_rendered
+
+    def resolve_spool_dir(self, daemon_config):
+        """确定spool目录：命令行 > 环境变量 > 配置文件 > 输出目录下的_spool"""
+        for i, arg in enumerate(sys.argv):
+            if arg == '--spool-dir' and i + 1 < len(sys.argv):
+                return sys.argv[i + 1]
+
+        env_spool = os.getenv('DEADCELLS_SPOOL_DIR')
+        if env_spool:
+            return env_spool
+
+        if daemon_config.get('spool_dir'):
+            return daemon_config['spool_dir']
+
+        return os.path.join(self.pipeline.output_path, SPOOL_DIR_NAME)
+
+    def emit(self, event, **fields):
+        """输出一行JSON进度事件（stdout + progress.jsonl）"""
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "event": event,
+            "job_id": self.current_job_id
+        }
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+
+        print(line, flush=True)
+        try:
+            with open(self.progress_log, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠ 无法写入进度日志: {e}")
+
+    def on_frame_rendered(self, animation_name, frame, start_frame, end_frame):
+        """流水线逐帧渲染回调"""
+        self.emit(
+            "frame",
+            animation=animation_name,
+            frame=frame,
+            done=frame - start_frame + 1,
+            total=end_frame - start_frame + 1
+        )
+
+    def recover_stale_jobs(self):
+        """将上次异常退出时遗留在processing中的任务放回incoming"""
+        for name in os.listdir(self.processing_dir):
+            if name.lower().endswith('.json'):
+                os.replace(os.path.join(self.processing_dir, name), os.path.join(self.incoming_dir, name))
+                print(f"  ├─ 恢复未完成任务: {name}")
+
+    def ensure_warm_state(self, fbx_path=None):
+        """确保场景已按指定FBX准备就绪，相同FBX直接复用"""
+        pipeline = self.pipeline
+
+        if fbx_path:
+            pipeline.fbx_path = os.path.normpath(os.path.abspath(fbx_path))
+
+        if self.loaded_fbx_path == pipeline.fbx_path:
+            return True
+
+        self.emit("warmup", fbx_path=pipeline.fbx_path)
+        warmup_start = time.time()
+
+        if not pipeline.validate_paths():
+            return False
+
+        if not pipeline.prepare_render_scene():
+            return False
+
+        self.loaded_fbx_path = pipeline.fbx_path
+        self.emit("warm", fbx_path=pipeline.fbx_path, seconds=round(time.time() - warmup_start, 3))
+        return True
+
+    def claim_next_job(self):
+        """按修改时间取出最早的任务文件并原子移动到processing"""
+        try:
+            names = [name for name in os.listdir(self.incoming_dir) if name.lower().endswith('.json')]
+        except OSError:
+            return None
+
+        candidates = []
+        for name in names:
+            job_path = os.path.join(self.incoming_dir, name)
+            try:
+                candidates.append((os.path.getmtime(job_path), job_path))
+            except OSError:
+                # 列出目录后已被其他守护进程取走
+                continue
+
+        for _, job_path in sorted(candidates):
+            claimed_path = os.path.join(self.processing_dir, os.path.basename(job_path))
+            try:
+                os.replace(job_path, claimed_path)
+                return claimed_path
+            except OSError:
+                # 文件可能仍在写入或已被其他进程取走
+                continue
+
+        return None
+
+    def execute_job(self, job_path):
+        """执行单个任务文件，返回是否成功"""
+        with open(job_path, 'r', encoding='utf-8') as f:
+            job = json.load(f)
+
+        self.current_job_id = job.get('job_id') or os.path.splitext(os.path.basename(job_path))[0]
+        command = job.get('command', 'render')
+
+        if command == 'shutdown':
+            self.emit("shutdown")
+            self.running = False
+            return True
+
+        if command == 'reload':
+            self.loaded_fbx_path = None
+
+        pipeline = self.pipeline
+        job_start = time.time()
+
+        # 每个任务单独出一份计时报告
+        pipeline.profiler.reset()
+
+        # 每个任务重新计时，避免守护进程长时间运行后触发超时提示
+        pipeline.start_time = job_start
+        pipeline.timeout_warned = False
+
+        # 按任务选择输出目录（未指定时恢复守护进程启动时的目录，不沿用上一个任务的目录）
+        if job.get('output_path'):
+            pipeline.output_path = os.path.normpath(os.path.abspath(job['output_path']))
+        else:
+            pipeline.output_path = self.default_output_path
+        os.makedirs(pipeline.output_path, exist_ok=True)
+
+        if not self.ensure_warm_state(job.get('fbx_path')):
+            raise RuntimeError(f"无法准备场景: {pipeline.fbx_path}")
+
+        # 按任务选择渲染后端（未指定时恢复守护进程启动时的后端）
+        backend = job.get('render_backend', self.default_render_backend)
+        if backend != pipeline.render_backend:
+            pipeline.set_render_backend(backend)
+            pipeline.setup_render_settings()
+
+        if command == 'reload':
+            self.emit("job_done", seconds=round(time.time() - job_start, 3))
+            return True
+
+        # 解析要渲染的动画
+        requested = job.get('animations') or []
+        if requested:
+            missing = [name for name in requested if name not in bpy.data.actions]
+            if missing:
+                self.emit("warning", message="动画不存在", animations=missing)
+            animations = [name for name in requested if name in bpy.data.actions]
+        else:
+            animations = pipeline.get_animation_list()
+            limit = job.get('render_limit', -1)
+            if limit and limit > 0:
+                animations = animations[:limit]
+
+        self.emit("job_start", animations=animations, output_path=pipeline.output_path)
+        with pipeline.profiler.stage("render_animations"):
+            rendered = pipeline.render_all_animations(animations)
+
+        # 只为本次渲染的动画重建精灵图集
+        if job.get('generate_sprite_sheets', True) and rendered:
+            render_dirs = []
+            for name in rendered:
+                safe_name = pipeline.sanitize_filename(name)
+                frames_dir = os.path.join(pipeline.output_path, safe_name)
+                if os.path.isdir(frames_dir):
+                    frame_count = len([f for f in os.listdir(frames_dir) if f.lower().endswith('.png')])
+                    render_dirs.append((safe_name, frame_count))
+            with pipeline.profiler.stage("sprite_sheets"):
+                pipeline.generate_sprite_sheets_from_list(render_dirs)
+
+        if job.get('generate_unity_assets', False):
+            with pipeline.profiler.stage("unity_assets"):
+                pipeline.check_and_generate_unity_assets()
+
+        report_path = pipeline.profiler.write_report(
+            pipeline.output_path, {"mode": "daemon", "job_id": self.current_job_id}
+        )
+
+        self.emit(
+            "job_done",
+            rendered=rendered,
+            seconds=round(time.time() - job_start, 3),
+            profile_report=report_path
+        )
+        return True
+
+    def run(self):
+        """主循环：预热场景后持续处理任务，直到收到shutdown任务或Ctrl+C"""
+        print("=== 死亡细胞渲染守护进程 ===")
+        print(f"📂 Spool目录: {self.spool_dir}")
+        print(f"💡 将任务JSON放入: {self.incoming_dir}")
+
+        self.recover_stale_jobs()
+        self.emit("daemon_start", spool_dir=self.spool_dir, pid=os.getpid())
+
+        # 启动时立即预热，使第一个任务也无需等待导入
+        try:
+            self.ensure_warm_state()
+        except Exception as e:
+            self.emit("warmup_failed", error=str(e))
+
+        try:
+            while self.running:
+                job_path = self.claim_next_job()
+                if not job_path:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                target_dir = self.done_dir
+                try:
+                    self.execute_job(job_path)
+                except Exception as e:
+                    import traceback
+                    traceback.print_exc()
+                    self.emit("job_failed", error=str(e))
+                    target_dir = self.failed_dir
+                    # 场景状态可能已损坏，下个任务重新预热
+                    self.loaded_fbx_path = None
+                finally:
+                    os.replace(job_path, os.path.join(target_dir, os.path.basename(job_path)))
+                    self.current_job_id = None
+        except KeyboardInterrupt:
+            print("\n👋 守护进程被用户中断")
+
+        self.emit("daemon_stop")
+
 
 def run_dead_cells_pipeline():
     """运行死亡细胞渲染流水线"""
@@ -3586,62 +4817,37 @@ def run_dead_cells_pipeline():
     try:
         # 0. 验证路径
         pipeline.update_progress("验证配置和路径")
-        if not pipeline.validate_paths():
+        with pipeline.profiler.stage("validate_paths"):
+            paths_ok = pipeline.validate_paths()
+        if not paths_ok:
             print("错误: 路径验证失败，请检查配置文件")
             return
         
-        # 1. 清理场景
-        pipeline.update_progress("清理场景")
-        pipeline.clear_scene()
-        
-        # 2. 导入FBX角色
-        pipeline.update_progress("导入FBX角色")
-        character = pipeline.import_fbx_character()
+        # 1-8. 清理场景、导入角色并完成渲染场景设置
+        with pipeline.profiler.stage("prepare_scene"):
+            character = pipeline.prepare_render_scene()
         if not character:
             print("错误: 无法导入角色模型")
             return
-        
-        # 3. 创建渲染优化网格
-        pipeline.update_progress("创建渲染优化网格")
-        render_mesh = pipeline.optimize_character_mesh(character)
-        if render_mesh:
-            pipeline.get_render_stats()  # 显示优化统计
-        
-        # 4. 设置材质
-        pipeline.update_progress("设置死亡细胞风格材质")
-        pipeline.setup_dead_cells_materials(character)
-        
-        # 5. 设置相机
-        pipeline.update_progress("设置正交相机")
-        pipeline.setup_orthographic_camera()
-        
-        # 6. 设置光照
-        pipeline.update_progress("设置光照")
-        pipeline.setup_lighting()
-        
-        # 7. 设置世界环境
-        pipeline.update_progress("设置世界环境")
-        pipeline.setup_world_settings()
-        
-        # 8. 设置渲染参数
-        pipeline.update_progress("设置渲染参数")
-        pipeline.setup_render_settings()
-        
+
         # 9. 获取动画列表
         pipeline.update_progress("分析动画数据")
-        animations = pipeline.get_animation_list()
+        with pipeline.profiler.stage("animation_list"):
+            animations = pipeline.get_animation_list()
         
         # 10. 渲染决策
         pipeline.update_progress("渲染决策")
         if pipeline.should_auto_render():
             pipeline.update_progress("开始批量渲染", f"共{len(animations)}个动画")
-            pipeline.render_all_animations()
+            with pipeline.profiler.stage("render_animations"):
+                pipeline.render_all_animations()
         else:
             print("跳过渲染阶段")
         
         # 11. 生成Unity资产（独立于渲染流程）
         pipeline.update_progress("检查并生成Unity资产")
-        pipeline.check_and_generate_unity_assets()
+        with pipeline.profiler.stage("unity_assets"):
+            pipeline.check_and_generate_unity_assets()
         
         print("\n=== 流水线设置完成 ===")
         print(f"角色模型: {character.name}")
@@ -3668,8 +4874,23 @@ def run_dead_cells_pipeline():
         print(f"流水线执行错误: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # 无论成功或中止都输出计时报告，方便定位瓶颈
+        try:
+            pipeline.profiler.write_report(pipeline.output_path, {"mode": "pipeline"})
+        except Exception as e:
+            print(f"⚠ 计时报告写出失败: {e}")
+
+
+def run_render_daemon():
+    """以常驻守护进程模式运行（blender -b -P character_DeadCellTest.py -- --daemon）"""
+    daemon = RenderJobDaemon()
+    daemon.run()
 
 
 # 主函数
 if __name__ == "__main__":
-    run_dead_cells_pipeline()
\ No newline at end of file
+    if '--daemon' in sys.argv:
+        run_render_daemon()
+    else:
+        run_dead_cells_pipeline()
\ No newline at end of file
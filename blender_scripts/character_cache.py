@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+角色缓存库 - 按参数哈希缓存 CharacterGenerator 生成的网格、骨架和权重
+
+相同的 CharacterParameters 再次生成时，直接从缓存库追加（或链接）已生成的角色，
+不再重新构建网格、骨架和蒙皮权重。
+
+缓存库是一个目录，每个参数哈希一个 <哈希>.blend（其中只有一个集合 CharGen_<哈希>）
+和一个 <哈希>.json（参数与统计）。不使用单个共享的 .blend，
+这样 character_sweep.py 的多个工作进程可以同时写入而不会互相覆盖。
+命中时更新文件修改时间；库总大小超过上限时按修改时间淘汰最久未使用的条目（LRU）。
+
+使用示例（Blender内）：
+    cache = CharacterCache("D:\\character_cache", max_size_mb=512)
+    cached = cache.load(params, "Enemy_01")
+    if cached is None:
+        mesh, armature = generator.create_character()
+        cache.store(params, mesh, armature)
+"""
+
+import os
+import json
+import time
+import hashlib
+
+import bpy
+
+# 生成算法变化时提高版本号，旧缓存自动失效
+GENERATOR_CACHE_VERSION = "1"
+
+COLLECTION_PREFIX = "CharGen_"
+
+
+def parameter_hash(params):
+    """参数集合的哈希（不包含缓存自身的设置）"""
+    fields = {
+        key: value for key, value in vars(params).items()
+        if not key.startswith('cache_')
+    }
+    payload = json.dumps({"version": GENERATOR_CACHE_VERSION, "parameters": fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class CharacterCache:
+    """按参数哈希缓存生成的角色"""
+
+    def __init__(self, cache_dir, max_size_mb=512, link=False):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else 0
+        self.link = link
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_paths(self, key):
+        """缓存条目的 .blend 和 .json 路径"""
+        return (
+            os.path.join(self.cache_dir, f"{key}.blend"),
+            os.path.join(self.cache_dir, f"{key}.json")
+        )
+
+    def load(self, params, character_name):
+        """命中时把缓存的角色追加（或链接）到当前场景，返回 (网格, 骨架)；未命中返回None"""
+        key = parameter_hash(params)
+        blend_path, _ = self.entry_paths(key)
+        if not os.path.exists(blend_path):
+            return None
+
+        collection_name = COLLECTION_PREFIX + key
+        try:
+            with bpy.data.libraries.load(blend_path, link=self.link) as (data_from, data_to):
+                if collection_name not in data_from.collections:
+                    print(f"⚠ 缓存文件中没有集合 {collection_name}，重新生成")
+                    return None
+                data_to.collections = [collection_name]
+        except (OSError, RuntimeError) as e:
+            print(f"⚠ 读取角色缓存失败，重新生成: {e}")
+            return None
+
+        collection = data_to.collections[0]
+        mesh = next((obj for obj in collection.objects if obj.type == 'MESH'), None)
+        armature = next((obj for obj in collection.objects if obj.type == 'ARMATURE'), None)
+        if mesh is None or armature is None:
+            print(f"⚠ 缓存条目 {key} 不完整，重新生成")
+            return None
+
+        scene_collection = bpy.context.scene.collection
+        if self.link:
+            # 链接的数据只读，整个集合作为子集合放入场景
+            scene_collection.children.link(collection)
+        else:
+            for obj in collection.objects:
+                scene_collection.objects.link(obj)
+            bpy.data.collections.remove(collection)
+            mesh.name = character_name
+            mesh.data.name = character_name
+            armature.name = f"{character_name}_Armature"
+            armature.data.name = f"{character_name}_Armature"
+
+        # 更新修改时间作为最近使用时间
+        os.utime(blend_path, None)
+        print(f"✓ 角色缓存命中: {key} ({'链接' if self.link else '追加'})")
+        return mesh, armature
+
+    def store(self, params, mesh, armature):
+        """把生成的角色写入缓存库，返回缓存键"""
+        key = parameter_hash(params)
+        blend_path, info_path = self.entry_paths(key)
+
+        # 临时集合只用于写出，不链接到场景
+        collection = bpy.data.collections.new(COLLECTION_PREFIX + key)
+        collection.objects.link(mesh)
+        collection.objects.link(armature)
+
+        temp_path = f"{blend_path}.{os.getpid()}.tmp"
+        try:
+            bpy.data.libraries.write(temp_path, {collection}, fake_user=True)
+            os.replace(temp_path, blend_path)
+        except (OSError, RuntimeError) as e:
+            print(f"⚠ 写入角色缓存失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+        finally:
+            bpy.data.collections.remove(collection)
+
+        info = {
+            "key": key,
+            "version": GENERATOR_CACHE_VERSION,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "parameters": {k: v for k, v in vars(params).items() if not k.startswith('cache_')},
+            "vertices": len(mesh.data.vertices),
+            "bones": len(armature.data.bones),
+            "file_size": os.path.getsize(blend_path)
+        }
+        with open(info_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2, ensure_ascii=False, default=str)
+
+        print(f"✓ 已写入角色缓存: {key} ({info['file_size'] / 1024:.0f} KB)")
+        self.evict(keep_key=key)
+        return key
+
+    def entries(self):
+        """缓存条目列表 [(键, .blend路径, 大小, 最近使用时间)]，最久未使用的在前"""
+        result = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.blend'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            result.append((name[:-len('.blend')], path, stat.st_size, stat.st_mtime))
+        result.sort(key=lambda entry: entry[3])
+        return result
+
+    def evict(self, keep_key=None):
+        """库总大小超过上限时淘汰最久未使用的条目，返回淘汰的键"""
+        if not self.max_size_bytes:
+            return []
+
+        entries = self.entries()
+        total = sum(entry[2] for entry in entries)
+        evicted = []
+        for key, blend_path, size, _ in entries:
+            if total <= self.max_size_bytes:
+                break
+            if key == keep_key:
+                continue
+            for path in self.entry_paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            evicted.append(key)
+
+        if evicted:
+            print(f"  ├─ 缓存超过 {self.max_size_bytes / 1024 / 1024:.0f} MB，淘汰 {len(evicted)} 个最久未使用的条目")
+        return evicted
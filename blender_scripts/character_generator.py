@@ -2,6 +2,23 @@ import bpy
 import bmesh
 from mathutils import Vector, Matrix
 import math
+import os
+import sys
+
+# 同目录的共用模块
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+try:
+    from scene_reset import reset_scene
+except ImportError:
+    reset_scene = None
+
+try:
+    from character_cache import CharacterCache
+except ImportError:
+    CharacterCache = None
 
 class CharacterParameters:
     """参数化人物模型的配置类"""
@@ -32,6 +49,129 @@ class CharacterParameters:
         self.hand_size = 0.08
         self.foot_length = 0.15
         self.foot_width = 0.06
+        
+        # 网格精度参数（默认值与Blender图元默认值一致）
+        self.mesh_segments = 32    # 球体/圆柱体的环向分段数
+        self.mesh_rings = 16       # 球体的纵向环数
+        
+        # 额外的脊椎细分骨骼数量（用于需要指定骨骼数量的场景，如性能测试）
+        self.extra_spine_bones = 0
+        
+        # 构建方式：operators 使用图元运算符 + join | data 直接生成顶点/面数组写入单个网格（无需UI上下文，适合批量）
+        self.build_mode = "operators"
+        
+        # 蒙皮权重：auto 使用 ARMATURE_AUTO 热扩散 | part 按部位所属骨骼（需要数据级构建的部位标记）
+        #          | distance 按到骨骼线段的距离，关节处平滑过渡
+        self.weight_mode = "auto"
+        self.weight_blend_distance = 0.05   # 距离权重的过渡范围（比最近骨骼远这么多以内的骨骼参与混合）
+        self.weight_max_influences = 4      # 每个顶点最多受几根骨骼影响
+        
+        # 参数哈希缓存库目录（None 时读取环境变量 DEADCELLS_CHARACTER_CACHE，都没有则不缓存；"" 表示关闭缓存，忽略环境变量）
+        self.cache_dir = None
+        self.cache_max_mb = 512     # 缓存库总大小上限，超过时淘汰最久未使用的条目
+        self.cache_link = False     # 命中时链接（只读）而不是追加
+
+
+# ----------------------------------------------------------------------
+# 数据级几何生成（与Blender图元运算符生成的形状一致，不含UV）
+# ----------------------------------------------------------------------
+
+def uv_sphere_geometry(segments, rings, radius):
+    """UV球体：顶点列表和面列表（极点为三角形，其余为四边形）"""
+    vertices = [(0.0, 0.0, radius)]
+    for ring in range(1, rings):
+        phi = math.pi * ring / rings
+        ring_radius = radius * math.sin(phi)
+        z = radius * math.cos(phi)
+        for segment in range(segments):
+            theta = 2 * math.pi * segment / segments
+            vertices.append((ring_radius * math.cos(theta), ring_radius * math.sin(theta), z))
+    vertices.append((0.0, 0.0, -radius))
+    
+    bottom = len(vertices) - 1
+    faces = []
+    for segment in range(segments):
+        next_segment = (segment + 1) % segments
+        faces.append((0, 1 + segment, 1 + next_segment))
+    for ring in range(rings - 2):
+        row = 1 + ring * segments
+        next_row = row + segments
+        for segment in range(segments):
+            next_segment = (segment + 1) % segments
+            faces.append((row + segment, next_row + segment, next_row + next_segment, row + next_segment))
+    last_row = 1 + (rings - 2) * segments
+    for segment in range(segments):
+        next_segment = (segment + 1) % segments
+        faces.append((last_row + next_segment, last_row + segment, bottom))
+    return vertices, faces
+
+
+def cylinder_geometry(segments, radius, depth):
+    """圆柱体：上下两圈顶点，侧面为四边形，端面为N边形（与图元默认的NGON端面一致）"""
+    vertices = []
+    for z in (-depth / 2, depth / 2):
+        for segment in range(segments):
+            theta = 2 * math.pi * segment / segments
+            vertices.append((radius * math.cos(theta), radius * math.sin(theta), z))
+    
+    faces = []
+    for segment in range(segments):
+        next_segment = (segment + 1) % segments
+        faces.append((segment, next_segment, segments + next_segment, segments + segment))
+    faces.append(tuple(reversed(range(segments))))
+    faces.append(tuple(range(segments, 2 * segments)))
+    return vertices, faces
+
+
+def transform_vertices(vertices, location=(0, 0, 0), rotation_z=0.0, scale=(1, 1, 1)):
+    """按对象变换顺序（缩放 → 绕Z旋转 → 平移）把局部顶点转换到世界坐标"""
+    cos_z = math.cos(rotation_z)
+    sin_z = math.sin(rotation_z)
+    result = []
+    for x, y, z in vertices:
+        x, y, z = x * scale[0], y * scale[1], z * scale[2]
+        result.append((
+            location[0] + x * cos_z - y * sin_z,
+            location[1] + x * sin_z + y * cos_z,
+            location[2] + z
+        ))
+    return result
+
+# ----------------------------------------------------------------------
+# 解析权重计算
+# ----------------------------------------------------------------------
+
+# 权重量化步数：相同（骨骼, 权重）的顶点合并为一次 vertex_group.add 调用
+WEIGHT_STEPS = 100
+
+
+def point_segment_distance(point, head, tail):
+    """点到骨骼线段（head → tail）的距离"""
+    segment = tail - head
+    length_squared = segment.length_squared
+    if length_squared == 0:
+        return (point - head).length
+    t = max(0.0, min(1.0, (point - head).dot(segment) / length_squared))
+    return (point - (head + segment * t)).length
+
+
+def distance_weights(distances, blend_distance, max_influences=4):
+    """按骨骼距离计算归一化权重：最近骨骼权重最大，距离差在 blend_distance 内的骨骼按平滑曲线混合"""
+    nearest = min(distances.values())
+    if blend_distance <= 0:
+        return {min(distances, key=distances.get): 1.0}
+    
+    weights = {}
+    for bone_name, distance in distances.items():
+        t = (distance - nearest) / blend_distance
+        if t < 1.0:
+            falloff = 1.0 - t
+            weights[bone_name] = falloff * falloff * (3.0 - 2.0 * falloff)
+    
+    strongest = sorted(weights.items(), key=lambda item: item[1], reverse=True)[:max_influences]
+    total = sum(weight for _, weight in strongest)
+    return {bone_name: weight / total for bone_name, weight in strongest}
+
 
 class CharacterGenerator:
     """死亡细胞风格的人物模型生成器"""
@@ -40,8 +180,20 @@ class CharacterGenerator:
         self.params = params if params else CharacterParameters()
         self.character_name = "DeadCellsCharacter"
         
+        # 数据级构建时记录的身体部位（部位名列表、部位 → 所属骨骼）
+        self.part_names = []
+        self.part_bones = {}
+        
+        # 生成前是否清空场景（在同一场景中生成多个变体时关闭）
+        self.clear_before_create = True
+        
     def clear_scene(self):
         """清理场景中的所有对象"""
+        if reset_scene is not None:
+            # 直接删除数据块，批量生成变体时不会累积网格和材质
+            reset_scene(verbose=False)
+            return
+        
         # 确保在对象模式
         if bpy.context.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
@@ -50,9 +202,41 @@ class CharacterGenerator:
         bpy.ops.object.delete(use_global=False)
         
     def create_character(self):
-        """创建完整的人物模型"""
-        self.clear_scene()
+        """创建完整的人物模型（启用缓存时相同参数直接从缓存库读取）"""
+        if self.clear_before_create:
+            self.clear_scene()
+        
+        cache = self.open_cache()
+        if cache:
+            cached = cache.load(self.params, self.character_name)
+            if cached:
+                return cached
         
+        if self.params.build_mode == "data":
+            character_mesh, armature = self.create_character_data()
+        else:
+            character_mesh, armature = self.create_character_operators()
+        
+        if cache:
+            cache.store(self.params, character_mesh, armature)
+        
+        return character_mesh, armature
+    
+    def open_cache(self):
+        """按参数或环境变量打开缓存库；未配置或模块不可用时返回None"""
+        if self.params.cache_dir == "":
+            return None
+        cache_dir = self.params.cache_dir or os.getenv('DEADCELLS_CHARACTER_CACHE')
+        if not cache_dir or CharacterCache is None:
+            return None
+        try:
+            return CharacterCache(cache_dir, max_size_mb=self.params.cache_max_mb, link=self.params.cache_link)
+        except OSError as e:
+            print(f"⚠ 无法打开角色缓存库 {cache_dir}: {e}")
+            return None
+    
+    def create_character_operators(self):
+        """运算符构建：图元运算符创建各部位后合并"""
         # 创建身体各部分
         body_parts = {
             'head': self.create_head(),
@@ -74,10 +258,113 @@ class CharacterGenerator:
         
         return character_mesh, armature
     
+    def create_character_data(self):
+        """数据级构建：直接生成顶点/面数组写入一个网格，不调用图元运算符和join"""
+        vertices, faces, part_indices = self.build_body_geometry()
+        
+        mesh_data = bpy.data.meshes.new(self.character_name)
+        mesh_data.from_pydata(vertices, [], faces)
+        
+        # 每个顶点所属的身体部位（索引对应 self.part_names），供权重计算使用
+        part_attribute = mesh_data.attributes.new("part_index", 'INT', 'POINT')
+        part_attribute.data.foreach_set('value', part_indices)
+        mesh_data["part_names"] = list(self.part_names)
+        mesh_data["part_bones"] = [self.part_bones[name] for name in self.part_names]
+        mesh_data.update()
+        
+        character_mesh = bpy.data.objects.new(self.character_name, mesh_data)
+        bpy.context.scene.collection.objects.link(character_mesh)
+        
+        armature = self.create_armature_data()
+        self.bind_mesh_to_armature(character_mesh, armature)
+        
+        return character_mesh, armature
+    
+    def body_part_specs(self):
+        """身体部位列表：(部位名, 所属骨骼, 图元类型, 图元参数, 位置, 绕Z旋转, 缩放)
+        
+        位置/旋转/缩放与运算符构建方式（create_head/create_torso/create_arm/create_leg）完全一致。
+        """
+        p = self.params
+        specs = [
+            ("Head", "Head", "sphere", {"radius": p.head_size/2},
+             (0, 0, p.total_height - p.head_size/2), 0.0, (1, 1, 1)),
+            ("Torso", "Spine", "cylinder", {"radius": p.torso_width/2, "depth": p.torso_height},
+             (0, 0, p.total_height - p.head_size - p.torso_height/2), 0.0, (1.0, 0.7, 1.0))
+        ]
+        
+        shoulder_z = p.total_height - p.head_size - 0.1
+        for side in ('left', 'right'):
+            x_multiplier = 1 if side == 'left' else -1
+            bone_side = side.capitalize()
+            upper_arm_x = p.shoulder_width/2 + p.upper_arm_length/2 * x_multiplier
+            forearm_x = p.shoulder_width/2 + p.upper_arm_length + p.forearm_length/2 * x_multiplier
+            hand_x = p.shoulder_width/2 + p.upper_arm_length + p.forearm_length + p.hand_size/2 * x_multiplier
+            specs += [
+                (f"{bone_side}_UpperArm", f"{bone_side}_UpperArm", "cylinder", {"radius": 0.04, "depth": p.upper_arm_length},
+                 (upper_arm_x, 0, shoulder_z), math.radians(90 * x_multiplier), (1, 1, 1)),
+                (f"{bone_side}_Forearm", f"{bone_side}_Forearm", "cylinder", {"radius": 0.03, "depth": p.forearm_length},
+                 (forearm_x, 0, shoulder_z), math.radians(90 * x_multiplier), (1, 1, 1)),
+                (f"{bone_side}_Hand", f"{bone_side}_Hand", "sphere", {"radius": p.hand_size/2},
+                 (hand_x, 0, shoulder_z), 0.0, (1.2, 0.8, 0.6))
+            ]
+        
+        leg_top = p.total_height - p.head_size - p.torso_height
+        for side in ('left', 'right'):
+            x_offset = p.hip_width/2 * (1 if side == 'left' else -1)
+            bone_side = side.capitalize()
+            specs += [
+                (f"{bone_side}_UpperLeg", f"{bone_side}_UpperLeg", "cylinder", {"radius": 0.05, "depth": p.upper_leg_length},
+                 (x_offset, 0, leg_top - p.upper_leg_length/2), 0.0, (1, 1, 1)),
+                (f"{bone_side}_LowerLeg", f"{bone_side}_LowerLeg", "cylinder", {"radius": 0.04, "depth": p.lower_leg_length},
+                 (x_offset, 0, leg_top - p.upper_leg_length - p.lower_leg_length/2), 0.0, (1, 1, 1)),
+                (f"{bone_side}_Foot", f"{bone_side}_Foot", "sphere", {"radius": 0.05},
+                 (x_offset, p.foot_length/4, leg_top - p.leg_length - 0.03), 0.0, (p.foot_width, p.foot_length, 0.6))
+            ]
+        return specs
+    
+    def build_body_geometry(self):
+        """生成整个身体的顶点、面和每个顶点的部位索引"""
+        vertices = []
+        faces = []
+        part_indices = []
+        self.part_names = []
+        self.part_bones = {}
+        
+        for part_index, (name, bone_name, primitive, options, location, rotation_z, scale) in enumerate(self.body_part_specs()):
+            if primitive == "sphere":
+                local_vertices, local_faces = uv_sphere_geometry(self.params.mesh_segments, self.params.mesh_rings, options["radius"])
+            else:
+                local_vertices, local_faces = cylinder_geometry(self.params.mesh_segments, options["radius"], options["depth"])
+            
+            offset = len(vertices)
+            vertices += transform_vertices(local_vertices, location, rotation_z, scale)
+            faces += [tuple(index + offset for index in face) for face in local_faces]
+            part_indices += [part_index] * len(local_vertices)
+            self.part_names.append(name)
+            self.part_bones[name] = bone_name
+        
+        return vertices, faces, part_indices
+    
+    def create_armature_data(self):
+        """数据级创建骨架对象（骨骼仍需在编辑模式中创建，只调用一次 mode_set）"""
+        armature_data = bpy.data.armatures.new(f"{self.character_name}_Armature")
+        armature = bpy.data.objects.new(f"{self.character_name}_Armature", armature_data)
+        bpy.context.scene.collection.objects.link(armature)
+        
+        bpy.context.view_layer.objects.active = armature
+        bpy.ops.object.mode_set(mode='EDIT')
+        self.create_bone_hierarchy()
+        bpy.ops.object.mode_set(mode='OBJECT')
+        
+        return armature
+    
     def create_head(self):
         """创建头部"""
         # 使用UV球体创建头部
         bpy.ops.mesh.primitive_uv_sphere_add(
+            segments=self.params.mesh_segments,
+            ring_count=self.params.mesh_rings,
             radius=self.params.head_size/2,
             location=(0, 0, self.params.total_height - self.params.head_size/2)
         )
@@ -90,6 +377,7 @@ class CharacterGenerator:
         """创建躯干"""
         # 使用圆柱体创建躯干
         bpy.ops.mesh.primitive_cylinder_add(
+            vertices=self.params.mesh_segments,
             radius=self.params.torso_width/2,
             depth=self.params.torso_height,
             location=(0, 0, self.params.total_height - self.params.head_size - self.params.torso_height/2)
@@ -110,6 +398,7 @@ class CharacterGenerator:
         # 上臂 - 水平向外延伸 (T-pose)
         upper_arm_x = self.params.shoulder_width/2 + self.params.upper_arm_length/2 * x_multiplier
         bpy.ops.mesh.primitive_cylinder_add(
+            vertices=self.params.mesh_segments,
             radius=0.04,
             depth=self.params.upper_arm_length,
             location=(upper_arm_x, 0, shoulder_z)
@@ -122,6 +411,7 @@ class CharacterGenerator:
         # 前臂 - 继续水平延伸
         forearm_x = self.params.shoulder_width/2 + self.params.upper_arm_length + self.params.forearm_length/2 * x_multiplier
         bpy.ops.mesh.primitive_cylinder_add(
+            vertices=self.params.mesh_segments,
             radius=0.03,
             depth=self.params.forearm_length,
             location=(forearm_x, 0, shoulder_z)
@@ -134,6 +424,8 @@ class CharacterGenerator:
         # 手 - 球形手掌
         hand_x = self.params.shoulder_width/2 + self.params.upper_arm_length + self.params.forearm_length + self.params.hand_size/2 * x_multiplier
         bpy.ops.mesh.primitive_uv_sphere_add(
+            segments=self.params.mesh_segments,
+            ring_count=self.params.mesh_rings,
             radius=self.params.hand_size/2,
             location=(hand_x, 0, shoulder_z)
         )
@@ -157,6 +449,7 @@ class CharacterGenerator:
         
         # 大腿
         bpy.ops.mesh.primitive_cylinder_add(
+            vertices=self.params.mesh_segments,
             radius=0.05,
             depth=self.params.upper_leg_length,
             location=(
@@ -170,6 +463,7 @@ class CharacterGenerator:
         
         # 小腿
         bpy.ops.mesh.primitive_cylinder_add(
+            vertices=self.params.mesh_segments,
             radius=0.04,
             depth=self.params.lower_leg_length,
             location=(
@@ -183,6 +477,8 @@ class CharacterGenerator:
         
         # 脚 - 椭圆形
         bpy.ops.mesh.primitive_uv_sphere_add(
+            segments=self.params.mesh_segments,
+            ring_count=self.params.mesh_rings,
             radius=0.05,
             location=(
                 x_offset,
@@ -333,9 +629,34 @@ class CharacterGenerator:
             foot_bone.head = lower_leg_bone.tail
             foot_bone.tail = Vector((x_offset, self.params.foot_length/2, lower_leg_bone.tail.z))
             foot_bone.parent = lower_leg_bone
+        
+        # 额外的脊椎细分骨骼 - 沿脊椎等分并逐级链接
+        extra_count = self.params.extra_spine_bones
+        if extra_count > 0:
+            spine_head = spine_bone.head.copy()
+            spine_tail = spine_bone.tail.copy()
+            parent_bone = spine_bone
+            for i in range(extra_count):
+                extra_bone = edit_bones.new(f'Spine_Extra_{i + 1:03d}')
+                extra_bone.head = spine_head.lerp(spine_tail, i / extra_count)
+                extra_bone.tail = spine_head.lerp(spine_tail, (i + 1) / extra_count)
+                extra_bone.parent = parent_bone
+                parent_bone = extra_bone
     
     def bind_mesh_to_armature(self, mesh, armature):
         """将网格绑定到骨骼"""
+        weight_mode = self.params.weight_mode
+        if weight_mode in ('part', 'distance'):
+            try:
+                self.bind_with_analytic_weights(mesh, armature, weight_mode)
+                return
+            except Exception as e:
+                print(f"⚠ 解析权重失败，改用自动权重: {e}")
+                mesh.vertex_groups.clear()
+                for modifier in [m for m in mesh.modifiers if m.type == 'ARMATURE']:
+                    mesh.modifiers.remove(modifier)
+                mesh.parent = None
+        
         # 确保在对象模式
         if bpy.context.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
@@ -348,6 +669,72 @@ class CharacterGenerator:
         
         # 创建父子关系并自动权重
         bpy.ops.object.parent_set(type='ARMATURE_AUTO')
+    
+    def vertex_part_bones(self, mesh):
+        """每个顶点所属部位的骨骼名；网格没有部位标记时返回None"""
+        mesh_data = mesh.data
+        attribute = mesh_data.attributes.get("part_index")
+        part_bones = mesh_data.get("part_bones")
+        if attribute is None or part_bones is None:
+            return None
+        
+        part_indices = [0] * len(mesh_data.vertices)
+        attribute.data.foreach_get('value', part_indices)
+        part_bones = list(part_bones)
+        return [part_bones[index] if 0 <= index < len(part_bones) else None for index in part_indices]
+    
+    def bind_with_analytic_weights(self, mesh, armature, weight_mode):
+        """直接计算顶点组权重并批量写入，然后添加骨架父级和修改器（不运行热扩散）"""
+        armature_world = armature.matrix_world
+        bone_segments = {
+            bone.name: (armature_world @ bone.head_local, armature_world @ bone.tail_local)
+            for bone in armature.data.bones if bone.use_deform
+        }
+        if not bone_segments:
+            raise RuntimeError("骨架没有形变骨骼")
+        
+        vertex_bones = None
+        if weight_mode == 'part':
+            vertex_bones = self.vertex_part_bones(mesh)
+            if vertex_bones is None:
+                print("⚠ 网格没有部位标记（运算符构建），改用距离权重")
+                weight_mode = 'distance'
+        
+        mesh_data = mesh.data
+        coordinates = [0.0] * (len(mesh_data.vertices) * 3)
+        mesh_data.vertices.foreach_get('co', coordinates)
+        mesh_world = mesh.matrix_world
+        
+        # (骨骼, 量化权重) -> 顶点索引列表
+        assignments = {}
+        for index in range(len(mesh_data.vertices)):
+            bone_name = vertex_bones[index] if vertex_bones else None
+            if bone_name in bone_segments:
+                assignments.setdefault((bone_name, WEIGHT_STEPS), []).append(index)
+                continue
+            
+            point = mesh_world @ Vector(coordinates[index * 3:index * 3 + 3])
+            distances = {
+                name: point_segment_distance(point, head, tail)
+                for name, (head, tail) in bone_segments.items()
+            }
+            weights = distance_weights(distances, self.params.weight_blend_distance, self.params.weight_max_influences)
+            for name, weight in weights.items():
+                steps = round(weight * WEIGHT_STEPS)
+                if steps > 0:
+                    assignments.setdefault((name, steps), []).append(index)
+        
+        # 与 ARMATURE_AUTO 一致：每根形变骨骼一个顶点组
+        vertex_groups = {name: mesh.vertex_groups.new(name=name) for name in bone_segments}
+        for (bone_name, steps), indices in assignments.items():
+            vertex_groups[bone_name].add(indices, steps / WEIGHT_STEPS, 'REPLACE')
+        
+        mesh.parent = armature
+        mesh.matrix_parent_inverse = armature_world.inverted()
+        modifier = mesh.modifiers.new(name="Armature", type='ARMATURE')
+        modifier.object = armature
+        
+        print(f"✓ 解析权重 ({weight_mode}): {len(mesh_data.vertices)} 顶点, {len(bone_segments)} 骨骼, {len(assignments)} 次批量写入")
 
 
 def create_dead_cells_character():
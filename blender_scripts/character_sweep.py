@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+角色参数扫描 - 批量生成不同比例的角色变体
+
+按参数范围（网格或随机采样）或显式的 CharacterParameters 覆盖列表展开变体，
+分块交给多个 `blender -b` 工作进程并行生成（每个进程连续生成一块变体，场景用 scene_reset 清理），
+每个变体保存为独立的 .blend / FBX，最后写出汇总清单 sweep_manifest.json。
+可选：为每个FBX变体向渲染守护进程的spool目录投递渲染任务。
+
+使用方法（普通Python即可，不需要在Blender内运行）：
+    python character_sweep.py sweep.json
+    python character_sweep.py sweep.json --workers 4 --output D:\\variants --render
+
+扫描配置格式：
+    {
+        "workers": 4,
+        "output_root": "character_variants",
+        "formats": ["blend", "fbx"],
+        "chunk_size": 10,
+        "base": {"build_mode": "data", "weight_mode": "part"},
+        "ranges": {
+            "total_height": {"min": 1.8, "max": 2.2, "steps": 3},
+            "shoulder_width": {"values": [0.28, 0.34]}
+        },
+        "samples": 0,
+        "seed": 1,
+        "variants": [
+            {"name": "Brute", "torso_width": 0.35, "shoulder_width": 0.4}
+        ],
+        "render": {"enabled": false, "spool_dir": "D:\\\\renders\\\\_spool", "render_backend": "workbench_flat"}
+    }
+
+ranges 默认展开为所有取值的组合（网格）；samples > 0 时改为在范围内随机采样 samples 个变体。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from blender_workers import BlenderWorkerPool
+
+SWEEP_SCRIPT = os.path.abspath(__file__)
+
+SUPPORTED_FORMATS = ('blend', 'fbx')
+
+DEFAULT_CHUNK_SIZE = 10
+
+
+def get_cli_value(flag, default=None):
+    """读取命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def safe_variant_name(name):
+    """变体名用作目录名/文件名时替换非法字符"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+# ----------------------------------------------------------------------
+# 变体展开（不依赖bpy）
+# ----------------------------------------------------------------------
+
+def range_values(spec):
+    """参数范围 → 取值列表：{"values": [...]} | {"min", "max", "steps"} | 直接的列表 | 单个值"""
+    if isinstance(spec, dict):
+        if 'values' in spec:
+            return list(spec['values'])
+        steps = max(1, int(spec.get('steps', 2)))
+        low = float(spec['min'])
+        high = float(spec['max'])
+        if steps == 1:
+            return [round((low + high) / 2, 6)]
+        return [round(low + (high - low) * i / (steps - 1), 6) for i in range(steps)]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def sample_value(spec, rng):
+    """在参数范围内随机取一个值"""
+    if isinstance(spec, dict) and 'values' not in spec:
+        return round(rng.uniform(float(spec['min']), float(spec['max'])), 6)
+    return rng.choice(range_values(spec))
+
+
+def expand_sweep(spec):
+    """扫描配置 → 变体列表 [{"name", "parameters"}]
+
+    每个变体的参数 = base + 范围取值（或显式覆盖）
+    """
+    base = dict(spec.get('base') or {})
+    ranges = spec.get('ranges') or {}
+    prefix = spec.get('name_prefix', 'Variant')
+    variants = []
+
+    if ranges:
+        keys = sorted(ranges.keys())
+        samples = int(spec.get('samples', 0) or 0)
+        if samples > 0:
+            rng = random.Random(spec.get('seed', 0))
+            combinations = [tuple(sample_value(ranges[key], rng) for key in keys) for _ in range(samples)]
+        else:
+            combinations = itertools.product(*(range_values(ranges[key]) for key in keys))
+
+        for values in combinations:
+            parameters = dict(base)
+            parameters.update(zip(keys, values))
+            variants.append({"name": f"{prefix}_{len(variants) + 1:03d}", "parameters": parameters})
+
+    for override in spec.get('variants') or []:
+        override = dict(override)
+        name = override.pop('name', None) or f"{prefix}_{len(variants) + 1:03d}"
+        parameters = dict(base)
+        parameters.update(override)
+        variants.append({"name": name, "parameters": parameters})
+
+    # 名称重复时追加序号，保证输出目录唯一
+    used = set()
+    for variant in variants:
+        name = safe_variant_name(variant["name"])
+        unique = name
+        index = 2
+        while unique in used:
+            unique = f"{name}_{index}"
+            index += 1
+        used.add(unique)
+        variant["name"] = unique
+
+    return variants
+
+
+# ----------------------------------------------------------------------
+# 驱动：分块提交工作进程并汇总清单
+# ----------------------------------------------------------------------
+
+def write_render_jobs(manifest_entries, render_config, output_root):
+    """为每个FBX变体向渲染守护进程的spool目录投递一个任务文件"""
+    spool_dir = render_config.get('spool_dir') or os.getenv('DEADCELLS_SPOOL_DIR')
+    if not spool_dir:
+        print("⚠ 未配置 render.spool_dir（或环境变量 DEADCELLS_SPOOL_DIR），跳过渲染任务投递")
+        return []
+
+    incoming_dir = os.path.join(spool_dir, "incoming")
+    os.makedirs(incoming_dir, exist_ok=True)
+    render_root = render_config.get('output_root') or os.path.join(output_root, "renders")
+
+    job_files = []
+    for entry in manifest_entries:
+        fbx_file = entry.get("files", {}).get("fbx")
+        if entry["status"] != "ok" or not fbx_file:
+            continue
+        job = {
+            "job_id": f"sweep_{entry['name']}",
+            "command": "render",
+            "fbx_path": fbx_file,
+            "output_path": os.path.join(render_root, entry["name"]),
+            "generate_sprite_sheets": True
+        }
+        if render_config.get('render_backend'):
+            job["render_backend"] = render_config['render_backend']
+        if render_config.get('render_limit'):
+            job["render_limit"] = render_config['render_limit']
+
+        # 先写临时文件再改名，守护进程不会读到写了一半的任务
+        job_path = os.path.join(incoming_dir, f"{job['job_id']}.json")
+        with open(job_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2, ensure_ascii=False)
+        os.replace(job_path + ".tmp", job_path)
+        job_files.append(job_path)
+
+    print(f"  ├─ 已投递 {len(job_files)} 个渲染任务到 {incoming_dir}")
+    return job_files
+
+
+def collect_variant_result(variant, variant_dir, worker_result, batch_start):
+    """读取工作进程为变体写出的 variant_result.json"""
+    entry = {
+        "name": variant["name"],
+        "parameters": variant["parameters"],
+        "status": "failed",
+        "output_dir": variant_dir,
+        "log": worker_result["log_path"] if worker_result else None
+    }
+
+    result_path = os.path.join(variant_dir, "variant_result.json")
+    if os.path.exists(result_path) and os.path.getmtime(result_path) >= batch_start:
+        with open(result_path, 'r', encoding='utf-8') as f:
+            entry.update(json.load(f))
+    elif worker_result and worker_result.get("error"):
+        entry["error"] = worker_result["error"]
+    else:
+        entry["error"] = "未生成 variant_result.json"
+
+    return entry
+
+
+def run_character_sweep(variants, output_root, formats=('blend',), workers=None, blender=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE, timeout=None, render_config=None):
+    """并行生成变体，返回清单字典
+
+    Args:
+        variants: expand_sweep 的结果，或 [{"name", "parameters"}] 形式的显式列表
+        formats: 输出格式（'blend' / 'fbx'）
+        chunk_size: 每个工作进程连续生成的变体数（分摊Blender启动开销）
+    """
+    output_root = os.path.abspath(output_root)
+    formats = [fmt for fmt in formats if fmt in SUPPORTED_FORMATS] or ['blend']
+    chunk_size = max(1, int(chunk_size or DEFAULT_CHUNK_SIZE))
+    jobs_dir = os.path.join(output_root, "jobs")
+    os.makedirs(jobs_dir, exist_ok=True)
+
+    pool = BlenderWorkerPool(
+        blender_executable=blender,
+        max_workers=workers,
+        log_dir=os.path.join(output_root, "logs"),
+        timeout=timeout
+    )
+
+    variant_dirs = {}
+    chunk_variants = {}
+    for chunk_index in range(0, len(variants), chunk_size):
+        chunk = variants[chunk_index:chunk_index + chunk_size]
+        job_name = f"chunk_{chunk_index // chunk_size + 1:03d}"
+        job_variants = []
+        for variant in chunk:
+            variant_dir = os.path.join(output_root, "variants", variant["name"])
+            os.makedirs(variant_dir, exist_ok=True)
+            variant_dirs[variant["name"]] = variant_dir
+            job_variants.append({
+                "name": variant["name"],
+                "parameters": variant["parameters"],
+                "output_dir": variant_dir,
+                "formats": formats
+            })
+
+        job_path = os.path.join(jobs_dir, f"{job_name}.json")
+        with open(job_path, 'w', encoding='utf-8') as f:
+            json.dump({"variants": job_variants}, f, indent=2, ensure_ascii=False)
+
+        chunk_variants[job_name] = chunk
+        pool.submit(job_name, SWEEP_SCRIPT, ["--worker", job_path])
+
+    print(f"📦 {len(variants)} 个变体，分为 {len(chunk_variants)} 块（每块最多 {chunk_size} 个）")
+
+    batch_start = time.time()
+    # 判断结果是否本次生成的修改时间下限；文件系统修改时间精度有限，留1秒余量
+    result_mtime_cutoff = batch_start - 1.0
+    worker_results = pool.run()
+    wall_seconds = time.time() - batch_start
+
+    entries = []
+    for worker_result in worker_results:
+        for variant in chunk_variants[worker_result["name"]]:
+            entries.append(collect_variant_result(variant, variant_dirs[variant["name"]], worker_result, result_mtime_cutoff))
+    failed = [entry for entry in entries if entry["status"] != "ok"]
+
+    manifest = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "blender": pool.blender_executable,
+        "workers": pool.max_workers,
+        "formats": formats,
+        "wall_seconds": round(wall_seconds, 3),
+        "totals": {
+            "variants": len(entries),
+            "succeeded": len(entries) - len(failed),
+            "failed": len(failed),
+            "build_seconds": round(sum(entry.get("seconds", 0) for entry in entries), 3)
+        },
+        "variants": entries
+    }
+
+    if render_config and render_config.get('enabled'):
+        if 'fbx' not in formats:
+            print("⚠ 渲染流水线只能导入FBX，formats 中没有 fbx，跳过渲染任务投递")
+        else:
+            manifest["render_jobs"] = write_render_jobs(entries, render_config, output_root)
+
+    manifest_path = os.path.join(output_root, "sweep_manifest.json")
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    totals = manifest["totals"]
+    print(f"\n📊 角色扫描摘要:")
+    print(f"  ├─ 变体: {totals['variants']} 个 (成功 {totals['succeeded']}, 失败 {totals['failed']})")
+    print(f"  ├─ 总耗时: {manifest['wall_seconds']:.1f} 秒 (生成累计 {totals['build_seconds']:.1f} 秒)")
+    for entry in failed:
+        print(f"  ├─ ❌ {entry['name']}: {entry.get('error', '未知错误')} (日志: {entry['log']})")
+    print(f"  └─ 清单: {manifest_path}")
+
+    return manifest
+
+
+# ----------------------------------------------------------------------
+# 工作进程（在 blender -b 中运行）
+# ----------------------------------------------------------------------
+
+def apply_parameters(params, overrides):
+    """把覆盖值写入 CharacterParameters，返回未知参数名列表"""
+    unknown = []
+    for key, value in overrides.items():
+        if not hasattr(params, key):
+            unknown.append(key)
+            continue
+        current = getattr(params, key)
+        # 整数参数（分段数、骨骼数）保持为整数
+        if isinstance(current, int) and not isinstance(current, bool) and isinstance(value, float):
+            value = int(round(value))
+        setattr(params, key, value)
+    return unknown
+
+
+def build_variant(variant):
+    """生成并保存单个变体，返回结果字典"""
+    import bpy
+    from character_generator import CharacterGenerator, CharacterParameters
+
+    start = time.time()
+    params = CharacterParameters()
+    unknown = apply_parameters(params, variant["parameters"])
+    if unknown:
+        print(f"⚠ {variant['name']}: 忽略未知参数 {', '.join(unknown)}")
+
+    generator = CharacterGenerator(params)
+    generator.character_name = variant["name"]
+    mesh, armature = generator.create_character()
+
+    files = {}
+    output_dir = variant["output_dir"]
+    if 'fbx' in variant["formats"]:
+        fbx_file = os.path.join(output_dir, f"{variant['name']}.fbx")
+        bpy.ops.export_scene.fbx(
+            filepath=fbx_file,
+            use_selection=False,
+            object_types={'ARMATURE', 'MESH'},
+            add_leaf_bones=False,
+            bake_anim=False
+        )
+        files["fbx"] = fbx_file
+    if 'blend' in variant["formats"]:
+        blend_file = os.path.join(output_dir, f"{variant['name']}.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_file, copy=True)
+        files["blend"] = blend_file
+
+    return {
+        "status": "ok",
+        "files": files,
+        "vertices": len(mesh.data.vertices),
+        "faces": len(mesh.data.polygons),
+        "bones": len(armature.data.bones),
+        "ignored_parameters": unknown,
+        "seconds": round(time.time() - start, 3)
+    }
+
+
+def run_worker(job_path):
+    """工作进程入口：依次生成任务文件中的所有变体，每个变体写出 variant_result.json"""
+    with open(job_path, 'r', encoding='utf-8') as f:
+        job = json.load(f)
+
+    failed = 0
+    for variant in job["variants"]:
+        print(f"\n🔧 生成变体: {variant['name']}")
+        try:
+            result = build_variant(variant)
+            print(f"  ✓ {result['vertices']} 顶点, {result['bones']} 骨骼, {result['seconds']:.2f} 秒")
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            result = {"status": "failed", "error": str(e)}
+            failed += 1
+
+        with open(os.path.join(variant["output_dir"], "variant_result.json"), 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    return failed == 0
+
+
+def main():
+    """命令行入口"""
+    worker_job = get_cli_value('--worker')
+    if worker_job:
+        sys.exit(0 if run_worker(worker_job) else 1)
+
+    sweep_file = next((arg for arg in sys.argv[1:] if arg.endswith('.json') and not arg.startswith('--')), None)
+    if not sweep_file or not os.path.exists(sweep_file):
+        print("用法: python character_sweep.py 扫描配置.json [--workers N] [--blender 路径] [--output 目录] [--chunk-size N] [--render]")
+        sys.exit(1)
+
+    sweep_file = os.path.abspath(sweep_file)
+    base_dir = os.path.dirname(sweep_file)
+    with open(sweep_file, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+
+    output_root = get_cli_value('--output', spec.get('output_root', 'character_variants'))
+    if not os.path.isabs(output_root):
+        output_root = os.path.join(base_dir, output_root)
+
+    render_config = dict(spec.get('render') or {})
+    if '--render' in sys.argv:
+        render_config['enabled'] = True
+
+    workers = get_cli_value('--workers', spec.get('workers'))
+    timeout = get_cli_value('--timeout', spec.get('timeout'))
+    variants = expand_sweep(spec)
+
+    print("=" * 60)
+    print("🔧 角色参数扫描")
+    print("=" * 60)
+    print(f"扫描配置: {sweep_file} ({len(variants)} 个变体)")
+    if not variants:
+        print("❌ 没有变体：请配置 ranges 或 variants")
+        sys.exit(1)
+
+    manifest = run_character_sweep(
+        variants,
+        output_root,
+        formats=spec.get('formats', ['blend']),
+        workers=int(workers) if workers else None,
+        blender=get_cli_value('--blender', spec.get('blender')),
+        chunk_size=int(get_cli_value('--chunk-size', spec.get('chunk_size', DEFAULT_CHUNK_SIZE))),
+        timeout=float(timeout) if timeout else None,
+        render_config=render_config
+    )
+
+    if manifest["totals"]["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,23 @@ import bpy
 import bmesh
 import mathutils
 from mathutils import Vector
+import os
+import sys
+
+# 同目录的共用模块（在Blender文本编辑器中运行时可能不可用）
+try:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from scene_reset import reset_scene
+except (ImportError, NameError):
+    reset_scene = None
 
 def clear_scene():
     """清空场景中的所有对象"""
+    if reset_scene is not None:
+        reset_scene(verbose=False)
+        print("✓ 场景已清空")
+        return
+    
     # 确保处于对象模式
     if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
         bpy.ops.object.mode_set(mode='OBJECT')
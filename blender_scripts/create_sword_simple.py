@@ -8,9 +8,23 @@ Dead Cells - 简化版剑模型生成器
 import bpy
 import mathutils
 from mathutils import Vector
+import os
+import sys
+
+# 同目录的共用模块（在Blender文本编辑器中运行时可能不可用）
+try:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from scene_reset import reset_scene
+except (ImportError, NameError):
+    reset_scene = None
 
 def clear_scene():
     """清空场景中的所有对象"""
+    if reset_scene is not None:
+        reset_scene(verbose=False)
+        print("✓ 场景已清空")
+        return
+    
     # 确保处于对象模式
     if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
         bpy.ops.object.mode_set(mode='OBJECT')
@@ -272,9 +286,19 @@ def setup_camera_and_lighting():
 def set_render_settings():
     """设置渲染参数以获得更好的预览"""
     scene = bpy.context.scene
-    scene.render.engine = 'EEVEE'  # 使用EEVEE渲染器，速度更快
-    scene.eevee.use_bloom = True   # 开启光晕效果
-    scene.eevee.use_ssr = True     # 开启屏幕空间反射
+    
+    # 使用EEVEE渲染器，速度更快（不同Blender版本的引擎标识不同）
+    available_engines = [item.identifier for item in scene.render.bl_rna.properties['engine'].enum_items]
+    for engine in ('BLENDER_EEVEE_NEXT', 'BLENDER_EEVEE', 'EEVEE'):
+        if engine in available_engines:
+            scene.render.engine = engine
+            break
+    
+    # 光晕和屏幕空间反射（Blender 4.2+ 的EEVEE已移除这两个选项）
+    if hasattr(scene.eevee, 'use_bloom'):
+        scene.eevee.use_bloom = True
+    if hasattr(scene.eevee, 'use_ssr'):
+        scene.eevee.use_ssr = True
     
     print("✓ 渲染设置完成")
 
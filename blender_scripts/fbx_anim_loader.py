@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FBX动画曲线加载器 - 只读取动画曲线，直接生成模型骨骼的动作
+
+与 bpy.ops.import_scene.fbx 不同，这里不创建临时骨骼、网格、材质或贴图：
+用 fbx_inspector 读取 AnimationStack → AnimationCurveNode → AnimationCurve，
+按骨骼名称匹配到已导入的模型骨骼，计算 pose 通道后直接写入新动作。
+
+前提（与 FBXMerger 的模型导入设置一致）：
+- automatic_bone_orientation=False，primary/secondary 骨骼轴为 Y/X（骨骼矩阵即FBX节点矩阵）
+- use_prepost_rot=True（PreRotation/PostRotation 计入局部变换）
+
+在Blender中使用：
+    loader = FBXAnimationLoader(model_armature, frame_offset=1.0)
+    actions = loader.load(r"F:\\Animations\\HumanM@Run.fbx")
+"""
+
+import os
+import bisect
+import math
+
+import bpy
+from mathutils import Matrix, Euler
+
+from fbx_inspector import FBXInspector, FBX_KTIME
+
+# FBX RotationOrder 枚举 → Blender欧拉顺序（6为球面XYZ，按XYZ处理）
+FBX_ROTATION_ORDERS = {0: 'XYZ', 1: 'XZY', 2: 'YZX', 3: 'YXZ', 4: 'ZXY', 5: 'ZYX', 6: 'XYZ'}
+
+FBX_TRANSFORM_PROPERTIES = ('Lcl Translation', 'Lcl Rotation', 'Lcl Scaling')
+
+# 关键帧线性插值的枚举值（foreach_set 需要整数）
+LINEAR_INTERPOLATION = bpy.types.Keyframe.bl_rna.properties['interpolation'].enum_items['LINEAR'].value
+
+
+def evaluate_channel(channel, times):
+    """在指定KTime上对通道做线性插值；没有曲线时返回默认值"""
+    key_times = channel["times"]
+    key_values = channel["values"]
+    if not key_times or not key_values:
+        return [channel["default"]] * len(times)
+
+    values = []
+    last = len(key_times) - 1
+    for time_value in times:
+        index = bisect.bisect_left(key_times, time_value)
+        if index <= 0:
+            values.append(key_values[0])
+        elif index > last:
+            values.append(key_values[last])
+        elif key_times[index] == time_value:
+            values.append(key_values[index])
+        else:
+            t0, t1 = key_times[index - 1], key_times[index]
+            v0, v1 = key_values[index - 1], key_values[index]
+            values.append(v0 + (v1 - v0) * (time_value - t0) / (t1 - t0))
+    return values
+
+
+def euler_degrees_matrix(values, order='XYZ'):
+    """角度制欧拉角转4x4旋转矩阵"""
+    return Euler([math.radians(v) for v in values], order).to_matrix().to_4x4()
+
+
+class FBXAnimationLoader:
+    """从FBX动画曲线直接生成模型骨骼动作"""
+
+    def __init__(self, armature_obj, frame_offset=1.0):
+        self.armature_obj = armature_obj
+        self.frame_offset = frame_offset
+        self.bones = armature_obj.data.bones
+        self.pose_bones = armature_obj.pose.bones
+
+        # 骨骼在父骨骼空间中的静止矩阵的逆（rest_local⁻¹），每个骨骼只计算一次
+        self.rest_local_inverse = {}
+        for bone in self.bones:
+            rest_local = bone.matrix_local
+            if bone.parent:
+                rest_local = bone.parent.matrix_local.inverted() @ rest_local
+            self.rest_local_inverse[bone.name] = rest_local.inverted()
+
+        # 匹配统计（最近一次load）
+        self.matched_bones = set()
+        self.unmatched_models = set()
+
+    def resolve_bone_name(self, model_name):
+        """FBX Model名称 → 模型骨骼名称：先精确匹配，再去掉命名空间前缀（如 mixamorig:）"""
+        if model_name in self.bones:
+            return model_name
+        if ':' in model_name:
+            short_name = model_name.rsplit(':', 1)[1]
+            if short_name in self.bones:
+                return short_name
+        return None
+
+    def load(self, fbx_path):
+        """读取文件中的所有动画片段，返回新建的动作列表"""
+        self.matched_bones = set()
+        self.unmatched_models = set()
+        actions = []
+
+        with FBXInspector(fbx_path) as fbx:
+            fps = fbx.frame_rate()
+            for stack in fbx.objects_of_type('AnimationStack'):
+                stack_name = fbx.object_name(stack) or os.path.splitext(os.path.basename(fbx_path))[0]
+                channels_by_model = fbx.stack_channels(stack)
+                action = self.build_action(fbx, stack_name, channels_by_model, fps)
+                if action is not None:
+                    actions.append(action)
+
+        return actions
+
+    def build_action(self, fbx, action_name, channels_by_model, fps):
+        """为一个动画片段创建动作"""
+        action = None
+        for model_name, channels in channels_by_model.items():
+            bone_name = self.resolve_bone_name(model_name)
+            if bone_name is None:
+                self.unmatched_models.add(model_name)
+                continue
+
+            keyed = self.evaluate_bone(fbx, bone_name, channels)
+            if keyed is None:
+                continue
+
+            if action is None:
+                action = bpy.data.actions.new(name=action_name)
+            frames = [time_value / FBX_KTIME * fps + self.frame_offset for time_value in keyed["times"]]
+            self.write_bone_curves(action, bone_name, frames, keyed)
+            self.matched_bones.add(bone_name)
+
+        return action
+
+    def evaluate_bone(self, fbx, bone_name, channels):
+        """计算骨骼在每个关键帧时间上的pose通道值（location / rotation / scale）"""
+        key_times = set()
+        for property_name in FBX_TRANSFORM_PROPERTIES:
+            for channel in channels.get(property_name, {}).values():
+                if channel["times"]:
+                    key_times.update(channel["times"])
+        if not key_times:
+            return None
+        times = sorted(key_times)
+
+        static = fbx.model_transform(channels["model"])
+        rotation_order = FBX_ROTATION_ORDERS.get(static["rotation_order"], 'XYZ')
+        pre_rotation = euler_degrees_matrix(static["pre_rotation"])
+        post_rotation_inverse = euler_degrees_matrix(static["post_rotation"]).inverted()
+        rest_inverse = self.rest_local_inverse[bone_name]
+
+        def sample(property_name, static_values):
+            # 没有曲线节点的属性使用Model上的静态值
+            if property_name not in channels:
+                return [[value] * len(times) for value in static_values]
+            return [evaluate_channel(channels[property_name][axis], times) for axis in ('X', 'Y', 'Z')]
+
+        translation = sample('Lcl Translation', static["translation"])
+        rotation = sample('Lcl Rotation', static["rotation"])
+        scaling = sample('Lcl Scaling', static["scaling"])
+
+        pose_bone = self.pose_bones[bone_name]
+        rotation_mode = pose_bone.rotation_mode
+        result = {"times": times, "location": [], "rotation": [], "scale": [], "rotation_mode": rotation_mode}
+
+        previous_quaternion = None
+        previous_euler = None
+        for i in range(len(times)):
+            # FBX局部矩阵: T * Rpre * R * Rpost⁻¹ * S（忽略旋转/缩放枢轴偏移）
+            local = (
+                Matrix.Translation((translation[0][i], translation[1][i], translation[2][i]))
+                @ pre_rotation
+                @ euler_degrees_matrix((rotation[0][i], rotation[1][i], rotation[2][i]), rotation_order)
+                @ post_rotation_inverse
+                @ Matrix.Diagonal((scaling[0][i], scaling[1][i], scaling[2][i], 1.0))
+            )
+            location, quaternion, scale = (rest_inverse @ local).decompose()
+            result["location"].append(location)
+            result["scale"].append(scale)
+
+            if rotation_mode == 'QUATERNION':
+                # 保持四元数符号连续，避免插值绕远路
+                if previous_quaternion is not None and previous_quaternion.dot(quaternion) < 0:
+                    quaternion.negate()
+                previous_quaternion = quaternion
+                result["rotation"].append(quaternion)
+            elif rotation_mode == 'AXIS_ANGLE':
+                axis, angle = quaternion.to_axis_angle()
+                result["rotation"].append((angle, axis[0], axis[1], axis[2]))
+            else:
+                euler = quaternion.to_euler(rotation_mode, previous_euler) if previous_euler else quaternion.to_euler(rotation_mode)
+                previous_euler = euler
+                result["rotation"].append(euler)
+
+        return result
+
+    def write_bone_curves(self, action, bone_name, frames, keyed):
+        """用 foreach_set 批量写入骨骼的关键帧"""
+        rotation_paths = {
+            'QUATERNION': 'rotation_quaternion',
+            'AXIS_ANGLE': 'rotation_axis_angle'
+        }
+        rotation_path = rotation_paths.get(keyed["rotation_mode"], 'rotation_euler')
+        bone_path = f'pose.bones["{bone_name}"]'
+
+        channel_sets = [
+            ('location', keyed["location"], 3),
+            (rotation_path, keyed["rotation"], 4 if rotation_path != 'rotation_euler' else 3),
+            ('scale', keyed["scale"], 3)
+        ]
+
+        for property_name, samples, size in channel_sets:
+            for index in range(size):
+                fcurve = action.fcurves.new(data_path=f"{bone_path}.{property_name}", index=index, action_group=bone_name)
+                fcurve.keyframe_points.add(len(frames))
+                coordinates = []
+                for frame, sample_value in zip(frames, samples):
+                    coordinates += (frame, sample_value[index])
+                fcurve.keyframe_points.foreach_set('co', coordinates)
+                fcurve.keyframe_points.foreach_set('interpolation', [LINEAR_INTERPOLATION] * len(frames))
+                fcurve.update()
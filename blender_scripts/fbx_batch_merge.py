@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FBX批量合并驱动 - 多个角色并行合并
+
+读取任务列表，每个任务（模型 + 动画 + 输出）在独立的 `blender -b` 工作进程中
+运行 fbx_merge_blender.py，并发数有上限。收集每个任务的 merge_report.json，
+生成包含耗时和失败信息的汇总报告 batch_report.json。
+
+使用方法（普通Python即可，不需要在Blender内运行）：
+    python fbx_batch_merge.py batch_tasks.json
+    python fbx_batch_merge.py batch_tasks.json --workers 4 --blender "C:\\Program Files\\Blender Foundation\\Blender 4.2\\blender.exe"
+
+任务列表格式：
+    {
+        "workers": 3,
+        "output_root": "F:\\\\merged_batch",
+        "base_config": "fbx_merge_config.json",
+        "timeout": 1800,
+        "tasks": [
+            {
+                "name": "Male",
+                "model": "F:\\\\ArtAssets\\\\Male\\\\Male_Model.fbx",
+                "animations": ["F:\\\\ArtAssets\\\\Male\\\\Animations\\\\*.fbx"],
+                "output": "Male_Merged.fbx"
+            }
+        ]
+    }
+"""
+
+import os
+import sys
+import json
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from blender_workers import BlenderWorkerPool
+
+MERGE_SCRIPT = os.path.join(SCRIPT_DIR, "fbx_merge_blender.py")
+
+
+def get_cli_value(flag, default=None):
+    """读取命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def resolve_path(path, base_dir):
+    """相对路径以任务列表所在目录为基准"""
+    if not path:
+        return path
+    if os.path.isabs(path):
+        return os.path.normpath(path)
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def load_base_config(base_config_path):
+    """读取合并设置模板（settings / fbx_import_settings / fbx_export_settings）"""
+    if base_config_path and os.path.exists(base_config_path):
+        with open(base_config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def safe_task_name(name):
+    """任务名用作目录名时替换非法字符"""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def build_task_config(task, base_config, task_dir, base_dir):
+    """为单个任务生成 fbx_merge_blender.py 使用的配置"""
+    animations = task.get('animations') or []
+    if isinstance(animations, str):
+        animations = [animations]
+    if task.get('animation'):
+        animations = [task['animation']] + list(animations)
+    animations = [resolve_path(path, base_dir) for path in animations]
+
+    config = dict(base_config)
+    config['model_path'] = resolve_path(task['model'], base_dir)
+    config['animation_path'] = animations[0] if animations else ""
+    config['animation_paths'] = animations
+    config['output_path'] = task_dir
+    config['output_filename'] = task.get('output') or f"{safe_task_name(task['name'])}_Merged.fbx"
+    return config
+
+
+def collect_task_result(task_name, worker_result, task_dir, batch_start=None):
+    """合并工作进程结果和该任务的 merge_report.json
+
+    Args:
+        batch_start: 本次批处理开始时间；早于该时间写入的报告是上次运行留下的，不计为成功
+    """
+    entry = {
+        "name": task_name,
+        "status": worker_result["status"],
+        "returncode": worker_result["returncode"],
+        "seconds": worker_result["seconds"],
+        "log": worker_result["log_path"]
+    }
+    if worker_result.get("error"):
+        entry["error"] = worker_result["error"]
+
+    report_path = os.path.join(task_dir, "merge_report.json")
+    report_is_fresh = os.path.exists(report_path) and (batch_start is None or os.path.getmtime(report_path) >= batch_start)
+    if report_is_fresh:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            merge_report = json.load(f)
+        statistics = merge_report.get("statistics", {})
+        entry["skipped"] = merge_report.get("status") == "up_to_date"
+        entry["output_file"] = merge_report.get("output_file")
+        entry["imported_animations"] = statistics.get("imported_animations", 0)
+        entry["failed_animation_files"] = [
+            {"path": r["path"], "error": r.get("error")}
+            for r in merge_report.get("animation_files", [])
+            if r.get("status") == "failed"
+        ]
+    elif entry["status"] == "ok":
+        # 进程正常退出但本次没有写入报告，视为失败
+        entry["status"] = "failed"
+        entry["error"] = "未生成 merge_report.json"
+
+    return entry
+
+
+def run_batch_merge(tasks, output_root, workers=None, blender=None, base_config=None, timeout=None, base_dir=None, force=False):
+    """运行批量合并，返回汇总报告字典
+
+    输入未变化的任务由 fbx_merge_blender.py 自行跳过（force=True 时全部重新合并）
+    """
+    base_dir = base_dir or os.getcwd()
+    output_root = os.path.abspath(output_root)
+    os.makedirs(output_root, exist_ok=True)
+
+    pool = BlenderWorkerPool(
+        blender_executable=blender,
+        max_workers=workers,
+        log_dir=os.path.join(output_root, "logs"),
+        timeout=timeout
+    )
+
+    task_dirs = {}
+    for task in tasks:
+        name = task['name']
+        task_dir = resolve_path(task.get('output_dir'), base_dir) or os.path.join(output_root, safe_task_name(name))
+        os.makedirs(task_dir, exist_ok=True)
+
+        # 上次的 merge_report.json 保留给最新检查使用；是否本次生成按修改时间判断
+        config_path = os.path.join(task_dir, "merge_task_config.json")
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(build_task_config(task, base_config or {}, task_dir, base_dir), f, indent=2, ensure_ascii=False)
+
+        task_dirs[name] = task_dir
+        pool.submit(name, MERGE_SCRIPT, ["--config", config_path] + (["--force"] if force else []))
+
+    batch_start = time.time()
+    # 判断报告是否本次生成的修改时间下限；文件系统修改时间精度有限，留1秒余量
+    report_mtime_cutoff = batch_start - 1.0
+    worker_results = pool.run()
+    wall_seconds = time.time() - batch_start
+
+    task_entries = [
+        collect_task_result(result["name"], result, task_dirs[result["name"]], report_mtime_cutoff)
+        for result in worker_results
+    ]
+    failed = [entry for entry in task_entries if entry["status"] != "ok"]
+
+    batch_report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "blender": pool.blender_executable,
+        "workers": pool.max_workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "totals": {
+            "tasks": len(task_entries),
+            "succeeded": len(task_entries) - len(failed),
+            "skipped_up_to_date": len([entry for entry in task_entries if entry.get("skipped")]),
+            "failed": len(failed),
+            "animations_merged": sum(entry.get("imported_animations", 0) for entry in task_entries),
+            "worker_seconds": round(sum(entry["seconds"] for entry in task_entries), 3)
+        },
+        "tasks": task_entries
+    }
+
+    report_path = os.path.join(output_root, "batch_report.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(batch_report, f, indent=2, ensure_ascii=False)
+
+    totals = batch_report["totals"]
+    print(f"\n📊 批量合并摘要:")
+    print(f"  ├─ 任务: {totals['tasks']} 个 (成功 {totals['succeeded']}, 其中已是最新 {totals['skipped_up_to_date']}, 失败 {totals['failed']})")
+    print(f"  ├─ 合并动画: {totals['animations_merged']} 个")
+    print(f"  ├─ 总耗时: {batch_report['wall_seconds']:.1f} 秒 (工作进程累计 {totals['worker_seconds']:.1f} 秒)")
+    for entry in failed:
+        print(f"  ├─ ❌ {entry['name']}: {entry.get('error', '退出码 ' + str(entry['returncode']))} (日志: {entry['log']})")
+    print(f"  └─ 汇总报告: {report_path}")
+
+    return batch_report
+
+
+def main():
+    """命令行入口"""
+    task_file = next((arg for arg in sys.argv[1:] if arg.endswith('.json') and not arg.startswith('--')), None)
+    if not task_file or not os.path.exists(task_file):
+        print("用法: python fbx_batch_merge.py 任务列表.json [--workers N] [--blender 路径] [--output 目录] [--force]")
+        sys.exit(1)
+
+    task_file = os.path.abspath(task_file)
+    base_dir = os.path.dirname(task_file)
+    with open(task_file, 'r', encoding='utf-8') as f:
+        batch = json.load(f)
+
+    # 任务列表可以直接是数组
+    if isinstance(batch, list):
+        batch = {"tasks": batch}
+
+    workers = get_cli_value('--workers', batch.get('workers'))
+    timeout = get_cli_value('--timeout', batch.get('timeout'))
+    output_root = resolve_path(get_cli_value('--output', batch.get('output_root', 'merged_batch')), base_dir)
+    base_config_path = resolve_path(batch.get('base_config', os.path.join(SCRIPT_DIR, "fbx_merge_config.json")), base_dir)
+
+    print("=" * 60)
+    print("🔧 FBX批量合并")
+    print("=" * 60)
+    print(f"任务列表: {task_file} ({len(batch.get('tasks', []))} 个任务)")
+
+    report = run_batch_merge(
+        batch.get('tasks', []),
+        output_root,
+        workers=int(workers) if workers else None,
+        blender=get_cli_value('--blender', batch.get('blender')),
+        base_config=load_base_config(base_config_path),
+        timeout=float(timeout) if timeout else None,
+        base_dir=base_dir,
+        force='--force' in sys.argv
+    )
+
+    if report["totals"]["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,754 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+二进制FBX检查器 - 无需启动Blender即可读取FBX内容
+
+纯Python实现、零依赖的二进制FBX（7.x）节点读取器：
+- 使用 mmap 读取文件，节点树只解析属性头
+- 数组属性（顶点、关键帧等）在真正需要时才解压
+- 列出 Take / AnimationStack 帧范围、骨骼（LimbNode）名称和网格统计
+
+使用方法（普通Python即可）：
+    python fbx_inspector.py 模型.fbx 动画.fbx
+    python fbx_inspector.py 动画.fbx --json
+    python fbx_inspector.py --plan fbx_merge_config.json     # 合并预演，不导入任何文件
+
+作为模块使用：
+    with FBXInspector(path) as fbx:
+        print(fbx.animation_stacks())
+        print(fbx.bone_names())
+"""
+
+import os
+import sys
+import json
+import glob
+import mmap
+import zlib
+import array
+import struct
+from collections import defaultdict
+
+
+FBX_BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+FBX_HEADER_SIZE = 27
+
+# FBX时间单位：1秒 = 46186158000 KTime
+FBX_KTIME = 46186158000
+
+# GlobalSettings.TimeMode 枚举对应的帧率（14为自定义帧率，0为默认）
+FBX_TIME_MODES = {
+    1: 120.0,
+    2: 100.0,
+    3: 60.0,
+    4: 50.0,
+    5: 48.0,
+    6: 30.0,
+    7: 30.0,
+    8: 30.0 / 1.001,
+    9: 30.0 / 1.001,
+    10: 25.0,
+    11: 24.0,
+    12: 1000.0,
+    13: 24.0 / 1.001,
+    15: 96.0,
+    16: 72.0,
+    17: 60.0 / 1.001,
+    18: 120.0 / 1.001
+}
+FBX_DEFAULT_FRAME_RATE = 30.0
+
+# 数组属性类型 → array模块类型码
+ARRAY_TYPECODES = {'f': 'f', 'd': 'd', 'l': 'q', 'i': 'i', 'b': 'B'}
+
+# 标量属性类型 → (struct格式, 字节数)
+SCALAR_FORMATS = {
+    'Y': ('<h', 2),
+    'C': ('<?', 1),
+    'I': ('<i', 4),
+    'F': ('<f', 4),
+    'D': ('<d', 8),
+    'L': ('<q', 8)
+}
+
+
+class FBXArray:
+    """延迟解压的数组属性，调用 values() 时才读取数据"""
+
+    __slots__ = ('buffer', 'offset', 'type_code', 'length', 'encoding', 'data_length', 'cached_values')
+
+    def __init__(self, buffer, offset, type_code, length, encoding, data_length):
+        self.buffer = buffer
+        self.offset = offset
+        self.type_code = type_code
+        self.length = length
+        self.encoding = encoding
+        self.data_length = data_length
+        self.cached_values = None
+
+    def __len__(self):
+        return self.length
+
+    def values(self):
+        """解压并返回 array.array"""
+        if self.cached_values is None:
+            raw = self.buffer[self.offset:self.offset + self.data_length]
+            if self.encoding == 1:
+                raw = zlib.decompress(raw)
+            values = array.array(ARRAY_TYPECODES[self.type_code])
+            values.frombytes(raw)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            self.cached_values = values
+        return self.cached_values
+
+
+class FBXNode:
+    """FBX节点：名称、属性列表、子节点"""
+
+    __slots__ = ('name', 'properties', 'children')
+
+    def __init__(self, name, properties, children):
+        self.name = name
+        self.properties = properties
+        self.children = children
+
+    def find(self, name):
+        """第一个同名子节点"""
+        for child in self.children:
+            if child.name == name:
+                return child
+        return None
+
+    def find_all(self, name):
+        """所有同名子节点"""
+        return [child for child in self.children if child.name == name]
+
+    def property(self, index, default=None):
+        """按索引读取属性"""
+        return self.properties[index] if index < len(self.properties) else default
+
+    def __repr__(self):
+        return f"FBXNode({self.name}, {len(self.properties)} props, {len(self.children)} children)"
+
+
+def split_object_name(raw_name):
+    """FBX对象名格式为 "名称\\x00\\x01类名"，返回 (名称, 类名)"""
+    if isinstance(raw_name, bytes):
+        raw_name = raw_name.decode('utf-8', 'replace')
+    if '\x00\x01' in raw_name:
+        name, class_name = raw_name.split('\x00\x01', 1)
+        return name, class_name
+    return raw_name, ""
+
+
+class FBXInspector:
+    """二进制FBX文件检查器"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法mmap
+            self.file.close()
+            raise ValueError(f"不是有效的FBX文件（空文件）: {path}")
+
+        if self.buffer[:len(FBX_BINARY_MAGIC)] != FBX_BINARY_MAGIC:
+            self.close()
+            raise ValueError(f"不是二进制FBX文件（可能是ASCII FBX）: {path}")
+
+        self.version = struct.unpack_from('<I', self.buffer, 23)[0]
+        self.wide_headers = self.version >= 7500
+        self.nodes = self.read_top_level_nodes()
+
+        # 对象与连接索引
+        self.objects = {}
+        self.children_of = defaultdict(list)   # 父ID -> [(子ID, 属性名)]
+        self.parents_of = defaultdict(list)    # 子ID -> [(父ID, 属性名)]
+        self.build_indexes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """释放mmap和文件句柄（已解压的数组仍可使用）"""
+        if getattr(self, 'buffer', None) is not None:
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass
+            self.buffer = None
+        if getattr(self, 'file', None) is not None:
+            self.file.close()
+            self.file = None
+
+    # ------------------------------------------------------------------
+    # 底层节点读取
+    # ------------------------------------------------------------------
+
+    def read_top_level_nodes(self):
+        """读取顶层节点列表"""
+        nodes = []
+        offset = FBX_HEADER_SIZE
+        size = len(self.buffer)
+        while offset < size:
+            node, offset = self.read_node(offset)
+            if node is None:
+                break
+            nodes.append(node)
+        return nodes
+
+    def read_node(self, offset):
+        """读取一个节点记录，返回 (节点, 下一个偏移)；遇到空记录时节点为None"""
+        buffer = self.buffer
+        if self.wide_headers:
+            end_offset, property_count, _ = struct.unpack_from('<QQQ', buffer, offset)
+            offset += 24
+        else:
+            end_offset, property_count, _ = struct.unpack_from('<III', buffer, offset)
+            offset += 12
+
+        name_length = buffer[offset]
+        offset += 1
+        if end_offset == 0:
+            return None, offset + name_length
+
+        name = buffer[offset:offset + name_length].decode('ascii', 'replace')
+        offset += name_length
+
+        properties, offset = self.read_properties(offset, property_count)
+
+        children = []
+        while offset < end_offset:
+            child, offset = self.read_node(offset)
+            if child is None:
+                break
+            children.append(child)
+
+        return FBXNode(name, properties, children), end_offset
+
+    def read_properties(self, offset, count):
+        """读取节点属性，数组属性只记录位置不解压"""
+        buffer = self.buffer
+        properties = []
+        for _ in range(count):
+            type_code = chr(buffer[offset])
+            offset += 1
+
+            if type_code in SCALAR_FORMATS:
+                fmt, size = SCALAR_FORMATS[type_code]
+                properties.append(struct.unpack_from(fmt, buffer, offset)[0])
+                offset += size
+            elif type_code in ARRAY_TYPECODES:
+                length, encoding, data_length = struct.unpack_from('<III', buffer, offset)
+                offset += 12
+                properties.append(FBXArray(buffer, offset, type_code, length, encoding, data_length))
+                offset += data_length
+            elif type_code in ('S', 'R'):
+                length = struct.unpack_from('<I', buffer, offset)[0]
+                offset += 4
+                raw = buffer[offset:offset + length]
+                properties.append(raw.decode('utf-8', 'replace') if type_code == 'S' else raw)
+                offset += length
+            else:
+                raise ValueError(f"未知的FBX属性类型 '{type_code}'（偏移 {offset - 1}）")
+        return properties, offset
+
+    # ------------------------------------------------------------------
+    # 索引与通用查询
+    # ------------------------------------------------------------------
+
+    def top(self, name):
+        """按名称查找顶层节点"""
+        for node in self.nodes:
+            if node.name == name:
+                return node
+        return None
+
+    def build_indexes(self):
+        """建立对象ID索引和连接关系"""
+        objects_node = self.top('Objects')
+        if objects_node:
+            for node in objects_node.children:
+                if node.properties and isinstance(node.properties[0], int):
+                    self.objects[node.properties[0]] = node
+
+        connections_node = self.top('Connections')
+        if connections_node:
+            for connection in connections_node.find_all('C'):
+                child_id = connection.property(1)
+                parent_id = connection.property(2)
+                property_name = connection.property(3)
+                self.children_of[parent_id].append((child_id, property_name))
+                self.parents_of[child_id].append((parent_id, property_name))
+
+    def objects_of_type(self, node_name):
+        """指定节点类型的所有对象（如 Model / Geometry / AnimationStack）"""
+        return [node for node in self.objects.values() if node.name == node_name]
+
+    def object_name(self, node):
+        """对象名称（去掉类名后缀）"""
+        return split_object_name(node.property(1, ""))[0]
+
+    def properties70(self, node):
+        """读取 Properties70 为 {属性名: 值列表}"""
+        result = {}
+        properties_node = node.find('Properties70') if node else None
+        if properties_node:
+            for entry in properties_node.find_all('P'):
+                if entry.properties:
+                    result[entry.properties[0]] = entry.properties[4:]
+        return result
+
+    def child_objects(self, object_id, node_name=None):
+        """通过连接关系查找子对象"""
+        children = []
+        for child_id, _ in self.children_of.get(object_id, []):
+            child = self.objects.get(child_id)
+            if child is not None and (node_name is None or child.name == node_name):
+                children.append(child)
+        return children
+
+    def parent_objects(self, object_id, node_name=None):
+        """通过连接关系查找父对象"""
+        parents = []
+        for parent_id, _ in self.parents_of.get(object_id, []):
+            parent = self.objects.get(parent_id)
+            if parent is not None and (node_name is None or parent.name == node_name):
+                parents.append(parent)
+        return parents
+
+    # ------------------------------------------------------------------
+    # 全局设置
+    # ------------------------------------------------------------------
+
+    def frame_rate(self):
+        """文件帧率（GlobalSettings.TimeMode / CustomFrameRate）"""
+        settings = self.properties70(self.top('GlobalSettings'))
+        time_mode = settings.get('TimeMode', [0])[0]
+        custom_rate = settings.get('CustomFrameRate', [0.0])[0]
+
+        if time_mode in FBX_TIME_MODES:
+            return FBX_TIME_MODES[time_mode]
+        if custom_rate and custom_rate > 0:
+            return float(custom_rate)
+        return FBX_DEFAULT_FRAME_RATE
+
+    def creator(self):
+        """导出该文件的软件"""
+        creator_node = self.top('Creator')
+        if creator_node:
+            return creator_node.property(0, "")
+        header = self.top('FBXHeaderExtension')
+        creator_node = header.find('Creator') if header else None
+        return creator_node.property(0, "") if creator_node else ""
+
+    def ktime_to_frame(self, ktime, fps=None):
+        """KTime转帧号"""
+        return ktime / FBX_KTIME * (fps or self.frame_rate())
+
+    # ------------------------------------------------------------------
+    # 动画
+    # ------------------------------------------------------------------
+
+    def takes(self):
+        """Takes节中的动画片段及时间范围"""
+        fps = self.frame_rate()
+        result = []
+        takes_node = self.top('Takes')
+        if not takes_node:
+            return result
+        for take in takes_node.find_all('Take'):
+            local_time = take.find('LocalTime')
+            entry = {"name": take.property(0, "")}
+            if local_time and len(local_time.properties) >= 2:
+                start, stop = local_time.properties[0], local_time.properties[1]
+                entry["start_frame"] = round(self.ktime_to_frame(start, fps), 3)
+                entry["end_frame"] = round(self.ktime_to_frame(stop, fps), 3)
+            result.append(entry)
+        return result
+
+    def stack_curve_range(self, stack_id):
+        """从动画曲线关键帧计算AnimationStack的KTime范围（需要解压KeyTime数组）"""
+        min_time = None
+        max_time = None
+        for layer in self.child_objects(stack_id, 'AnimationLayer'):
+            for curve_node in self.child_objects(layer.properties[0], 'AnimationCurveNode'):
+                for curve in self.child_objects(curve_node.properties[0], 'AnimationCurve'):
+                    key_time = curve.find('KeyTime')
+                    if not key_time or not key_time.properties:
+                        continue
+                    times = key_time.properties[0].values()
+                    if len(times):
+                        min_time = times[0] if min_time is None else min(min_time, times[0])
+                        max_time = times[-1] if max_time is None else max(max_time, times[-1])
+        return min_time, max_time
+
+    def animation_stacks(self, use_curves_fallback=True):
+        """AnimationStack列表及帧范围"""
+        fps = self.frame_rate()
+        take_ranges = {take["name"]: take for take in self.takes()}
+        stacks = []
+
+        for stack in self.objects_of_type('AnimationStack'):
+            name = self.object_name(stack)
+            props = self.properties70(stack)
+            entry = {"name": name, "layers": len(self.child_objects(stack.properties[0], 'AnimationLayer'))}
+
+            start = props.get('LocalStart', [None])[0]
+            stop = props.get('LocalStop', [None])[0]
+            source = "LocalTime"
+            if start is None or stop is None:
+                start = props.get('ReferenceStart', [None])[0]
+                stop = props.get('ReferenceStop', [None])[0]
+                source = "ReferenceTime"
+
+            if start is not None and stop is not None:
+                entry["start_frame"] = round(self.ktime_to_frame(start, fps), 3)
+                entry["end_frame"] = round(self.ktime_to_frame(stop, fps), 3)
+            elif name in take_ranges and "start_frame" in take_ranges[name]:
+                entry["start_frame"] = take_ranges[name]["start_frame"]
+                entry["end_frame"] = take_ranges[name]["end_frame"]
+                source = "Take"
+            elif use_curves_fallback:
+                start, stop = self.stack_curve_range(stack.properties[0])
+                source = "AnimationCurve"
+                if start is not None:
+                    entry["start_frame"] = round(self.ktime_to_frame(start, fps), 3)
+                    entry["end_frame"] = round(self.ktime_to_frame(stop, fps), 3)
+
+            if "start_frame" in entry:
+                entry["frame_count"] = int(round(entry["end_frame"] - entry["start_frame"])) + 1
+                entry["range_source"] = source
+            stacks.append(entry)
+
+        return stacks
+
+    def animated_model_names(self):
+        """被动画曲线节点驱动的Model名称（不需要解压任何数组）"""
+        names = set()
+        for curve_node in self.objects_of_type('AnimationCurveNode'):
+            for parent in self.parent_objects(curve_node.properties[0], 'Model'):
+                names.add(self.object_name(parent))
+        return names
+
+    def model_transform(self, model_node):
+        """Model节点的静态变换属性（Lcl默认值、预/后旋转、旋转顺序）"""
+        props = self.properties70(model_node)
+
+        def vector(name, default):
+            values = props.get(name)
+            return tuple(float(v) for v in values[:3]) if values and len(values) >= 3 else default
+
+        return {
+            "translation": vector('Lcl Translation', (0.0, 0.0, 0.0)),
+            "rotation": vector('Lcl Rotation', (0.0, 0.0, 0.0)),
+            "scaling": vector('Lcl Scaling', (1.0, 1.0, 1.0)),
+            "pre_rotation": vector('PreRotation', (0.0, 0.0, 0.0)),
+            "post_rotation": vector('PostRotation', (0.0, 0.0, 0.0)),
+            "rotation_order": int(props.get('RotationOrder', [0])[0])
+        }
+
+    def stack_channels(self, stack_node):
+        """读取AnimationStack基础层的曲线数据，按Model分组
+
+        Returns:
+            {Model名称: {"model": Model节点, "Lcl Translation": {"X": 通道, ...}, ...}}
+            通道为 {"default": 默认值, "times": KTime数组或None, "values": 值数组或None}
+        """
+        result = {}
+        layers = self.child_objects(stack_node.properties[0], 'AnimationLayer')
+        if not layers:
+            return result
+
+        # 只读取基础层（第一层），叠加层与Blender导入器一样忽略
+        for curve_node in self.child_objects(layers[0].properties[0], 'AnimationCurveNode'):
+            curve_node_id = curve_node.properties[0]
+
+            target = None
+            for parent_id, property_name in self.parents_of.get(curve_node_id, []):
+                parent = self.objects.get(parent_id)
+                if parent is not None and parent.name == 'Model' and property_name:
+                    target = (parent, property_name)
+                    break
+            if target is None:
+                continue
+            model_node, property_name = target
+
+            defaults = self.properties70(curve_node)
+            channels = {}
+            for axis in ('X', 'Y', 'Z'):
+                default = defaults.get(f'd|{axis}', [0.0])[0]
+                channels[axis] = {"default": float(default), "times": None, "values": None}
+
+            for curve_id, channel_name in self.children_of.get(curve_node_id, []):
+                curve = self.objects.get(curve_id)
+                if curve is None or curve.name != 'AnimationCurve' or not channel_name:
+                    continue
+                axis = channel_name.split('|')[-1]
+                key_time = curve.find('KeyTime')
+                key_value = curve.find('KeyValueFloat')
+                if axis in channels and key_time and key_value:
+                    channels[axis]["times"] = key_time.properties[0].values()
+                    channels[axis]["values"] = key_value.properties[0].values()
+
+            entry = result.setdefault(self.object_name(model_node), {"model": model_node})
+            entry[property_name] = channels
+
+        return result
+
+    # ------------------------------------------------------------------
+    # 骨骼与网格
+    # ------------------------------------------------------------------
+
+    def animation_key_count(self):
+        """动画曲线数和关键帧总数（只读取 KeyTime 数组长度，不解压）"""
+        curves = 0
+        keys = 0
+        for curve in self.objects_of_type('AnimationCurve'):
+            key_time = curve.find('KeyTime')
+            if key_time and key_time.properties:
+                curves += 1
+                keys += len(key_time.properties[0])
+        return {"curves": curves, "keys": keys}
+
+    def models(self, model_type=None):
+        """Model对象列表，model_type 如 LimbNode / Mesh / Null / Root"""
+        result = []
+        for node in self.objects_of_type('Model'):
+            if model_type is None or node.property(2, "") == model_type:
+                result.append(node)
+        return result
+
+    def bone_names(self):
+        """骨骼名称（LimbNode / Root 类型的Model）"""
+        return [self.object_name(node) for node in self.models() if node.property(2, "") in ('LimbNode', 'Root')]
+
+    def bone_parents(self):
+        """骨骼父子关系 {骨骼名: 父骨骼名或None}"""
+        bone_nodes = {node.properties[0]: node for node in self.models() if node.property(2, "") in ('LimbNode', 'Root')}
+        parents = {}
+        for bone_id, node in bone_nodes.items():
+            parent_name = None
+            for parent_id, _ in self.parents_of.get(bone_id, []):
+                if parent_id in bone_nodes:
+                    parent_name = self.object_name(bone_nodes[parent_id])
+                    break
+            parents[self.object_name(node)] = parent_name
+        return parents
+
+    def mesh_stats(self, count_polygons=True):
+        """网格统计：顶点数直接取数组长度，面数需要解压 PolygonVertexIndex"""
+        meshes = []
+        for geometry in self.objects_of_type('Geometry'):
+            if geometry.property(2, "") != 'Mesh':
+                continue
+            geometry_id = geometry.properties[0]
+
+            model_names = [self.object_name(model) for model in self.parent_objects(geometry_id, 'Model')]
+            vertices_node = geometry.find('Vertices')
+            vertex_count = len(vertices_node.properties[0]) // 3 if vertices_node and vertices_node.properties else 0
+
+            entry = {
+                "name": model_names[0] if model_names else self.object_name(geometry),
+                "vertices": vertex_count,
+                "skinned": bool(self.child_objects(geometry_id, 'Deformer'))
+            }
+
+            index_node = geometry.find('PolygonVertexIndex')
+            if index_node and index_node.properties:
+                entry["polygon_vertices"] = len(index_node.properties[0])
+                if count_polygons:
+                    # 每个多边形的最后一个顶点索引以按位取反（负数）标记
+                    entry["polygons"] = sum(1 for index in index_node.properties[0].values() if index < 0)
+
+            meshes.append(entry)
+        return meshes
+
+    def summary(self, count_polygons=True):
+        """文件概要（用于规划和日志）"""
+        bones = self.bone_names()
+        meshes = self.mesh_stats(count_polygons)
+        return {
+            "path": self.path,
+            "version": self.version,
+            "creator": self.creator(),
+            "frame_rate": round(self.frame_rate(), 3),
+            "animation_stacks": self.animation_stacks(),
+            "takes": self.takes(),
+            "bone_count": len(bones),
+            "bones": bones,
+            "animated_models": len(self.animated_model_names()),
+            "mesh_count": len(meshes),
+            "meshes": meshes
+        }
+
+
+def inspect_fbx(path, count_polygons=True):
+    """读取FBX概要，读取失败时返回带 error 字段的字典"""
+    try:
+        with FBXInspector(path) as fbx:
+            return fbx.summary(count_polygons)
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def expand_fbx_paths(patterns):
+    """展开路径列表中的通配符（按文件名排序，去重）"""
+    resolved = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            key = os.path.normcase(os.path.abspath(path))
+            if key not in seen:
+                seen.add(key)
+                resolved.append(path)
+    return resolved
+
+
+def plan_merge(model_path, animation_paths):
+    """合并预演：只读取文件头信息，预测每个动画文件的动画片段和骨骼匹配情况"""
+    model_info = inspect_fbx(model_path, count_polygons=False)
+    model_bones = set(model_info.get("bones", []))
+
+    plan = {
+        "model": {
+            "path": model_path,
+            "bone_count": model_info.get("bone_count", 0),
+            "meshes": model_info.get("meshes", []),
+            "error": model_info.get("error")
+        },
+        "animations": []
+    }
+
+    for path in animation_paths:
+        entry = {"path": path}
+        if not os.path.exists(path):
+            entry.update({"status": "missing"})
+            plan["animations"].append(entry)
+            continue
+
+        try:
+            with FBXInspector(path) as fbx:
+                file_bones = set(fbx.bone_names())
+                animated = fbx.animated_model_names()
+                stacks = fbx.animation_stacks()
+                entry["frame_rate"] = round(fbx.frame_rate(), 3)
+        except Exception as e:
+            entry.update({"status": "error", "error": str(e)})
+            plan["animations"].append(entry)
+            continue
+
+        matched = model_bones & file_bones
+        animated_matched = model_bones & animated
+        entry.update({
+            "stacks": stacks,
+            "bone_count": len(file_bones),
+            "matched_bones": len(matched),
+            "animated_bones": len(animated),
+            "animated_matched_bones": len(animated_matched),
+            "unmatched_animated_bones": sorted(animated - model_bones)[:10]
+        })
+
+        if not stacks:
+            entry["status"] = "no_stacks"
+        elif not animated_matched:
+            entry["status"] = "no_matching_bones"
+        else:
+            entry["status"] = "ok"
+        plan["animations"].append(entry)
+
+    statuses = [entry["status"] for entry in plan["animations"]]
+    plan["totals"] = {
+        "animation_files": len(statuses),
+        "mergeable_files": statuses.count("ok"),
+        "expected_actions": sum(len(entry.get("stacks", [])) for entry in plan["animations"] if entry["status"] == "ok"),
+        "problem_files": len(statuses) - statuses.count("ok")
+    }
+    return plan
+
+
+def print_summary(info):
+    """打印单个文件概要"""
+    print(f"\n📄 {os.path.basename(info['path'])}")
+    if info.get("error"):
+        print(f"  ❌ {info['error']}")
+        return
+    print(f"  ├─ 版本: {info['version']}  帧率: {info['frame_rate']}  导出工具: {info['creator']}")
+    print(f"  ├─ 动画片段: {len(info['animation_stacks'])} 个")
+    for stack in info['animation_stacks']:
+        if "start_frame" in stack:
+            print(f"  │   - {stack['name']}: {stack['start_frame']:g}-{stack['end_frame']:g} 帧 ({stack['range_source']})")
+        else:
+            print(f"  │   - {stack['name']}: 无帧范围")
+    print(f"  ├─ 骨骼: {info['bone_count']} 个 (有动画 {info['animated_models']} 个)")
+    if info['bones']:
+        print(f"  │   {', '.join(info['bones'][:5])}{'...' if info['bone_count'] > 5 else ''}")
+    print(f"  └─ 网格: {info['mesh_count']} 个")
+    for mesh in info['meshes']:
+        polygons = f", {mesh['polygons']} 面" if "polygons" in mesh else ""
+        print(f"      - {mesh['name']}: {mesh['vertices']} 顶点{polygons}{' (蒙皮)' if mesh['skinned'] else ''}")
+
+
+def print_plan(plan):
+    """打印合并预演结果"""
+    model = plan["model"]
+    print(f"\n🧭 合并预演")
+    print(f"  ├─ 模型: {os.path.basename(model['path'])} ({model['bone_count']} 骨骼)")
+    if model.get("error"):
+        print(f"  │   ❌ {model['error']}")
+    for entry in plan["animations"]:
+        name = os.path.basename(entry["path"])
+        if entry["status"] in ("missing", "error"):
+            print(f"  ├─ ❌ {name}: {entry.get('error', '文件不存在')}")
+            continue
+        icon = "✓" if entry["status"] == "ok" else "⚠"
+        stacks = ", ".join(stack["name"] for stack in entry["stacks"]) or "无动画片段"
+        print(f"  ├─ {icon} {name}: {stacks} | 骨骼匹配 {entry['animated_matched_bones']}/{entry['animated_bones']}")
+    totals = plan["totals"]
+    print(f"  └─ 可合并 {totals['mergeable_files']}/{totals['animation_files']} 个文件，预计 {totals['expected_actions']} 个动作")
+
+
+def main():
+    """命令行入口"""
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    as_json = '--json' in sys.argv
+
+    if '--plan' in sys.argv:
+        if not arguments:
+            print("用法: python fbx_inspector.py --plan fbx_merge_config.json")
+            sys.exit(1)
+        with open(arguments[0], 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        patterns = config.get('animation_paths') or [config.get('animation_path', '')]
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        plan = plan_merge(config.get('model_path', ''), expand_fbx_paths(patterns))
+        if as_json:
+            print(json.dumps(plan, indent=2, ensure_ascii=False))
+        else:
+            print_plan(plan)
+        return
+
+    if not arguments:
+        print("用法: python fbx_inspector.py 文件.fbx [文件2.fbx ...] [--json]")
+        print("      python fbx_inspector.py --plan fbx_merge_config.json [--json]")
+        sys.exit(1)
+
+    infos = [inspect_fbx(path) for path in expand_fbx_paths(arguments)]
+    if as_json:
+        print(json.dumps(infos, indent=2, ensure_ascii=False))
+    else:
+        for info in infos:
+            print_summary(info)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,8 +25,40 @@ import os
 import json
 from mathutils import Vector, Matrix, Euler
 import time
+import glob
+import sys
+import hashlib
+import array
+import fnmatch
 from collections import defaultdict
 
+# 合并脚本版本：写入 merge_report.json，版本变化时旧的输出视为过期
+MERGER_VERSION = "1.1.0"
+
+# 同目录模块（二进制FBX检查器，无需导入即可读取动画片段和骨骼名称）
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from action_channel_index import ActionChannelIndex
+from keyframe_reduction import channel_tolerance, exporter_simplify_factor, reduce_keys
+from scene_reset import reset_scene
+
+try:
+    import fbx_inspector
+except ImportError:
+    fbx_inspector = None
+
+try:
+    from fbx_anim_loader import FBXAnimationLoader
+except ImportError:
+    FBXAnimationLoader = None
+
+try:
+    from blender_workers import BlenderWorkerPool
+except ImportError:
+    BlenderWorkerPool = None
+
 class FBXMerger:
     def __init__(self, config_file=None):
         """初始化FBX合并器"""
@@ -36,6 +68,34 @@ class FBXMerger:
         self.output_path = r"F:\UnityTestProjects\MakeDeadCell\merged_output"
         self.output_filename = "HumanM_Merged.fbx"
         
+        # 多动画文件（路径列表，支持通配符）；为空时只使用 animation_path
+        self.animation_paths = []
+        
+        # 合并行为设置（对应配置文件的 settings 节）
+        self.settings = {
+            "preserve_original_actions": False,
+            "auto_rename_merged_actions": True,
+            "animation_import_mode": "full",  # full: 完整导入FBX | curves_only: 只读取动画曲线
+            "export_mode": "merged",          # merged: 单个FBX | split: Model.fbx + Model@Clip.fbx
+            "split_export_workers": 0,        # 分片导出的工作进程数，0为自动
+            "export_profile": "full",         # full: 全部骨骼 | deform_only: 只导出蒙皮骨骼
+            "deform_extra_bones": []          # deform_only 时额外保留的骨骼（支持通配符，如武器挂点）
+        }
+        
+        # 导出前的关键帧精简（对应配置文件的 keyframe_reduction 节）
+        self.keyframe_reduction = {
+            "enabled": False,
+            "rotation_tolerance_degrees": 0.1,
+            "location_tolerance": 0.001,
+            "scale_tolerance": 0.001
+        }
+        
+        # 导出烘焙参数（对应配置文件 fbx_export_settings 中的同名项）
+        self.export_settings = {
+            "bake_anim_step": 1.0,
+            "bake_anim_simplify_factor": 1.0
+        }
+        
         # 加载配置文件（如果提供）
         if config_file and os.path.exists(config_file):
             self.load_config(config_file)
@@ -52,10 +112,25 @@ class FBXMerger:
         self.temp_animation_armature = None  # 临时动画骨骼对象，用于骨骼映射后删除
         self.imported_actions = []
         self.bone_mapping = {}  # 骨骼名称映射
+        self.merged_actions = []      # 所有动画文件传输后的动作
+        self.animation_results = []   # 每个动画文件的处理结果
+        self.reduction_stats = None   # 关键帧精简统计
+        self.simplify_factor_override = None  # 由精简容差推导的导出简化系数（覆盖配置值）
+        self.input_fingerprints = []  # 输入文件指纹（路径、大小、修改时间、SHA-256）
+        self.clip_results = []        # 分片导出的每个动作文件
+        self.model_export_hash = None # 分片导出的模型文件内容哈希
+        self.deform_profile_stats = None  # 蒙皮骨骼导出统计
+        self.config_file = None
+        self.file_info = {}           # FBX检查器读取的文件概要 {路径: 概要}
+        self.channel_index = ActionChannelIndex()  # 动作F曲线按骨骼的索引（每个动作只解析一次）
+        self.current_animation_path = None
         
         print("🔧 FBX合并器已初始化")
         print(f"模型文件: {self.model_path}")
-        print(f"动画文件: {self.animation_path}")
+        if self.animation_paths:
+            print(f"动画文件: {len(self.animation_paths)} 个路径/通配符")
+        else:
+            print(f"动画文件: {self.animation_path}")
         print(f"输出路径: {os.path.join(self.output_path, self.output_filename)}")
     
     def load_config(self, config_file):
@@ -63,6 +138,7 @@ class FBXMerger:
         try:
             with open(config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
+            self.config_file = os.path.abspath(config_file)
             
             # 更新路径配置
             self.model_path = config.get('model_path', self.model_path)
@@ -70,6 +146,19 @@ class FBXMerger:
             self.output_path = config.get('output_path', self.output_path)
             self.output_filename = config.get('output_filename', self.output_filename)
             
+            # animation_paths 可为单个字符串或列表，元素可以是通配符
+            animation_paths = config.get('animation_paths', self.animation_paths)
+            if isinstance(animation_paths, str):
+                animation_paths = [animation_paths]
+            self.animation_paths = list(animation_paths)
+            
+            self.settings.update(config.get('settings', {}))
+            self.keyframe_reduction.update(config.get('keyframe_reduction', {}))
+            export_settings = config.get('fbx_export_settings', {})
+            for key in self.export_settings:
+                if key in export_settings:
+                    self.export_settings[key] = float(export_settings[key])
+            
             # 可以在这里添加更多配置项的加载
             print(f"✓ 已加载配置文件: {config_file}")
             
@@ -81,14 +170,85 @@ class FBXMerger:
         """清理当前场景"""
         print("\n🧹 清理场景...")
         
-        # 选择所有对象并删除
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete()
-        
-        # 清理未使用的数据块
-        bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-        
-        print("  ✓ 场景已清理")
+        # 直接按依赖顺序删除数据块（不使用选择/删除/清理运算符）
+        reset_scene()
+        # 动作已全部删除，旧的通道缓存指向已释放的F曲线
+        self.channel_index.invalidate()
+    
+    def build_model_import_settings(self):
+        """模型FBX导入参数 - 保留网格、骨骼和材质"""
+        return {
+            "use_manual_orientation": True,
+            "global_scale": 1.0,
+            "bake_space_transform": False,
+            "use_custom_normals": True,
+            "use_image_search": True,
+            "use_alpha_decals": False,
+            "decal_offset": 0.0,
+            "use_anim": True,  # 导入现有动画
+            "anim_offset": 1.0,
+            "use_subsurf": False,
+            "use_custom_props": True,
+            "use_custom_props_enum_as_string": True,
+            "ignore_leaf_bones": False,
+            "force_connect_children": False,
+            "automatic_bone_orientation": False,
+            "primary_bone_axis": 'Y',
+            "secondary_bone_axis": 'X',
+            "use_prepost_rot": True
+        }
+    
+    def build_animation_import_settings(self):
+        """动画FBX导入参数 - 只关注动画数据"""
+        settings = self.build_model_import_settings()
+        settings.update({
+            "use_custom_normals": False,
+            "use_image_search": False,
+            "use_custom_props": False   # 重点：只导入动画
+        })
+        return settings
+    
+    def build_export_settings(self):
+        """合并FBX导出参数"""
+        return {
+            "use_selection": True,  # 只导出选中的对象
+            "use_active_collection": False,
+            "global_scale": 1.0,
+            "apply_unit_scale": True,
+            "apply_scale_options": 'FBX_SCALE_NONE',
+            "bake_space_transform": False,
+            "object_types": {'ARMATURE', 'MESH'},
+            "use_mesh_modifiers": True,
+            "use_mesh_modifiers_render": True,
+            "mesh_smooth_type": 'OFF',
+            "use_subsurf": False,
+            "use_mesh_edges": False,
+            "use_tspace": False,
+            "use_custom_props": False,
+            "add_leaf_bones": False,             # 【优化】关闭叶子骨生成，避免Unity/UE中的多余骨骼
+            "primary_bone_axis": 'Y',
+            "secondary_bone_axis": 'X',
+            "use_armature_deform_only": self.settings.get('export_profile', 'full') == 'deform_only',
+            "armature_nodetype": 'NULL',
+            "bake_anim": True,  # 重要：烘焙动画
+            "bake_anim_use_all_bones": True,
+            "bake_anim_use_nla_strips": True,    # 使用NLA条带
+            "bake_anim_use_all_actions": True,   # 【关键】烘焙所有动作，确保完整导出
+            "bake_anim_force_startend_keying": True,
+            "bake_anim_step": self.export_settings['bake_anim_step'],
+            "bake_anim_simplify_factor": self.get_simplify_factor(),
+            "path_mode": 'AUTO',
+            "embed_textures": False,
+            "batch_mode": 'OFF',
+            "use_batch_own_dir": True,
+            "use_metadata": True
+        }
+    
+    def get_simplify_factor(self):
+        """导出简化系数：开启关键帧精简时使用由容差推导的值，否则使用配置值"""
+        if self.simplify_factor_override is not None:
+            return self.simplify_factor_override
+        return self.export_settings['bake_anim_simplify_factor']
     
     def import_model_fbx(self):
         """导入模型FBX文件"""
@@ -98,27 +258,7 @@ class FBXMerger:
             raise FileNotFoundError(f"模型文件不存在: {self.model_path}")
         
         # FBX导入设置 - 保留模型和骨骼
-        bpy.ops.import_scene.fbx(
-            filepath=self.model_path,
-            use_manual_orientation=True,
-            global_scale=1.0,
-            bake_space_transform=False,
-            use_custom_normals=True,
-            use_image_search=True,
-            use_alpha_decals=False,
-            decal_offset=0.0,
-            use_anim=True,  # 导入现有动画
-            anim_offset=1.0,
-            use_subsurf=False,
-            use_custom_props=True,
-            use_custom_props_enum_as_string=True,
-            ignore_leaf_bones=False,
-            force_connect_children=False,
-            automatic_bone_orientation=False,
-            primary_bone_axis='Y',
-            secondary_bone_axis='X',
-            use_prepost_rot=True
-        )
+        bpy.ops.import_scene.fbx(filepath=self.model_path, **self.build_model_import_settings())
         
         # 查找导入的骨骼对象
         for obj in bpy.context.scene.objects:
@@ -126,6 +266,9 @@ class FBXMerger:
                 self.model_armature = obj
                 break
         
+        if self.model_armature:
+            self.channel_index.set_bone_names(bone.name for bone in self.model_armature.data.bones)
+        
         if self.model_armature:
             print(f"  ✓ 找到模型骨骼: {self.model_armature.name}")
             print(f"  ├─ 骨骼数量: {len(self.model_armature.data.bones)}")
@@ -142,39 +285,100 @@ class FBXMerger:
         for mesh_obj in mesh_objects:
             print(f"  ├─ 网格: {mesh_obj.name}")
     
-    def import_animation_fbx(self):
+    def resolve_animation_paths(self):
+        """展开动画文件列表（通配符按文件名排序，去重）；未配置 animation_paths 时返回 [animation_path]"""
+        if not self.animation_paths:
+            return [self.animation_path]
+        
+        resolved = []
+        seen = set()
+        for pattern in self.animation_paths:
+            if glob.has_magic(pattern):
+                matches = sorted(glob.glob(pattern))
+                if not matches:
+                    print(f"  ⚠ 通配符没有匹配到文件: {pattern}")
+            else:
+                matches = [pattern]
+            
+            for path in matches:
+                key = os.path.normcase(os.path.abspath(path))
+                if key not in seen:
+                    seen.add(key)
+                    resolved.append(path)
+        
+        return resolved
+    
+    def inspect_file(self, path):
+        """用二进制FBX检查器读取文件概要（不导入），结果按路径缓存；不可用或失败时返回None"""
+        if fbx_inspector is None or not os.path.exists(path):
+            return None
+        if path not in self.file_info:
+            info = fbx_inspector.inspect_fbx(path, count_polygons=False)
+            self.file_info[path] = None if info.get("error") else info
+            if info.get("error"):
+                print(f"  ⚠ 无法预读 {os.path.basename(path)}: {info['error']}")
+        return self.file_info[path]
+    
+    def validate_paths(self, animation_paths):
+        """导入前检查输入文件，并预读动画片段和骨骼信息（毫秒级，不启动导入）"""
+        print("\n🔍 检查输入文件...")
+        
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"模型文件不存在: {self.model_path}")
+        
+        model_info = self.inspect_file(self.model_path)
+        if model_info:
+            print(f"  ├─ 模型: {model_info['bone_count']} 个骨骼, {model_info['mesh_count']} 个网格")
+        
+        missing = [path for path in animation_paths if not os.path.exists(path)]
+        for path in missing:
+            print(f"  ├─ ❌ 动画文件不存在: {path}")
+        
+        total_stacks = 0
+        for path in animation_paths:
+            info = self.inspect_file(path)
+            if not info:
+                continue
+            stacks = info['animation_stacks']
+            total_stacks += len(stacks)
+            if not stacks:
+                print(f"  ├─ ⚠ {os.path.basename(path)}: 没有动画片段，将跳过导入")
+        
+        if fbx_inspector is None:
+            print("  └─ ⚠ fbx_inspector 不可用，跳过预读")
+        else:
+            print(f"  └─ ✓ {len(animation_paths) - len(missing)}/{len(animation_paths)} 个动画文件可用，预计 {total_stacks} 个动画片段")
+    
+    def dry_run(self):
+        """合并预演：只读取FBX文件信息，输出 merge_plan.json，不导入也不导出"""
+        print("🧭 FBX合并预演（不导入文件）...")
+        if fbx_inspector is None:
+            raise RuntimeError("fbx_inspector 模块不可用，无法预演")
+        
+        plan = fbx_inspector.plan_merge(self.model_path, self.resolve_animation_paths())
+        fbx_inspector.print_plan(plan)
+        
+        self.setup_output_directory()
+        plan_file = os.path.join(self.output_path, "merge_plan.json")
+        with open(plan_file, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ 预演结果已保存: {plan_file}")
+        return plan
+    
+    def import_animation_fbx(self, animation_path=None):
         """导入动画FBX文件并提取动画数据"""
-        print(f"\n📥 导入动画文件: {os.path.basename(self.animation_path)}")
+        animation_path = animation_path or self.animation_path
+        print(f"\n📥 导入动画文件: {os.path.basename(animation_path)}")
         
-        if not os.path.exists(self.animation_path):
-            raise FileNotFoundError(f"动画文件不存在: {self.animation_path}")
+        if not os.path.exists(animation_path):
+            raise FileNotFoundError(f"动画文件不存在: {animation_path}")
         
         # 记录导入前的动作名称和对象名称（使用名称集合更稳健）
         actions_before = {action.name for action in bpy.data.actions}
         objects_before = set(bpy.context.scene.objects)
         
         # FBX导入设置 - 只关注动画数据
-        bpy.ops.import_scene.fbx(
-            filepath=self.animation_path,
-            use_manual_orientation=True,
-            global_scale=1.0,
-            bake_space_transform=False,
-            use_custom_normals=False,
-            use_image_search=False,
-            use_alpha_decals=False,
-            decal_offset=0.0,
-            use_anim=True,  # 重点：导入动画
-            anim_offset=1.0,
-            use_subsurf=False,
-            use_custom_props=False,
-            use_custom_props_enum_as_string=True,
-            ignore_leaf_bones=False,
-            force_connect_children=False,
-            automatic_bone_orientation=False,
-            primary_bone_axis='Y',
-            secondary_bone_axis='X',
-            use_prepost_rot=True
-        )
+        bpy.ops.import_scene.fbx(filepath=animation_path, **self.build_animation_import_settings())
         
         # 识别新导入的动作（通过名称比较，比ID对象集合差更稳健）
         actions_after = {action.name for action in bpy.data.actions}
@@ -224,13 +428,52 @@ class FBXMerger:
             print(f"  ├─ 删除动画文件中的网格对象: {len(mesh_objects_to_remove)} 个")
             print(f"  ├─ 删除其他对象: {len(other_objects_to_remove)} 个")
             for obj in objects_to_remove_now:
+                obj_data = obj.data
                 bpy.data.objects.remove(obj, do_unlink=True)
+                self.remove_orphan_data(obj_data)
         
         # 保存动画骨骼对象的引用，稍后在骨骼映射完成后删除
         self.temp_animation_armature = animation_armature_obj
         
         print("  ✓ 清理了动画文件的网格对象，保留动画骨骼用于骨骼映射")
     
+    def load_animation_curves(self, animation_path):
+        """只读取动画曲线，直接在模型骨骼上创建动作（不导入临时骨骼、网格和材质）"""
+        print(f"\n📥 读取动画曲线: {os.path.basename(animation_path)}")
+        
+        if not self.model_armature:
+            raise RuntimeError("模型骨骼未找到")
+        
+        loader = FBXAnimationLoader(self.model_armature, frame_offset=1.0)
+        self.imported_actions = loader.load(animation_path)
+        self.animation_armature = None
+        
+        # 曲线按骨骼名称直接匹配，映射即为匹配到的骨骼
+        self.bone_mapping = {bone_name: bone_name for bone_name in loader.matched_bones}
+        
+        print(f"  ✓ 创建了 {len(self.imported_actions)} 个动画:")
+        for action in self.imported_actions:
+            frame_range = action.frame_range
+            print(f"  ├─ {action.name}: {frame_range[0]:.0f}-{frame_range[1]:.0f} 帧")
+        print(f"  ├─ 匹配骨骼: {len(loader.matched_bones)} 个")
+        if loader.unmatched_models:
+            unmatched = sorted(loader.unmatched_models)
+            print(f"  └─ 未匹配的动画节点: {len(unmatched)} 个 ({', '.join(unmatched[:5])}{'...' if len(unmatched) > 5 else ''})")
+        
+        return self.imported_actions
+    
+    def use_curves_only_import(self, animation_path):
+        """是否对该文件使用曲线直读（需要配置开启、模块可用且文件可被检查器读取）"""
+        if self.settings.get('animation_import_mode', 'full') != 'curves_only':
+            return False
+        if FBXAnimationLoader is None:
+            print("  ⚠ fbx_anim_loader 不可用，使用完整导入")
+            return False
+        if self.inspect_file(animation_path) is None:
+            print("  ⚠ 文件无法预读（可能是ASCII FBX），使用完整导入")
+            return False
+        return True
+    
     def analyze_bone_mapping(self):
         """分析和创建骨骼映射"""
         print("\n🦴 分析骨骼映射...")
@@ -269,6 +512,13 @@ class FBXMerger:
                     print(f"  │   {', '.join(list(anim_only)[:5])}")
                 else:
                     print(f"  │   {', '.join(list(anim_only)[:5])}...")
+        elif self.current_animation_path and self.inspect_file(self.current_animation_path):
+            # 导入时没有保留动画骨骼，使用检查器读取的骨骼名称
+            anim_bones = set(self.inspect_file(self.current_animation_path)['bones'])
+            direct_matches = model_bones.intersection(anim_bones)
+            print(f"  ├─ 动画骨骼数量: {len(anim_bones)} (文件预读)")
+            print(f"  ├─ 直接匹配: {len(direct_matches)} 个骨骼")
+            self.bone_mapping = {bone_name: bone_name for bone_name in direct_matches}
         else:
             # 如果没有动画骨骼参考，假设所有动作都适用于模型骨骼
             print("  ├─ 无动画骨骼参考，假设动作适用于所有模型骨骼")
@@ -285,7 +535,9 @@ class FBXMerger:
                 # 确保对象仍然存在且有效
                 if self.temp_animation_armature.name in bpy.data.objects:
                     print(f"  ├─ 删除临时动画骨骼: {self.temp_animation_armature.name}")
+                    armature_data = self.temp_animation_armature.data
                     bpy.data.objects.remove(self.temp_animation_armature, do_unlink=True)
+                    self.remove_orphan_data(armature_data)
                     self.temp_animation_armature = None
                     print("  ✓ 临时动画骨骼已删除")
                 else:
@@ -296,13 +548,46 @@ class FBXMerger:
         # 清理对动画骨骼的引用，因为它已经不需要了
         self.animation_armature = None
     
-    def transfer_animations_to_model(self):
-        """将动画传输到模型骨骼并设置为活动动画或NLA轨道"""
+    def remove_orphan_data(self, data_block):
+        """删除已无用户的对象数据（网格/骨架），避免批量导入时数据块堆积"""
+        if data_block is None or data_block.users > 0:
+            return
+        try:
+            if isinstance(data_block, bpy.types.Mesh):
+                bpy.data.meshes.remove(data_block)
+            elif isinstance(data_block, bpy.types.Armature):
+                bpy.data.armatures.remove(data_block)
+        except Exception as e:
+            print(f"  ⚠ 删除无用数据块时出错: {e}")
+    
+    def make_merged_action_name(self, action, animation_path):
+        """生成传输后的动作名称；与已合并动作重名时加上来源文件名"""
+        base_name = action.name
+        existing_names = {merged.name for merged in self.merged_actions}
+        if base_name in existing_names or f"{base_name}_merged" in existing_names:
+            # Mixamo等工具导出的动作名通常相同（如 mixamo.com），用文件名区分
+            file_stem = os.path.splitext(os.path.basename(animation_path))[0] if animation_path else "anim"
+            base_name = f"{file_stem}_{base_name}"
+        
+        if self.settings.get('auto_rename_merged_actions', True):
+            return f"{base_name}_merged"
+        return base_name
+    
+    def transfer_animations_to_model(self, animation_path=None, setup_on_model=True):
+        """将动画传输到模型骨骼
+        
+        Args:
+            animation_path: 动画来源文件（用于重名时区分动作）
+            setup_on_model: 是否立即设置为活动动画和NLA轨道；批量合并时在全部文件处理完后统一设置
+        
+        Returns:
+            本次传输的动作列表
+        """
         print("\n🎭 传输动画到模型骨骼...")
         
         if not self.imported_actions:
             print("  ⚠ 没有找到可传输的动画")
-            return
+            return []
         
         if not self.model_armature:
             raise RuntimeError("模型骨骼未找到")
@@ -311,52 +596,59 @@ class FBXMerger:
         if not self.model_armature.animation_data:
             self.model_armature.animation_data_create()
         
+        model_bone_names = {bone.name for bone in self.model_armature.data.bones}
+        preserve_originals = self.settings.get('preserve_original_actions', False)
+        
+        # 同时存在于骨骼映射和模型中的骨骼（集合只构建一次）
+        target_bones = model_bone_names.intersection(self.bone_mapping)
+        
         transferred_actions = []
-        transferred_count = 0
         
         for action in self.imported_actions:
             print(f"  ├─ 处理动画: {action.name}")
             
-            # 创建动作的副本并重命名
-            new_action_name = f"{action.name}_merged"
-            new_action = action.copy()
-            new_action.name = new_action_name
-            
             # 检查动作是否包含模型骨骼的关键帧
-            valid_fcurves = 0
-            for fcurve in new_action.fcurves:
-                if fcurve.data_path.startswith('pose.bones['):
-                    # 提取骨骼名称
-                    bone_name_start = fcurve.data_path.find('[\"') + 2
-                    bone_name_end = fcurve.data_path.find('\"]', bone_name_start)
-                    if bone_name_start > 1 and bone_name_end > bone_name_start:
-                        bone_name = fcurve.data_path[bone_name_start:bone_name_end]
-                        
-                        # 检查这个骨骼是否存在于模型中
-                        if bone_name in self.bone_mapping and bone_name in [b.name for b in self.model_armature.data.bones]:
-                            valid_fcurves += 1
-            
-            if valid_fcurves > 0:
-                print(f"  │   ✓ 有效关键帧通道: {valid_fcurves}")
-                transferred_actions.append(new_action)
-                transferred_count += 1
-            else:
+            valid_fcurves = self.channel_index.matched_channel_count(action, target_bones)
+            
+            if valid_fcurves == 0:
                 print(f"  │   ⚠ 未找到匹配的骨骼关键帧")
-                # 删除无效的动作副本
-                bpy.data.actions.remove(new_action)
+                if not preserve_originals:
+                    self.channel_index.invalidate(action)
+                    bpy.data.actions.remove(action)
+                continue
+            
+            new_action_name = self.make_merged_action_name(action, animation_path)
+            if preserve_originals:
+                # 保留原始动作：创建副本并重命名
+                new_action = action.copy()
+            else:
+                # 不保留原始动作：直接重命名，避免原动作被 bake_anim_use_all_actions 重复导出
+                new_action = action
+            new_action.name = new_action_name
+            
+            coverage = len(self.channel_index.matched_bones(new_action, target_bones))
+            print(f"  │   ✓ 有效关键帧通道: {valid_fcurves} ({coverage}/{len(model_bone_names)} 骨骼) → {new_action.name}")
+            transferred_actions.append(new_action)
+        
+        # 传输完成后原始动作列表已失效（可能已被删除）
+        self.imported_actions = list(transferred_actions)
+        self.merged_actions.extend(transferred_actions)
         
-        print(f"  ✓ 成功传输 {transferred_count} 个动画")
+        print(f"  ✓ 成功传输 {len(transferred_actions)} 个动画")
         
         # 【关键修复】将动画挂载到模型骨骼
-        if transferred_actions:
+        if setup_on_model and transferred_actions:
             self.setup_animations_on_model(transferred_actions)
         
-        # 显示模型骨骼现在拥有的所有动作
-        available_actions = [action for action in bpy.data.actions 
-                           if action.name.endswith('_merged') or 
-                           any(fcurve.data_path.startswith('pose.bones[') and 
-                               any(bone.name in fcurve.data_path for bone in self.model_armature.data.bones)
-                               for fcurve in action.fcurves)]
+        return transferred_actions
+    
+    def print_available_actions(self):
+        """显示模型骨骼现在拥有的所有动作"""
+        merged = set(self.merged_actions)
+        available_actions = [
+            action for action in bpy.data.actions
+            if action in merged or self.channel_index.targets_armature(action)
+        ]
         
         print(f"  ├─ 模型骨骼可用动作: {len(available_actions)} 个")
         for action in available_actions[:3]:  # 只显示前3个
@@ -364,6 +656,282 @@ class FBXMerger:
         if len(available_actions) > 3:
             print(f"  │   ... 还有 {len(available_actions) - 3} 个")
     
+    def merge_animation_file(self, animation_path, index=1, total=1):
+        """增量合并单个动画文件：导入 → 骨骼映射 → 清理临时对象 → 传输动作"""
+        print(f"\n{'─' * 50}")
+        print(f"🎞 动画文件 [{index}/{total}]: {os.path.basename(animation_path)}")
+        file_start = time.time()
+        result = {"path": animation_path, "actions": [], "status": "ok"}
+        self.current_animation_path = animation_path
+        
+        # 预读确认没有动画片段的文件不必导入
+        info = self.inspect_file(animation_path)
+        if info is not None and not info['animation_stacks']:
+            print("  ⚠ 文件中没有动画片段，跳过导入")
+            result["status"] = "no_actions"
+            result["seconds"] = round(time.time() - file_start, 3)
+            self.animation_results.append(result)
+            return result
+        
+        try:
+            curves_loaded = False
+            if self.use_curves_only_import(animation_path):
+                actions_before = {action.name for action in bpy.data.actions}
+                try:
+                    self.load_animation_curves(animation_path)
+                    curves_loaded = True
+                    result["import_mode"] = "curves_only"
+                except Exception as e:
+                    print(f"  ⚠ 曲线直读失败，改用完整导入: {e}")
+                    # 删除读取失败前已创建的动作
+                    for action in [a for a in bpy.data.actions if a.name not in actions_before]:
+                        self.channel_index.invalidate(action)
+                        bpy.data.actions.remove(action)
+                    self.imported_actions = []
+            
+            if not curves_loaded:
+                self.import_animation_fbx(animation_path)
+                self.analyze_bone_mapping()
+                self.cleanup_animation_objects()
+                result["import_mode"] = "full"
+            transferred = self.transfer_animations_to_model(animation_path, setup_on_model=False)
+            result["actions"] = [action.name for action in transferred]
+            result["bone_mappings"] = len(self.bone_mapping)
+            if not transferred:
+                result["status"] = "no_actions"
+        except Exception as e:
+            print(f"  ❌ 处理动画文件失败: {e}")
+            # 失败时也要清理残留的临时骨骼，避免影响下一个文件
+            self.cleanup_animation_objects()
+            result["status"] = "failed"
+            result["error"] = str(e)
+        
+        result["seconds"] = round(time.time() - file_start, 3)
+        self.animation_results.append(result)
+        return result
+    
+    def analyze_action_keyframes(self, action):
+        """统计单个动作的骨骼关键帧（不修改曲线）
+        
+        Returns:
+            (关键帧数, 容差内线性插值所需的关键帧数, 位置曲线最大绝对值, 缩放曲线最大绝对值)
+        """
+        keys_before = 0
+        keys_needed = 0
+        max_location = 0.0
+        max_scale = 0.0
+        
+        for bone_name, channels in self.channel_index.channels(action).bones.items():
+            # 同一属性的分量作为一组精简（四元数 w/x/y/z 保持对齐）
+            groups = defaultdict(list)
+            for property_name, array_index, fcurve in channels:
+                groups[property_name].append(fcurve)
+            
+            for property_name, fcurves in groups.items():
+                tolerance = channel_tolerance(property_name, self.keyframe_reduction)
+                counts = [len(fcurve.keyframe_points) for fcurve in fcurves]
+                keys_before += sum(counts)
+                
+                # 读取关键帧坐标 (帧, 值)
+                coordinates = []
+                for fcurve, count in zip(fcurves, counts):
+                    co = [0.0] * (count * 2)
+                    fcurve.keyframe_points.foreach_get('co', co)
+                    coordinates.append(co)
+                
+                magnitude = max((abs(value) for co in coordinates for value in co[1::2]), default=0.0)
+                if property_name == 'location':
+                    max_location = max(max_location, magnitude)
+                elif property_name == 'scale':
+                    max_scale = max(max_scale, magnitude)
+                
+                if tolerance is None or min(counts) <= 2:
+                    keys_needed += sum(counts)
+                    continue
+                
+                frames = coordinates[0][0::2]
+                if any(co[0::2] != frames for co in coordinates[1:]):
+                    # 分量关键帧不对齐时逐条计算
+                    coordinate_groups = [[co] for co in coordinates]
+                else:
+                    coordinate_groups = [coordinates]
+                
+                for group_coordinates in coordinate_groups:
+                    rows = [co[1::2] for co in group_coordinates]
+                    kept = reduce_keys(group_coordinates[0][0::2], rows, tolerance)
+                    keys_needed += len(kept) * len(group_coordinates)
+        
+        return keys_before, keys_needed, max_location, max_scale
+    
+    def max_rest_bone_offset(self):
+        """骨骼相对父骨骼的静止偏移最大长度（导出的局部位移包含这部分）"""
+        offset = 0.0
+        for bone in self.model_armature.data.bones:
+            head = bone.head_local if bone.parent is None else bone.parent.matrix_local.inverted() @ bone.head_local
+            offset = max(offset, head.length)
+        return offset
+    
+    def reduce_merged_keyframes(self):
+        """由精简容差推导FBX导出器的简化系数，减少导出文件中的关键帧
+        
+        FBX导出器总是按 bake_anim_step 逐帧烘焙，删除Blender动作中的关键帧不会减少FBX关键帧，
+        因此这里不修改曲线，而是设置导出参数 bake_anim_simplify_factor（覆盖配置值）。
+        报告中 tolerance_keys 是容差内线性插值所需的关键帧数（精简下限），
+        与导出后 measure_exported_keys 统计的实际关键帧数对比。
+        """
+        settings = self.keyframe_reduction
+        print("\n✂ 关键帧精简...")
+        print(f"  ├─ 容差: 旋转 {settings['rotation_tolerance_degrees']}°, "
+              f"位置 {settings['location_tolerance']}, 缩放 {settings['scale_tolerance']}")
+        
+        reduce_start = time.time()
+        total_keys = 0
+        total_needed = 0
+        max_location = 0.0
+        max_scale = 0.0
+        per_action = []
+        for action in self.merged_actions:
+            keys_before, keys_needed, action_location, action_scale = self.analyze_action_keyframes(action)
+            total_keys += keys_before
+            total_needed += keys_needed
+            max_location = max(max_location, action_location)
+            max_scale = max(max_scale, action_scale)
+            per_action.append({"action": action.name, "blender_keys": keys_before, "tolerance_keys": keys_needed})
+        
+        if max_location > 0.0:
+            max_location += self.max_rest_bone_offset()
+        self.simplify_factor_override = round(exporter_simplify_factor(settings, max_location, max_scale), 4)
+        
+        self.reduction_stats = {
+            "settings": dict(settings),
+            "configured_simplify_factor": self.export_settings['bake_anim_simplify_factor'],
+            "bake_anim_simplify_factor": self.simplify_factor_override,
+            "blender_keys": total_keys,
+            "tolerance_keys": total_needed,
+            "seconds": round(time.time() - reduce_start, 3),
+            "actions": per_action
+        }
+        print(f"  ├─ Blender关键帧 {total_keys} 个，容差内线性插值需要 {total_needed} 个")
+        print(f"  └─ ✓ 导出简化系数: {self.simplify_factor_override} "
+              f"(配置值 {self.export_settings['bake_anim_simplify_factor']})，FBX实际关键帧数在导出后统计")
+        return self.reduction_stats
+    
+    def measure_exported_keys(self, files):
+        """用FBX检查器统计导出文件中实际写入的动画曲线数、关键帧数和文件大小"""
+        if fbx_inspector is None:
+            return None
+        
+        measured = {"files": 0, "curves": 0, "keys": 0, "file_size": 0}
+        for path in files:
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                with fbx_inspector.FBXInspector(path) as fbx:
+                    counts = fbx.animation_key_count()
+            except Exception as e:
+                print(f"  ⚠ 无法统计导出文件的关键帧 {os.path.basename(path)}: {e}")
+                continue
+            measured["files"] += 1
+            measured["curves"] += counts["curves"]
+            measured["keys"] += counts["keys"]
+            measured["file_size"] += os.path.getsize(path)
+        
+        print(f"  ├─ 导出FBX: {measured['curves']} 条动画曲线, {measured['keys']} 个关键帧, "
+              f"{measured['file_size'] / (1024*1024):.2f} MB")
+        return measured
+    
+    def collect_weighted_bones(self):
+        """被网格顶点组实际引用（权重大于0）的骨骼名称"""
+        bone_names = {bone.name for bone in self.model_armature.data.bones}
+        weighted = set()
+        for obj in bpy.context.scene.objects:
+            if obj.type != 'MESH':
+                continue
+            uses_armature = any(
+                modifier.type == 'ARMATURE' and modifier.object == self.model_armature
+                for modifier in obj.modifiers
+            ) or obj.parent == self.model_armature
+            if not uses_armature:
+                continue
+            
+            group_names = {group.index: group.name for group in obj.vertex_groups if group.name in bone_names}
+            if not group_names:
+                continue
+            for vertex in obj.data.vertices:
+                for element in vertex.groups:
+                    if element.weight > 0.0 and element.group in group_names:
+                        weighted.add(group_names[element.group])
+        return weighted
+    
+    def apply_deform_only_profile(self):
+        """蒙皮骨骼导出：只保留顶点组引用的骨骼、配置的额外骨骼及其父骨骼，删除其余骨骼的动画曲线
+        
+        通过 use_deform 标记配合导出参数 use_armature_deform_only 实现，骨骼本身不从场景中删除；
+        被保留骨骼的约束所引用的控制骨骼（如IK目标）保留曲线，保证烘焙结果不变。
+        """
+        print("\n🦴 应用蒙皮骨骼导出配置...")
+        bones = self.model_armature.data.bones
+        
+        keep = self.collect_weighted_bones()
+        patterns = self.settings.get('deform_extra_bones') or []
+        extras = {bone.name for bone in bones if any(fnmatch.fnmatchcase(bone.name, pattern) for pattern in patterns)}
+        keep |= extras
+        
+        # 父骨骼必须保留，否则子骨骼的层级和变换会丢失
+        for bone_name in list(keep):
+            parent = bones[bone_name].parent
+            while parent and parent.name not in keep:
+                keep.add(parent.name)
+                parent = parent.parent
+        
+        if not keep:
+            print("  ⚠ 没有找到被顶点组引用的骨骼，保持导出全部骨骼")
+            return None
+        
+        for bone in bones:
+            bone.use_deform = bone.name in keep
+        
+        # 被保留骨骼的约束目标（递归）需要保留曲线
+        pose_bones = self.model_armature.pose.bones
+        curve_keep = set(keep)
+        pending = list(keep)
+        while pending:
+            pose_bone = pose_bones.get(pending.pop())
+            if pose_bone is None:
+                continue
+            for constraint in pose_bone.constraints:
+                for attribute in ('subtarget', 'pole_subtarget'):
+                    target = getattr(constraint, attribute, "")
+                    if target and target in bones and target not in curve_keep:
+                        curve_keep.add(target)
+                        pending.append(target)
+        
+        removed_curves = 0
+        for action in self.merged_actions:
+            for bone_name, channels in self.channel_index.channels(action).bones.items():
+                if bone_name in curve_keep:
+                    continue
+                for _, _, fcurve in channels:
+                    action.fcurves.remove(fcurve)
+                    removed_curves += 1
+            self.channel_index.invalidate(action)
+        
+        stripped = sorted(bone.name for bone in bones if bone.name not in keep)
+        self.deform_profile_stats = {
+            "bones_total": len(bones),
+            "bones_exported": len(keep),
+            "extra_bones": sorted(extras),
+            "constraint_targets_kept": sorted(curve_keep - keep),
+            "stripped_bones": stripped,
+            "removed_curves": removed_curves
+        }
+        
+        print(f"  ├─ 导出骨骼: {len(keep)}/{len(bones)} (额外保留 {len(extras)} 个)")
+        if stripped:
+            print(f"  ├─ 去除骨骼: {', '.join(stripped[:5])}{'...' if len(stripped) > 5 else ''}")
+        print(f"  └─ ✓ 删除动画曲线: {removed_curves} 条")
+        return self.deform_profile_stats
+    
     def setup_animations_on_model(self, actions):
         """将动画正确设置到模型骨骼上"""
         print("\n🎪 设置动画到模型骨骼...")
@@ -489,6 +1057,208 @@ class FBXMerger:
         else:
             print("  │   ⚠ 无法确定动画范围，保持默认设置")
     
+    def build_model_only_export_settings(self):
+        """分片导出：只含网格和骨骼、不带动画的 Model.fbx"""
+        settings = self.build_export_settings()
+        settings["bake_anim"] = False
+        return settings
+    
+    def build_clip_export_settings(self):
+        """分片导出：只含骨骼和当前动作的 Model@Clip.fbx"""
+        settings = self.build_export_settings()
+        settings.update({
+            "object_types": {'ARMATURE'},
+            "bake_anim_use_nla_strips": False,
+            "bake_anim_use_all_actions": False  # 只烘焙活动动作
+        })
+        return settings
+    
+    def make_clip_name(self, action):
+        """动作名 → Unity片段名（去掉 _merged 后缀并替换文件名非法字符）"""
+        name = action.name
+        if name.endswith("_merged"):
+            name = name[:-len("_merged")]
+        return "".join(c if c.isalnum() or c in "-_. " else "_" for c in name).strip() or "clip"
+    
+    def action_content_hash(self, action):
+        """动作内容哈希（曲线路径 + 关键帧坐标 + 导出参数 + 模型哈希 + 脚本版本），用于判断动作文件是否需要重新导出
+        
+        动作文件中也包含骨骼，关键帧相对模型的静止姿势，模型骨骼或静止姿势变化时动作文件同样需要重新导出。
+        """
+        digest = hashlib.sha256()
+        digest.update(MERGER_VERSION.encode('utf-8'))
+        digest.update((self.model_export_hash or self.model_content_hash()).encode('utf-8'))
+        export_settings = dict(self.build_clip_export_settings())
+        export_settings["object_types"] = sorted(export_settings["object_types"])
+        digest.update(json.dumps(export_settings, sort_keys=True).encode('utf-8'))
+        for fcurve in action.fcurves:
+            digest.update(f"{fcurve.data_path}[{fcurve.array_index}]".encode('utf-8'))
+            co = array.array('f', [0.0]) * (len(fcurve.keyframe_points) * 2)
+            fcurve.keyframe_points.foreach_get('co', co)
+            digest.update(co.tobytes())
+        return digest.hexdigest()
+    
+    def model_content_hash(self):
+        """模型文件内容哈希（模型输入文件哈希 + 模型导出参数 + 脚本版本）"""
+        # 运行开始时已计算过输入指纹，模型文件排在第一个
+        model_fingerprint = self.input_fingerprints[0] if self.input_fingerprints else self.file_fingerprint(self.model_path)
+        export_settings = dict(self.build_model_only_export_settings())
+        export_settings["object_types"] = sorted(export_settings["object_types"])
+        payload = json.dumps([MERGER_VERSION, model_fingerprint.get("sha256"), export_settings], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def select_export_objects(self, object_types):
+        """只选中指定类型的对象，模型骨骼设为活动对象"""
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in bpy.context.scene.objects:
+            if obj.type in object_types:
+                obj.select_set(True)
+        self.model_armature.select_set(True)
+        bpy.context.view_layer.objects.active = self.model_armature
+    
+    def export_clip(self, action, clip_file, export_settings=None):
+        """导出单个动作：只含骨骼，活动动作为该动作，NLA轨道静音
+        
+        export_settings 为None时使用 build_clip_export_settings()；工作进程传入父进程的实际导出参数。
+        """
+        animation_data = self.model_armature.animation_data or self.model_armature.animation_data_create()
+        for track in animation_data.nla_tracks:
+            track.mute = True
+        animation_data.action = action
+        
+        frame_start, frame_end = action.frame_range
+        bpy.context.scene.frame_start = int(frame_start)
+        bpy.context.scene.frame_end = int(max(frame_end, frame_start + 1))
+        
+        self.select_export_objects({'ARMATURE'})
+        bpy.ops.export_scene.fbx(filepath=clip_file, **(export_settings or self.build_clip_export_settings()))
+        return clip_file
+    
+    def export_split_fbx(self):
+        """分片导出：Model.fbx（网格+骨骼）+ 每个动作一个 Model@Clip.fbx（骨骼+该动作）
+        
+        动作文件在多个Blender工作进程中并行导出；动作内容未变化的文件保留不动，
+        这样修改一个动作只会让Unity重新导入一个小文件。
+        """
+        print(f"\n📤 分片导出FBX（Unity model@clip 约定）...")
+        self.setup_output_directory()
+        model_file = os.path.join(self.output_path, self.output_filename)
+        model_stem = os.path.splitext(self.output_filename)[0]
+        
+        previous = self.load_previous_report() or {}
+        
+        # 1. 只含网格和骨骼的模型文件（模型输入和导出参数未变化时保留原文件）
+        self.model_export_hash = self.model_content_hash()
+        if previous.get("model_export_hash") == self.model_export_hash and os.path.exists(model_file):
+            print(f"  ├─ 模型文件未变化: {os.path.basename(model_file)}")
+        else:
+            self.select_export_objects({'ARMATURE', 'MESH'})
+            bpy.ops.export_scene.fbx(filepath=model_file, **self.build_model_only_export_settings())
+            print(f"  ├─ ✓ 模型文件: {os.path.basename(model_file)}")
+        
+        # 2. 判断哪些动作需要重新导出
+        previous_clips = {clip.get("path"): clip for clip in previous.get("clip_files") or []}
+        
+        self.clip_results = []
+        pending = []
+        used_names = set()
+        for action in self.merged_actions:
+            base_name = self.make_clip_name(action)
+            clip_name = base_name
+            suffix = 1
+            # 重名时递增后缀，直到不与已有片段名（包括真实的 Run_1 之类）冲突
+            while clip_name in used_names:
+                clip_name = f"{base_name}_{suffix}"
+                suffix += 1
+            used_names.add(clip_name)
+            
+            clip_file = os.path.join(self.output_path, f"{model_stem}@{clip_name}.fbx")
+            entry = {"action": action.name, "clip": clip_name, "path": clip_file, "hash": self.action_content_hash(action)}
+            old = previous_clips.get(clip_file)
+            if old and old.get("hash") == entry["hash"] and os.path.exists(clip_file):
+                entry["status"] = "unchanged"
+            else:
+                pending.append((action, entry))
+            self.clip_results.append(entry)
+        
+        print(f"  ├─ 动作文件: {len(self.clip_results)} 个 (需要导出 {len(pending)} 个)")
+        
+        # 删除不再对应任何动作的旧文件
+        current_paths = {entry["path"] for entry in self.clip_results}
+        for old_path in previous_clips:
+            if old_path not in current_paths and old_path and os.path.exists(old_path):
+                os.remove(old_path)
+                print(f"  ├─ 删除过期动作文件: {os.path.basename(old_path)}")
+        
+        if pending:
+            self.export_clips(pending)
+        
+        failed = [entry for entry in self.clip_results if entry.get("status") == "failed"]
+        print(f"  └─ ✓ 分片导出完成: {len(self.clip_results) - len(failed)} 成功, {len(failed)} 失败")
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个动作文件导出失败: {', '.join(entry['clip'] for entry in failed)}")
+        return model_file
+    
+    def export_clips(self, pending):
+        """导出动作文件：优先使用Blender工作进程并行导出，不可用时在当前进程逐个导出"""
+        pool = None
+        if BlenderWorkerPool is not None and len(pending) > 1:
+            try:
+                workers = int(self.settings.get('split_export_workers') or 0) or None
+                pool = BlenderWorkerPool(max_workers=workers, log_dir=os.path.join(self.output_path, "logs_split"))
+            except FileNotFoundError as e:
+                print(f"  ⚠ {e}，改为当前进程逐个导出")
+        
+        if pool is None:
+            for action, entry in pending:
+                clip_start = time.time()
+                try:
+                    self.export_clip(action, entry["path"])
+                    entry["status"] = "exported"
+                except Exception as e:
+                    entry["status"] = "failed"
+                    entry["error"] = str(e)
+                entry["seconds"] = round(time.time() - clip_start, 3)
+            return
+        
+        # 工作进程打开当前场景的副本（动作需要有用户才会保存）
+        for action, _ in pending:
+            action.use_fake_user = True
+        temp_blend = os.path.join(self.output_path, "_split_export.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=temp_blend, copy=True)
+        
+        # 工作进程使用与父进程（以及 action_content_hash）完全相同的导出参数，
+        # 代码中修改的设置或未使用 --config 时也不会退回默认值
+        settings_file = os.path.join(self.output_path, "_split_export_settings.json")
+        clip_settings = dict(self.build_clip_export_settings())
+        clip_settings["object_types"] = sorted(clip_settings["object_types"])
+        with open(settings_file, 'w', encoding='utf-8') as f:
+            json.dump(clip_settings, f, indent=2, ensure_ascii=False)
+        
+        try:
+            base_args = ["--clip-settings", settings_file]
+            for action, entry in pending:
+                pool.submit(
+                    entry["clip"],
+                    os.path.abspath(__file__),
+                    base_args + ["--export-clip", action.name, "--clip-output", entry["path"]],
+                    blend_file=temp_blend
+                )
+            
+            results = {result["name"]: result for result in pool.run()}
+            for _, entry in pending:
+                result = results.get(entry["clip"], {})
+                entry["seconds"] = result.get("seconds")
+                if result.get("status") == "ok" and os.path.exists(entry["path"]):
+                    entry["status"] = "exported"
+                else:
+                    entry["status"] = "failed"
+                    entry["error"] = result.get("error") or f"工作进程失败，日志: {result.get('log_path')}"
+        finally:
+            for temp_file in (temp_blend, settings_file):
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+    
     def setup_output_directory(self):
         """创建输出目录"""
         if not os.path.exists(self.output_path):
@@ -516,40 +1286,7 @@ class FBXMerger:
                 obj.select_set(True)
         
         # FBX导出设置
-        bpy.ops.export_scene.fbx(
-            filepath=output_file,
-            use_selection=True,  # 只导出选中的对象
-            use_active_collection=False,
-            global_scale=1.0,
-            apply_unit_scale=True,
-            apply_scale_options='FBX_SCALE_NONE',
-            bake_space_transform=False,
-            object_types={'ARMATURE', 'MESH'},
-            use_mesh_modifiers=True,
-            use_mesh_modifiers_render=True,
-            mesh_smooth_type='OFF',
-            use_subsurf=False,
-            use_mesh_edges=False,
-            use_tspace=False,
-            use_custom_props=False,
-            add_leaf_bones=False,             # 【优化】关闭叶子骨生成，避免Unity/UE中的多余骨骼
-            primary_bone_axis='Y',
-            secondary_bone_axis='X',
-            use_armature_deform_only=False,
-            armature_nodetype='NULL',
-            bake_anim=True,  # 重要：烘焙动画
-            bake_anim_use_all_bones=True,
-            bake_anim_use_nla_strips=True,    # 使用NLA条带
-            bake_anim_use_all_actions=True,   # 【关键】烘焙所有动作，确保完整导出
-            bake_anim_force_startend_keying=True,
-            bake_anim_step=1.0,
-            bake_anim_simplify_factor=1.0,
-            path_mode='AUTO',
-            embed_textures=False,
-            batch_mode='OFF',
-            use_batch_own_dir=True,
-            use_metadata=True
-        )
+        bpy.ops.export_scene.fbx(filepath=output_file, **self.build_export_settings())
         
         print(f"  ✓ FBX文件已导出: {output_file}")
         
@@ -560,30 +1297,147 @@ class FBXMerger:
         
         return output_file
     
+    def get_report_path(self):
+        return os.path.join(self.output_path, "merge_report.json")
+    
+    def load_previous_report(self):
+        """读取上次的合并报告，不存在或损坏时返回None"""
+        report_file = self.get_report_path()
+        if not os.path.exists(report_file):
+            return None
+        try:
+            with open(report_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"  ⚠ 无法读取上次的合并报告: {e}")
+            return None
+    
+    def file_fingerprint(self, path, previous=None):
+        """文件指纹；大小和修改时间与上次一致时直接沿用上次的哈希，避免重复读取大文件"""
+        if not os.path.exists(path):
+            return {"path": path, "missing": True}
+        
+        stat = os.stat(path)
+        fingerprint = {"path": path, "size": stat.st_size, "mtime": round(stat.st_mtime, 3)}
+        if previous and previous.get("size") == fingerprint["size"] and previous.get("mtime") == fingerprint["mtime"]:
+            fingerprint["sha256"] = previous.get("sha256")
+            return fingerprint
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        fingerprint["sha256"] = digest.hexdigest()
+        return fingerprint
+    
+    def build_input_fingerprints(self, animation_paths, previous_inputs=None):
+        """模型和全部动画文件的指纹列表（顺序与合并顺序一致）"""
+        previous_by_path = {entry.get("path"): entry for entry in (previous_inputs or [])}
+        return [
+            self.file_fingerprint(path, previous_by_path.get(path))
+            for path in [self.model_path] + list(animation_paths)
+        ]
+    
+    def build_effective_settings(self):
+        """影响输出结果的全部设置（JSON可序列化）"""
+        export_settings = dict(self.build_export_settings())
+        export_settings["object_types"] = sorted(export_settings["object_types"])
+        # 推导出的简化系数由输入和精简容差决定，这里记录配置值，运行前后的比较才一致
+        export_settings["bake_anim_simplify_factor"] = self.export_settings['bake_anim_simplify_factor']
+        return {
+            "output_filename": self.output_filename,
+            "settings": dict(self.settings),
+            "keyframe_reduction": dict(self.keyframe_reduction),
+            "model_import": self.build_model_import_settings(),
+            "animation_import": self.build_animation_import_settings(),
+            "export": export_settings
+        }
+    
+    def check_up_to_date(self, animation_paths):
+        """与上次报告比较输入指纹、设置和脚本版本，返回 (是否最新, 原因)"""
+        previous = self.load_previous_report()
+        self.input_fingerprints = self.build_input_fingerprints(
+            animation_paths, previous.get("inputs") if previous else None
+        )
+        
+        if not previous:
+            return False, "没有上次的合并报告"
+        # 上次有失败的动画文件或动作文件时重新合并（失败的输入也记录了指纹，不能据此跳过）
+        failed_files = (previous.get("statistics") or {}).get("failed_animation_files", 0)
+        if failed_files:
+            return False, f"上次有 {failed_files} 个动画文件处理失败"
+        failed_clips = [clip for clip in previous.get("clip_files") or [] if clip.get("status") == "failed"]
+        if failed_clips:
+            return False, f"上次有 {len(failed_clips)} 个动作文件导出失败"
+        if previous.get("script_version") != MERGER_VERSION:
+            return False, f"脚本版本变化 ({previous.get('script_version')} → {MERGER_VERSION})"
+        output_file = previous.get("output_file")
+        if not output_file or not os.path.exists(output_file):
+            return False, "输出文件不存在"
+        for clip in previous.get("clip_files") or []:
+            if not os.path.exists(clip.get("path", "")):
+                return False, f"动作文件不存在: {os.path.basename(clip.get('path', ''))}"
+        if previous.get("effective_settings") != json.loads(json.dumps(self.build_effective_settings())):
+            return False, "导入/导出设置变化"
+        
+        previous_inputs = previous.get("inputs") or []
+        if [entry.get("path") for entry in previous_inputs] != [entry["path"] for entry in self.input_fingerprints]:
+            return False, "输入文件列表变化"
+        for old, new in zip(previous_inputs, self.input_fingerprints):
+            if new.get("missing") or old.get("sha256") != new.get("sha256"):
+                return False, f"输入文件内容变化: {os.path.basename(new['path'])}"
+        
+        return True, "输入文件、设置和脚本版本均未变化"
+    
+    def mark_report_up_to_date(self):
+        """跳过合并时刷新报告的状态和检查时间（批处理据此判断任务已完成）"""
+        report = self.load_previous_report()
+        report["status"] = "up_to_date"
+        report["checked_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        # 沿用的指纹里 mtime 可能更新过（内容不变的 touch），写回以便下次跳过哈希
+        report["inputs"] = self.input_fingerprints
+        with open(self.get_report_path(), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
     def generate_report(self, output_file):
         """生成合并报告"""
         print("\n📋 生成合并报告...")
         
+        animation_files = [result["path"] for result in self.animation_results] or [self.animation_path]
         report = {
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "script_version": MERGER_VERSION,
+            "status": "merged",
+            "inputs": self.input_fingerprints,
+            "effective_settings": self.build_effective_settings(),
             "input_files": {
                 "model": self.model_path,
-                "animation": self.animation_path
+                "animation": animation_files[0],
+                "animations": animation_files
             },
             "output_file": output_file,
             "statistics": {
                 "model_armature": self.model_armature.name if self.model_armature else None,
                 "model_bones": len(self.model_armature.data.bones) if self.model_armature else 0,
                 "mesh_objects": len([obj for obj in bpy.context.scene.objects if obj.type == 'MESH']),
-                "imported_animations": len(self.imported_actions),
+                "animation_files": len(animation_files),
+                "failed_animation_files": len([r for r in self.animation_results if r["status"] == "failed"]),
+                "imported_animations": len(self.merged_actions),
                 "bone_mappings": len(self.bone_mapping),
-                "available_actions": len([action for action in bpy.data.actions])
+                "available_actions": len([action for action in bpy.data.actions]),
+                "output_file_size": os.path.getsize(output_file) if os.path.exists(output_file) else 0
             },
-            "imported_animations": [action.name for action in self.imported_actions],
+            "imported_animations": [action.name for action in self.merged_actions],
+            "action_coverage": [self.channel_index.coverage(action) for action in self.merged_actions],
+            "keyframe_reduction": self.reduction_stats,
+            "clip_files": self.clip_results,
+            "model_export_hash": self.model_export_hash,
+            "deform_profile": self.deform_profile_stats,
+            "animation_files": self.animation_results,
             "bone_mapping": self.bone_mapping
         }
         
-        report_file = os.path.join(self.output_path, "merge_report.json")
+        report_file = self.get_report_path()
         with open(report_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
         
@@ -594,42 +1448,84 @@ class FBXMerger:
         print(f"\n📊 合并摘要:")
         print(f"  ├─ 模型骨骼: {stats['model_bones']} 个骨骼")
         print(f"  ├─ 网格对象: {stats['mesh_objects']} 个")
+        print(f"  ├─ 动画文件: {stats['animation_files']} 个 (失败 {stats['failed_animation_files']} 个)")
         print(f"  ├─ 导入动画: {stats['imported_animations']} 个")
         print(f"  ├─ 骨骼映射: {stats['bone_mappings']} 对")
         print(f"  └─ 可用动作: {stats['available_actions']} 个")
     
-    def run(self):
-        """执行完整的FBX合并流程"""
+    def run(self, force=False):
+        """执行完整的FBX合并流程
+        
+        Args:
+            force: 为True时忽略最新检查，总是重新合并
+        
+        Returns:
+            输出文件路径
+        """
         print("🚀 开始FBX合并流程...")
         start_time = time.time()
         
         try:
+            animation_paths = self.resolve_animation_paths()
+            
+            # 输入、设置和脚本版本都没有变化时跳过合并
+            up_to_date, reason = self.check_up_to_date(animation_paths)
+            if up_to_date and not force:
+                self.mark_report_up_to_date()
+                print(f"\n✅ 输出已是最新，跳过合并（{reason}）")
+                print(f"  💡 使用 --force 强制重新合并")
+                return self.load_previous_report().get("output_file")
+            print(f"  ├─ {'强制重新合并' if force else '需要合并'}: {reason}")
+            
+            # 0. 检查输入文件并预读FBX信息
+            self.validate_paths(animation_paths)
+            
             # 1. 清理场景
             self.clear_scene()
             
-            # 2. 导入模型
+            # 2. 导入模型（只导入一次）
             self.import_model_fbx()
             
-            # 3. 导入动画
-            self.import_animation_fbx()
+            # 3-6. 逐个动画文件增量导入、骨骼映射、清理临时对象并传输动画
+            print(f"\n📚 待合并动画文件: {len(animation_paths)} 个")
+            self.merged_actions = []
+            self.animation_results = []
+            self.reduction_stats = None
+            self.simplify_factor_override = None
+            for index, animation_path in enumerate(animation_paths, 1):
+                self.merge_animation_file(animation_path, index, len(animation_paths))
             
-            # 4. 分析骨骼映射
-            self.analyze_bone_mapping()
+            if not self.merged_actions:
+                print("  ⚠ 所有动画文件都没有可传输的动画")
             
-            # 5. 清理动画导入的临时对象（骨骼映射完成后）
-            self.cleanup_animation_objects()
+            # 蒙皮骨骼导出配置（先去掉无用骨骼的曲线，再按剩余曲线推导简化系数）
+            if self.settings.get('export_profile', 'full') == 'deform_only':
+                self.apply_deform_only_profile()
+            if self.merged_actions and self.keyframe_reduction.get('enabled'):
+                self.reduce_merged_keyframes()
             
-            # 6. 传输动画
-            self.transfer_animations_to_model()
+            # 所有动作统一挂载到模型骨骼（Active Action + NLA轨道）
+            if self.merged_actions:
+                self.setup_animations_on_model(self.merged_actions)
+            self.print_available_actions()
             
-            # 7. 导出合并的FBX
-            output_file = self.export_merged_fbx()
+            # 7. 导出：单个合并FBX，或 Model.fbx + 每个动作一个 Model@Clip.fbx
+            if self.settings.get('export_mode', 'merged') == 'split':
+                output_file = self.export_split_fbx()
+            else:
+                output_file = self.export_merged_fbx()
+            
+            # 统计导出文件中实际写入的关键帧（导出器重新烘焙，Blender中的关键帧数不等于FBX中的数量）
+            if self.reduction_stats is not None:
+                exported_files = [output_file] + [entry["path"] for entry in self.clip_results]
+                self.reduction_stats["exported_fbx"] = self.measure_exported_keys(exported_files)
             
             # 8. 生成报告
             self.generate_report(output_file)
             
             elapsed_time = time.time() - start_time
             print(f"\n✅ FBX合并完成！耗时: {elapsed_time:.2f} 秒")
+            return output_file
             
         except Exception as e:
             print(f"\n❌ 合并过程中发生错误: {str(e)}")
@@ -640,12 +1536,38 @@ class FBXMerger:
 def main():
     """主函数 - 脚本入口点"""
     print("=" * 60)
-    print("🔧 FBX合并工具 v1.0.0")
+    print(f"🔧 FBX合并工具 v{MERGER_VERSION}")
     print("=" * 60)
     
+    # 命令行指定配置文件（批处理工作进程使用）：blender -b -P fbx_merge_blender.py -- --config 任务配置.json
+    config_file = None
+    for i, arg in enumerate(sys.argv):
+        if arg == '--config' and i + 1 < len(sys.argv):
+            config_file = sys.argv[i + 1]
+            if not os.path.exists(config_file):
+                raise FileNotFoundError(f"配置文件不存在: {config_file}")
+    
     # 创建合并器实例并运行
-    merger = FBXMerger()
-    merger.run()
+    merger = FBXMerger(config_file)
+    
+    # 分片导出工作进程：blender -b 临时场景.blend -P fbx_merge_blender.py -- --export-clip 动作名 --clip-output 路径 --clip-settings 导出参数.json
+    if '--export-clip' in sys.argv:
+        action_name = sys.argv[sys.argv.index('--export-clip') + 1]
+        clip_output = sys.argv[sys.argv.index('--clip-output') + 1]
+        clip_settings = None
+        if '--clip-settings' in sys.argv:
+            with open(sys.argv[sys.argv.index('--clip-settings') + 1], 'r', encoding='utf-8') as f:
+                clip_settings = json.load(f)
+            clip_settings["object_types"] = set(clip_settings["object_types"])
+        merger.model_armature = next(obj for obj in bpy.context.scene.objects if obj.type == 'ARMATURE')
+        merger.export_clip(bpy.data.actions[action_name], clip_output, clip_settings)
+        print(f"✓ 动作文件已导出: {clip_output}")
+        return
+    
+    if '--dry-run' in sys.argv:
+        merger.dry_run()
+    else:
+        merger.run(force='--force' in sys.argv)
 
 # 脚本执行入口
 if __name__ == "__main__":
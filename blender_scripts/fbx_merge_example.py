@@ -58,25 +58,25 @@ def example_custom_paths():
     merger.run()
 
 def example_batch_processing():
-    """批量处理示例（概念性）"""
+    """批量处理示例：每个任务在独立的blender后台进程中并行合并"""
     print("=" * 60)
-    print("📖 FBX合并工具 - 批量处理概念")
+    print("📖 FBX合并工具 - 批量处理")
     print("=" * 60)
     
-    print("\n🔧 概念：批量处理多个角色")
+    from fbx_batch_merge import run_batch_merge, load_base_config
     
-    # 定义批处理任务列表
+    # 定义批处理任务列表（animations 支持多个文件和通配符）
     batch_tasks = [
         {
             "name": "男性角色_闲置动画",
             "model": r"F:\ArtAssets\Male\Model\Male_Model.fbx",
-            "animation": r"F:\ArtAssets\Male\Animations\Male_Idle.fbx",
+            "animations": [r"F:\ArtAssets\Male\Animations\Male_Idle*.fbx"],
             "output": "Male_WithIdle.fbx"
         },
         {
             "name": "女性角色_行走动画", 
             "model": r"F:\ArtAssets\Female\Model\Female_Model.fbx",
-            "animation": r"F:\ArtAssets\Female\Animations\Female_Walk.fbx", 
+            "animations": [r"F:\ArtAssets\Female\Animations\Female_Walk.fbx"], 
             "output": "Female_WithWalk.fbx"
         }
     ]
@@ -85,20 +85,19 @@ def example_batch_processing():
     for i, task in enumerate(batch_tasks, 1):
         print(f"  {i}. {task['name']}")
         print(f"     模型: {os.path.basename(task['model'])}")
-        print(f"     动画: {os.path.basename(task['animation'])}")
+        print(f"     动画: {', '.join(os.path.basename(path) for path in task['animations'])}")
         print(f"     输出: {task['output']}")
     
-    print("\n💡 要实现批处理，可以在循环中创建FBXMerger实例:")
-    print("""
-    for task in batch_tasks:
-        merger = FBXMerger()
-        merger.model_path = task['model']
-        merger.animation_path = task['animation'] 
-        merger.output_filename = task['output']
-        merger.run()
-    """)
-    
-    print("⚠ 注意：这只是示例代码，实际文件路径需要存在")
+    print("\n💡 命令行等价用法（任务写入JSON文件）:")
+    print("    python fbx_batch_merge.py batch_tasks.json --workers 2")
+    print("⚠ 注意：示例文件路径需要替换为实际存在的文件，否则对应任务会记录为失败")
+    
+    run_batch_merge(
+        batch_tasks,
+        output_root=r"F:\UnityTestProjects\MakeDeadCell\merged_batch",
+        workers=2,
+        base_config=load_base_config(os.path.join(script_dir, "fbx_merge_config.json"))
+    )
 
 def show_configuration_options():
     """显示配置选项说明"""
@@ -139,7 +138,7 @@ def main():
     print("\n请选择要运行的示例:")
     print("1. 基本使用（使用配置文件）")
     print("2. 自定义路径使用")
-    print("3. 批量处理概念")
+    print("3. 批量处理（并行工作进程）")
     print("4. 配置选项说明")
     print("0. 退出")
     
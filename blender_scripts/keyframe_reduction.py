@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+关键帧精简 - 按容差控制FBX导出器写入的关键帧
+
+FBX导出器总是按 bake_anim_step 逐帧烘焙，再用 bake_anim_simplify_factor 删除变化很小的采样，
+Blender动作中的关键帧不会直接成为FBX关键帧。因此：
+- exporter_simplify_factor 由容差推导导出器的简化系数（真正减少FBX关键帧数和文件大小）
+- reduce_keys 是 Ramer-Douglas-Peucker 的函数曲线版本，计算容差内线性插值所需的关键帧（用于报告对比）：
+  误差按同一帧上的数值差（而不是点到线段的垂直距离）计算；
+  同一属性的多个分量（如四元数的 w/x/y/z）作为一组精简，保留的关键帧在各分量上对齐。
+
+不依赖bpy，FBXMerger 负责读取F曲线和设置导出参数。
+"""
+
+import math
+
+# FBX导出器（io_scene_fbx）的简化规则：采样值相对上一个写入值的变化小于 系数 × 0.1% × |数值| 时不写入
+EXPORTER_RELATIVE_THRESHOLD = 1.0e-3
+# 导出器写入的旋转曲线是欧拉角（度），绝对值不超过180
+EXPORTER_MAX_ROTATION_DEGREES = 180.0
+
+
+def channel_tolerance(property_name, settings):
+    """按属性类型返回容差：旋转以角度配置，位置/缩放以场景单位配置；未知属性返回None（不精简）"""
+    rotation_degrees = float(settings.get('rotation_tolerance_degrees', 0.1))
+    if property_name == 'rotation_quaternion':
+        # 单位四元数分量误差 ε 时角度误差约为 4ε（4个分量、θ≈2|Δq|）
+        return math.radians(rotation_degrees) / 4.0
+    if property_name in ('rotation_euler', 'rotation_axis_angle'):
+        return math.radians(rotation_degrees)
+    if property_name == 'location':
+        return float(settings.get('location_tolerance', 0.001))
+    if property_name == 'scale':
+        return float(settings.get('scale_tolerance', 0.001))
+    return None
+
+
+def exporter_simplify_factor(settings, max_location, max_scale):
+    """由容差推导FBX导出器的 bake_anim_simplify_factor
+    
+    导出器的阈值与数值大小成正比，取每类属性在最大数值处仍不超过容差的最大系数。
+    位置/缩放的容差与最大值单位相同，导出时的单位换算相互抵消。
+    
+    Args:
+        settings: keyframe_reduction 配置
+        max_location: 导出的骨骼局部位移最大绝对值（场景单位，含相对父骨骼的静止偏移），0表示没有位置曲线
+        max_scale: 缩放最大绝对值，0表示没有缩放曲线
+    """
+    factors = [float(settings.get('rotation_tolerance_degrees', 0.1)) / (EXPORTER_RELATIVE_THRESHOLD * EXPORTER_MAX_ROTATION_DEGREES)]
+    if max_location > 0.0:
+        factors.append(float(settings.get('location_tolerance', 0.001)) / (EXPORTER_RELATIVE_THRESHOLD * max_location))
+    if max_scale > 0.0:
+        factors.append(float(settings.get('scale_tolerance', 0.001)) / (EXPORTER_RELATIVE_THRESHOLD * max_scale))
+    return min(factors)
+
+
+def max_deviation(frames, rows, start, end):
+    """区间 (start, end) 内各关键帧相对首尾线性插值的最大误差及其位置"""
+    worst_error = -1.0
+    worst_index = start
+    frame_span = frames[end] - frames[start]
+    for index in range(start + 1, end):
+        t = (frames[index] - frames[start]) / frame_span if frame_span else 0.0
+        error = 0.0
+        for values in rows:
+            expected = values[start] + (values[end] - values[start]) * t
+            error = max(error, abs(values[index] - expected))
+        if error > worst_error:
+            worst_error = error
+            worst_index = index
+    return worst_error, worst_index
+
+
+def reduce_keys(frames, rows, tolerance):
+    """返回需要保留的关键帧索引（升序）
+
+    Args:
+        frames: 关键帧帧号列表（升序）
+        rows: 分量数值列表的列表，每个分量与 frames 等长
+        tolerance: 允许的最大数值误差
+    """
+    count = len(frames)
+    if count <= 2:
+        return list(range(count))
+
+    # 整条曲线是常量：保留首尾关键帧，静止姿势（待机、保持）的动作帧范围和片段长度不变
+    if all(abs(value - values[0]) <= tolerance for values in rows for value in values):
+        return [0, count - 1]
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+
+    # 用显式栈代替递归，长曲线（上万帧）不会超过递归深度
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        error, index = max_deviation(frames, rows, start, end)
+        if error > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [index for index, kept in enumerate(keep) if kept]
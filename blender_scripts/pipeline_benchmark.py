@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+死亡细胞渲染流水线 - 性能基准测试
+
+生产用FBX无法公开，因此基准测试使用 CharacterGenerator 合成角色：
+- 按目标顶点数/骨骼数生成参数化角色并自动绑定
+- 为骨骼生成程序化正弦关键帧动画
+- 在无界面模式下（Workbench 或 Cycles CPU）逐阶段运行渲染流水线
+- 记录 帧/秒、边界计算 毫秒/帧、精灵图集 MB/秒
+- 与保存的基线比较，超过阈值视为性能回退（退出码1）
+
+使用方法：
+    blender -b -P pipeline_benchmark.py -- --scenario small
+    blender -b -P pipeline_benchmark.py -- --scenario medium --engine cycles
+    blender -b -P pipeline_benchmark.py -- --vertices 20000 --bones 60 --actions 2 --frames 30
+    blender -b -P pipeline_benchmark.py -- --scenario small --save-baseline
+    blender -b -P pipeline_benchmark.py -- --scenario small --baseline D:\\bench\\baseline.json --threshold 0.1
+"""
+
+import bpy
+import os
+import sys
+import json
+import math
+import time
+
+# Blender的 -P 不会把脚本目录加入模块搜索路径
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from character_generator import CharacterGenerator, CharacterParameters
+from character_DeadCellTest import DeadCellsRenderPipeline
+
+
+# 预设场景：顶点数为目标值，实际顶点数取决于图元分段
+BENCHMARK_SCENARIOS = {
+    "small": {"vertices": 3000, "bones": 24, "actions": 2, "frames": 24},
+    "medium": {"vertices": 12000, "bones": 48, "actions": 3, "frames": 48},
+    "large": {"vertices": 40000, "bones": 96, "actions": 4, "frames": 60}
+}
+
+# 基准测试可选引擎及对应的流水线渲染后端
+BENCHMARK_ENGINES = {
+    "workbench": "workbench_flat",
+    "cycles": "cycles_cpu"
+}
+
+# CharacterGenerator 的基础骨骼数（Hip/Spine/Head + 双臂4×2 + 双腿3×2）
+BASE_BONE_COUNT = 17
+
+# 合成角色的图元数量（头、双手、双脚为球体；躯干、四肢为圆柱体）
+SPHERE_PART_COUNT = 5
+CYLINDER_PART_COUNT = 9
+
+# 指标方向：higher表示越大越好，lower表示越小越好
+METRIC_DIRECTIONS = {
+    "frames_per_second": "higher",
+    "bounds_ms_per_frame": "lower",
+    "sheet_mb_per_second": "higher",
+    "prepare_seconds": "lower"
+}
+
+DEFAULT_REGRESSION_THRESHOLD = 0.15
+
+
+def get_cli_value(flag, default=None):
+    """读取 -- 之后的命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def parse_benchmark_options():
+    """解析基准测试参数"""
+    scenario_name = get_cli_value('--scenario', 'small')
+    if scenario_name not in BENCHMARK_SCENARIOS:
+        print(f"⚠ 未知场景 {scenario_name}，使用 small")
+        scenario_name = 'small'
+    scenario = dict(BENCHMARK_SCENARIOS[scenario_name])
+
+    # 单项参数覆盖预设，覆盖后场景名改为自定义
+    overridden = False
+    for key in ('vertices', 'bones', 'actions', 'frames'):
+        value = get_cli_value(f'--{key}')
+        if value is not None:
+            scenario[key] = int(value)
+            overridden = True
+    if overridden:
+        scenario_name = f"custom_v{scenario['vertices']}_b{scenario['bones']}_a{scenario['actions']}_f{scenario['frames']}"
+
+    engine = get_cli_value('--engine', 'workbench').lower()
+    if engine not in BENCHMARK_ENGINES:
+        print(f"⚠ 未知引擎 {engine}，使用 workbench")
+        engine = 'workbench'
+
+    resolution = get_cli_value('--resolution')
+
+    return {
+        "scenario_name": scenario_name,
+        "scenario": scenario,
+        "engine": engine,
+        "resolution": int(resolution) if resolution else None,
+        "cycles_samples": int(get_cli_value('--cycles-samples', 4)),
+        "output_dir": get_cli_value('--output'),
+        "baseline_path": get_cli_value('--baseline', os.path.join(SCRIPT_DIR, "benchmark_baseline.json")),
+        "threshold": float(get_cli_value('--threshold', DEFAULT_REGRESSION_THRESHOLD)),
+        "save_baseline": '--save-baseline' in sys.argv
+    }
+
+
+class PipelineBenchmark:
+    """基于合成角色的渲染流水线基准测试"""
+
+    def __init__(self, options):
+        self.options = options
+        self.scenario = options["scenario"]
+
+        self.pipeline = DeadCellsRenderPipeline()
+        self.profiler = self.pipeline.profiler
+
+        # 基准输出与正式渲染输出隔离
+        if options["output_dir"]:
+            self.output_dir = os.path.normpath(os.path.abspath(options["output_dir"]))
+        else:
+            self.output_dir = os.path.join(self.pipeline.output_path, "_benchmark", options["scenario_name"])
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self.pipeline.output_path = self.output_dir
+        self.pipeline.character_name = "BenchmarkRig"
+        self.pipeline.config.setdefault('render_settings', {})['cycles_samples'] = options["cycles_samples"]
+        self.pipeline.set_render_backend(BENCHMARK_ENGINES[options["engine"]])
+        self.pipeline.timeout_seconds = 24 * 60 * 60  # 基准测试不触发超时提示
+        if options["resolution"]:
+            self.pipeline.render_resolution = (options["resolution"], options["resolution"])
+
+        self.mesh = None
+        self.armature = None
+        self.action_names = []
+        self.rig_info = {}
+
+    def segments_for_vertex_target(self, target_vertices):
+        """根据目标顶点数估算图元分段数"""
+        segments = 8
+        while segments < 512:
+            rings = max(3, segments // 2)
+            sphere_vertices = segments * (rings - 1) + 2
+            cylinder_vertices = segments * 2
+            total = SPHERE_PART_COUNT * sphere_vertices + CYLINDER_PART_COUNT * cylinder_vertices
+            if total >= target_vertices:
+                break
+            segments += 2
+        return segments, max(3, segments // 2)
+
+    def build_synthetic_rig(self):
+        """使用CharacterGenerator生成指定规模的绑定角色"""
+        # 清理上一次残留的动作，保证动画列表只包含基准动作
+        for action in list(bpy.data.actions):
+            bpy.data.actions.remove(action)
+
+        segments, rings = self.segments_for_vertex_target(self.scenario["vertices"])
+
+        params = CharacterParameters()
+        params.mesh_segments = segments
+        params.mesh_rings = rings
+        params.extra_spine_bones = max(0, self.scenario["bones"] - BASE_BONE_COUNT)
+        params.build_mode = "data"
+        # 测量构建耗时，不使用 DEADCELLS_CHARACTER_CACHE 缓存库
+        params.cache_dir = ""
+
+        generator = CharacterGenerator(params)
+        generator.character_name = self.pipeline.character_name
+        self.mesh, self.armature = generator.create_character()
+
+        self.rig_info = {
+            "target_vertices": self.scenario["vertices"],
+            "vertices": len(self.mesh.data.vertices),
+            "faces": len(self.mesh.data.polygons),
+            "bones": len(self.armature.data.bones),
+            "mesh_segments": segments,
+            "mesh_rings": rings,
+            "build_mode": params.build_mode,
+            "weight_mode": params.weight_mode
+        }
+        print(f"✓ 合成角色: {self.rig_info['vertices']} 顶点, {self.rig_info['bones']} 骨骼 (分段 {segments}/{rings})")
+
+    def create_procedural_actions(self, key_step=4):
+        """为每根骨骼生成相位错开的正弦摆动动画"""
+        armature = self.armature
+        if not armature.animation_data:
+            armature.animation_data_create()
+
+        frame_count = self.scenario["frames"]
+        key_frames = list(range(1, frame_count + 1, key_step))
+        if key_frames[-1] != frame_count:
+            key_frames.append(frame_count)
+
+        for action_index in range(self.scenario["actions"]):
+            action = bpy.data.actions.new(f"Bench_Action_{action_index + 1:02d}")
+            action.use_fake_user = True
+            armature.animation_data.action = action
+
+            amplitude = math.radians(10 + 5 * action_index)
+            for bone_index, pose_bone in enumerate(armature.pose.bones):
+                pose_bone.rotation_mode = 'XYZ'
+                phase = bone_index * 0.7 + action_index
+                for frame in key_frames:
+                    t = 2 * math.pi * (frame - 1) / frame_count
+                    pose_bone.rotation_euler = (
+                        amplitude * math.sin(t + phase),
+                        0.0,
+                        amplitude * 0.5 * math.cos(t + phase)
+                    )
+                    pose_bone.keyframe_insert(data_path="rotation_euler", frame=frame, group=pose_bone.name)
+
+            # 根骨骼上下起伏，使边界框随帧变化
+            root_bone = armature.pose.bones.get('Hip')
+            if root_bone:
+                for frame in key_frames:
+                    t = 2 * math.pi * (frame - 1) / frame_count
+                    root_bone.location = (0.0, 0.0, 0.05 * math.sin(t * 2))
+                    root_bone.keyframe_insert(data_path="location", frame=frame, group=root_bone.name)
+
+            self.action_names.append(action.name)
+
+        # 恢复静止姿态，由流水线按动画逐一激活
+        armature.animation_data.action = None
+        for pose_bone in armature.pose.bones:
+            pose_bone.rotation_euler = (0.0, 0.0, 0.0)
+            pose_bone.location = (0.0, 0.0, 0.0)
+
+        print(f"✓ 已生成 {len(self.action_names)} 个程序化动画 ({frame_count} 帧, 每 {key_step} 帧一个关键帧)")
+
+    def prepare_scene(self):
+        """运行流水线的场景准备阶段（对应正式流程的步骤3-8）"""
+        pipeline = self.pipeline
+        pipeline.original_mesh = self.mesh
+        pipeline.armature = self.armature
+
+        with self.profiler.stage("create_render_copy"):
+            pipeline.optimize_character_mesh(self.mesh)
+        with self.profiler.stage("setup_materials"):
+            pipeline.setup_dead_cells_materials(self.mesh)
+        with self.profiler.stage("setup_camera"):
+            pipeline.setup_orthographic_camera()
+        with self.profiler.stage("setup_lighting"):
+            pipeline.setup_lighting()
+        with self.profiler.stage("setup_world"):
+            pipeline.setup_world_settings()
+        with self.profiler.stage("setup_render_settings"):
+            pipeline.setup_render_settings()
+
+    def measure_bounds(self):
+        """逐帧测量已评估网格边界计算耗时，返回 毫秒/帧"""
+        pipeline = self.pipeline
+        target_mesh = pipeline.render_mesh if pipeline.render_mesh else pipeline.original_mesh
+        scene = bpy.context.scene
+
+        total_seconds = 0.0
+        frame_total = 0
+        for action_name in self.action_names:
+            action = bpy.data.actions[action_name]
+            if not pipeline.apply_animation_to_armature(action):
+                continue
+            for frame in range(scene.frame_start, scene.frame_end + 1):
+                scene.frame_set(frame)
+                start = time.perf_counter()
+                pipeline.calculate_evaluated_mesh_bounds(target_mesh, frame)
+                total_seconds += time.perf_counter() - start
+                frame_total += 1
+
+        return (total_seconds * 1000 / frame_total) if frame_total else None
+
+    def measure_sprite_sheets(self, rendered):
+        """生成精灵图集，返回 MB/秒（以输入帧PNG字节数计）"""
+        pipeline = self.pipeline
+        render_dirs = []
+        input_bytes = 0
+        for name in rendered:
+            safe_name = pipeline.sanitize_filename(name)
+            frames_dir = os.path.join(pipeline.output_path, safe_name)
+            if not os.path.isdir(frames_dir):
+                continue
+            frame_files = [f for f in os.listdir(frames_dir) if f.lower().endswith('.png')]
+            input_bytes += sum(os.path.getsize(os.path.join(frames_dir, f)) for f in frame_files)
+            render_dirs.append((safe_name, len(frame_files)))
+
+        start = time.perf_counter()
+        with self.profiler.stage("sprite_sheets"):
+            success = pipeline.generate_sprite_sheets_from_list(render_dirs)
+        elapsed = time.perf_counter() - start
+
+        if not success or elapsed <= 0:
+            return None
+        return input_bytes / (1024 * 1024) / elapsed
+
+    def run(self):
+        """运行完整基准测试，返回报告字典"""
+        print(f"=== 渲染流水线基准测试: {self.options['scenario_name']} ===")
+        self.profiler.reset()
+
+        with self.profiler.stage("synthesize_rig"):
+            self.build_synthetic_rig()
+            self.create_procedural_actions()
+
+        prepare_start = time.perf_counter()
+        with self.profiler.stage("prepare_scene"):
+            self.prepare_scene()
+        prepare_seconds = time.perf_counter() - prepare_start
+
+        with self.profiler.stage("bounds"):
+            bounds_ms_per_frame = self.measure_bounds()
+
+        with self.profiler.stage("render_animations"):
+            rendered = self.pipeline.render_all_animations(self.action_names)
+
+        sheet_mb_per_second = self.measure_sprite_sheets(rendered)
+
+        frame_times = [t for times in self.profiler.frame_timings.values() for t in times]
+        render_seconds = sum(frame_times)
+        metrics = {
+            "frames_per_second": round(len(frame_times) / render_seconds, 3) if render_seconds > 0 else None,
+            "bounds_ms_per_frame": round(bounds_ms_per_frame, 3) if bounds_ms_per_frame is not None else None,
+            "sheet_mb_per_second": round(sheet_mb_per_second, 3) if sheet_mb_per_second is not None else None,
+            "prepare_seconds": round(prepare_seconds, 3),
+            "rendered_frames": len(frame_times)
+        }
+
+        report = {
+            "scenario": self.options["scenario_name"],
+            "baseline_key": self.baseline_key(),
+            "engine": self.pipeline.eevee_engine,
+            "render_backend": self.pipeline.render_backend,
+            "resolution": list(self.pipeline.render_resolution),
+            "rig": self.rig_info,
+            "actions": self.scenario["actions"],
+            "frames_per_action": self.scenario["frames"],
+            "metrics": metrics,
+            "profile": self.profiler.build_report()
+        }
+
+        print("\n📊 基准测试结果:")
+        print(f"  ├─ 渲染: {metrics['frames_per_second']} 帧/秒 ({metrics['rendered_frames']} 帧)")
+        print(f"  ├─ 边界计算: {metrics['bounds_ms_per_frame']} 毫秒/帧")
+        print(f"  ├─ 精灵图集: {metrics['sheet_mb_per_second']} MB/秒")
+        print(f"  └─ 场景准备: {metrics['prepare_seconds']} 秒")
+
+        return report
+
+    def baseline_key(self):
+        """基线键：场景 + 引擎 + 分辨率 + 角色构建/权重方式，同一基线文件可保存多组结果
+
+        构建方式不同的 prepare_seconds 不可比较（例如数据级构建与运算符构建），不会互相对比。
+        """
+        width, height = self.pipeline.render_resolution
+        return (f"{self.options['scenario_name']}|{self.options['engine']}|{width}x{height}"
+                f"|{self.rig_info['build_mode']}|{self.rig_info['weight_mode']}")
+
+    def write_report(self, report):
+        """写出本次基准测试报告"""
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        report_path = os.path.join(self.output_dir, f"benchmark_report_{stamp}.json")
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📄 基准报告: {report_path}")
+        return report_path
+
+    def load_baselines(self):
+        """读取基线文件，不存在时返回空字典"""
+        baseline_path = self.options["baseline_path"]
+        if not os.path.exists(baseline_path):
+            return {}
+        try:
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠ 读取基线失败: {e}")
+            return {}
+
+    def save_baseline(self, report):
+        """把本次结果保存为对应键的基线"""
+        baselines = self.load_baselines()
+        baselines[report["baseline_key"]] = {
+            "metrics": report["metrics"],
+            "rig": report["rig"],
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "blender_version": bpy.app.version_string
+        }
+        with open(self.options["baseline_path"], 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, ensure_ascii=False)
+        print(f"💾 已保存基线: {report['baseline_key']} → {self.options['baseline_path']}")
+
+    def compare_with_baseline(self, report):
+        """与基线比较，返回回退项列表"""
+        baseline = self.load_baselines().get(report["baseline_key"])
+        if not baseline:
+            print(f"💡 没有找到基线 {report['baseline_key']}，使用 --save-baseline 保存")
+            return []
+
+        threshold = self.options["threshold"]
+        regressions = []
+        comparison = {}
+
+        print(f"\n📈 与基线比较（阈值 {threshold * 100:.0f}%）:")
+        for metric, direction in METRIC_DIRECTIONS.items():
+            current = report["metrics"].get(metric)
+            previous = baseline["metrics"].get(metric)
+            if current is None or not previous:
+                continue
+
+            change = (current - previous) / previous
+            # 统一为"变差比例"：正数表示变差
+            worse_ratio = -change if direction == "higher" else change
+            regressed = worse_ratio > threshold
+            comparison[metric] = {
+                "baseline": previous,
+                "current": current,
+                "change_percent": round(change * 100, 2),
+                "regressed": regressed
+            }
+
+            status = "❌ 回退" if regressed else "✓"
+            print(f"  ├─ {status} {metric}: {previous} → {current} ({change * 100:+.1f}%)")
+            if regressed:
+                regressions.append(metric)
+
+        report["baseline_comparison"] = comparison
+        return regressions
+
+
+def run_pipeline_benchmark():
+    """运行基准测试入口"""
+    options = parse_benchmark_options()
+    benchmark = PipelineBenchmark(options)
+
+    report = benchmark.run()
+    regressions = benchmark.compare_with_baseline(report)
+    report["regressions"] = regressions
+    benchmark.write_report(report)
+
+    if options["save_baseline"]:
+        benchmark.save_baseline(report)
+
+    if regressions:
+        print(f"\n❌ 检测到性能回退: {', '.join(regressions)}")
+        sys.exit(1)
+
+    print("\n🎉 基准测试完成")
+
+
+if __name__ == "__main__":
+    run_pipeline_benchmark()
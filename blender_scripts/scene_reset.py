@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+场景重置 - 所有 blender_scripts 共用的快速场景清理
+
+不使用 select_all + object.delete + orphans_purge 运算符，而是直接按依赖顺序从 bpy.data 批量删除：
+    对象 → 对象数据（网格/曲线/骨架/相机/灯光…）→ 粒子设置 → 材质/世界 → 节点组/贴图 → 图像 → 动作/文本 → 空集合
+每次重置后统计各类数据块的剩余数量；批量循环中剩余数量持续增长时给出泄漏警告，
+保证每个任务的内存和耗时保持稳定。
+
+也可以用空模板重新加载整个文件（mode="template"），适合需要完全干净状态的批处理；
+加载的是用户的启动文件（不含数据），用户偏好设置和已启用的插件保持不变，
+但会使所有已保存的 bpy 对象引用失效，并重置渲染设置。
+
+使用示例：
+    from scene_reset import reset_scene
+    stats = reset_scene()                              # 清空场景
+    reset_scene(keep_types={'materials'})              # 保留材质（由调用者自行清理）
+"""
+
+import time
+
+import bpy
+
+# 按依赖顺序删除的数据集合名称（对象已先删除）
+DATA_REMOVAL_ORDER = (
+    'meshes',
+    'curves',
+    'armatures',
+    'lattices',
+    'metaballs',
+    'cameras',
+    'lights',
+    'grease_pencils',
+    'particles',
+    'materials',
+    'worlds',
+    'node_groups',
+    'textures',
+    'images',
+    'actions',
+    'texts'
+)
+
+# 统计剩余数量的数据集合（形状键随网格一起释放，只统计不删除）
+TRACKED_DATA_TYPES = ('objects', 'collections') + DATA_REMOVAL_ORDER + ('shape_keys',)
+
+# 各集合剩余数量的历史基线（批量循环中检测泄漏）
+# 按 (保留的数据类型, 是否删除伪用户, 模式) 分别记录：保留材质的重置和完全重置剩余数量本就不同
+_baseline_counts = {}
+
+
+def datablock_counts():
+    """当前文件中各类数据块的数量"""
+    counts = {}
+    for data_type in TRACKED_DATA_TYPES:
+        collection = getattr(bpy.data, data_type, None)
+        if collection is not None:
+            counts[data_type] = len(collection)
+    return counts
+
+
+def is_removable(datablock, remove_fake_users=False):
+    """链接库中的数据和带伪用户的数据默认保留"""
+    if getattr(datablock, 'library', None) is not None:
+        return False
+    if datablock.use_fake_user and not remove_fake_users:
+        return False
+    return True
+
+
+def texts_in_editors():
+    """文本编辑器中打开的文本（可能是正在运行的脚本），重置时保留"""
+    texts = set()
+    for screen in bpy.data.screens:
+        for area in screen.areas:
+            for space in area.spaces:
+                if space.type == 'TEXT_EDITOR' and space.text is not None:
+                    texts.add(space.text.name)
+    return texts
+
+
+def batch_remove(datablocks):
+    """批量删除数据块；旧版本没有 batch_remove 时逐个删除"""
+    if not datablocks:
+        return 0
+    if hasattr(bpy.data, 'batch_remove'):
+        bpy.data.batch_remove(datablocks)
+    else:
+        for datablock in datablocks:
+            for data_type in TRACKED_DATA_TYPES:
+                collection = getattr(bpy.data, data_type, None)
+                if collection is not None and datablock.name in collection and collection[datablock.name] == datablock:
+                    collection.remove(datablock)
+                    break
+    return len(datablocks)
+
+
+def collection_is_empty(collection):
+    """集合及其子集合中都没有对象"""
+    if collection.objects:
+        return False
+    return all(collection_is_empty(child) for child in collection.children)
+
+
+def ensure_object_mode():
+    """编辑模式下的网格数据不能删除，先回到对象模式"""
+    active = bpy.context.view_layer.objects.active if bpy.context.view_layer else None
+    if active and active.mode != 'OBJECT':
+        try:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        except RuntimeError:
+            pass
+
+
+def reset_scene(keep_types=None, remove_fake_users=False, mode="data", max_passes=4, verbose=True):
+    """重置场景
+
+    Args:
+        keep_types: 不清理的数据集合名称（如 {'materials'}）
+        remove_fake_users: 是否同时删除带伪用户的数据块
+        mode: "data" 直接删除数据块 | "template" 加载空文件
+        max_passes: 孤立数据删除的最大轮数（删除材质后图像才会变成孤立数据）
+        verbose: 是否打印统计
+
+    Returns:
+        统计字典：removed（各类删除数量）、remaining（剩余数量）、seconds、leak_warnings
+    """
+    start = time.perf_counter()
+    keep_types = set(keep_types or ())
+    removed = {}
+
+    if mode == "template":
+        # 加载不含数据的启动文件，所有数据块一次性释放（不像 read_factory_settings 那样重置偏好设置和插件）
+        before = datablock_counts()
+        bpy.ops.wm.read_homefile(use_empty=True)
+        after = datablock_counts()
+        removed = {data_type: before[data_type] - after.get(data_type, 0) for data_type in before}
+    else:
+        ensure_object_mode()
+
+        # 1. 对象
+        objects = [obj for obj in bpy.data.objects if is_removable(obj, remove_fake_users)]
+        removed['objects'] = batch_remove(objects)
+
+        # 2. 对象数据及其依赖，按顺序多轮删除无用户的数据块
+        open_texts = texts_in_editors()
+        for _ in range(max_passes):
+            removed_this_pass = 0
+            for data_type in DATA_REMOVAL_ORDER:
+                if data_type in keep_types:
+                    continue
+                collection = getattr(bpy.data, data_type, None)
+                if collection is None:
+                    continue
+                orphans = [
+                    datablock for datablock in collection
+                    if datablock.users == 0 and is_removable(datablock, remove_fake_users)
+                    and not (data_type == 'texts' and datablock.name in open_texts)
+                ]
+                count = batch_remove(orphans)
+                removed[data_type] = removed.get(data_type, 0) + count
+                removed_this_pass += count
+            if removed_this_pass == 0:
+                break
+
+        # 3. 清空后的集合
+        if 'collections' not in keep_types:
+            empty_collections = [
+                collection for collection in bpy.data.collections
+                if is_removable(collection, remove_fake_users) and collection_is_empty(collection)
+            ]
+            removed['collections'] = batch_remove(empty_collections)
+
+    remaining = datablock_counts()
+    seconds = time.perf_counter() - start
+
+    # 与相同设置下第一次重置后的剩余数量比较，持续增长说明有数据泄漏
+    leak_warnings = []
+    baseline_key = (frozenset(keep_types), remove_fake_users, mode)
+    baseline = _baseline_counts.get(baseline_key)
+    if baseline is None:
+        _baseline_counts[baseline_key] = dict(remaining)
+    else:
+        for data_type, count in remaining.items():
+            if count > baseline.get(data_type, 0):
+                leak_warnings.append(f"{data_type}: {baseline.get(data_type, 0)} → {count}")
+
+    stats = {
+        "mode": mode,
+        "removed": {data_type: count for data_type, count in removed.items() if count},
+        "remaining": {data_type: count for data_type, count in remaining.items() if count},
+        "seconds": round(seconds, 4),
+        "leak_warnings": leak_warnings
+    }
+
+    if verbose:
+        removed_total = sum(stats["removed"].values())
+        print(f"  ✓ 场景已重置: 删除 {removed_total} 个数据块, 耗时 {seconds * 1000:.1f} ms")
+        if stats["remaining"]:
+            remaining_text = ", ".join(f"{data_type} {count}" for data_type, count in stats["remaining"].items())
+            print(f"  ├─ 剩余数据块: {remaining_text}")
+        for warning in leak_warnings:
+            print(f"  ⚠ 数据块数量比首次重置后增加（可能泄漏）: {warning}")
+
+    return stats
+
+
+def reset_baseline():
+    """重新记录泄漏检测基线（例如切换到另一类批处理任务时）"""
+    _baseline_counts.clear()
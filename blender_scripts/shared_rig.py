@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享骨架 - 同一场景中的多个角色变体共用一个骨架数据块和同一组动作
+
+每个生成/导入的角色都带有自己的骨架数据和动作副本，在一个场景中渲染人群或阵容时，
+内存和依赖图开销随角色数成倍增长。骨骼拓扑（骨骼名 + 父子关系）相同的变体改为：
+- 共用第一个变体（参考）的骨架数据块（关联复制），删除各自的骨架数据
+- 变体与参考的差异（骨骼长度、位置、缩放）写入一个单帧的"静止偏移"动作，
+  放在NLA底层轨道上；当前动作以 COMBINE 方式叠加在偏移之上
+- 网格顶点按权重转换到参考骨架的静止空间，静止姿态和动画下的形变与原骨架一致
+- 动画动作从动作库 .blend 链接（只读、不复制），所有变体共用
+
+偏移按 位置相加 / 旋转相乘 / 缩放相乘 合成：骨骼方向相同、只有长度不同时（CharacterGenerator
+的比例变体即如此）结果精确；带旋转偏移的骨骼上如果动作还有位移关键帧，位移不随偏移旋转（近似）。
+注意：渲染流水线的 setup_nla_for_action 会静音所有NLA轨道，共享骨架阵容用于人群场景，不用于逐个角色渲染。
+
+使用方法：
+    blender -b -P shared_rig.py -- --sweep sweep.json --output roster.blend
+    blender -b -P shared_rig.py -- --sweep sweep.json --actions D:\\anim_library.blend --spacing 1.2
+"""
+
+import os
+import sys
+import time
+
+import bpy
+from mathutils import Vector
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+REST_OFFSET_TRACK = "RestOffset"
+
+
+def get_cli_value(flag, default=None):
+    """读取 -- 之后的命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def bone_topology_signature(armature_data):
+    """骨骼拓扑签名：(骨骼名, 父骨骼名) 的有序元组"""
+    return tuple(sorted(
+        (bone.name, bone.parent.name if bone.parent else "")
+        for bone in armature_data.bones
+    ))
+
+
+def parent_space_rest(bone):
+    """骨骼在父骨骼空间中的静止矩阵"""
+    if bone.parent:
+        return bone.parent.matrix_local.inverted() @ bone.matrix_local
+    return bone.matrix_local.copy()
+
+
+def skinned_meshes(armature_obj):
+    """Armature 修改器指向该骨架的网格对象"""
+    return [
+        obj for obj in bpy.data.objects
+        if obj.type == 'MESH' and any(
+            modifier.type == 'ARMATURE' and modifier.object == armature_obj
+            for modifier in obj.modifiers
+        )
+    ]
+
+
+class SharedRigManager:
+    """把拓扑相同的骨架合并为一个共享骨架数据块"""
+
+    def __init__(self):
+        self.stats = {
+            "armatures": 0,
+            "groups": 0,
+            "shared_datablocks_removed": 0,
+            "rebound_meshes": 0,
+            "rebound_vertices": 0
+        }
+
+    def share(self, armature_objects):
+        """按拓扑分组，每组共用第一个骨架的数据块；返回 {签名: 参考骨架对象}"""
+        groups = {}
+        for armature_obj in armature_objects:
+            self.stats["armatures"] += 1
+            signature = bone_topology_signature(armature_obj.data)
+            groups.setdefault(signature, []).append(armature_obj)
+
+        references = {}
+        for signature, members in groups.items():
+            reference = members[0]
+            references[signature] = reference
+            self.stats["groups"] += 1
+            for variant in members[1:]:
+                if variant.data != reference.data:
+                    self.attach_to_shared_data(variant, reference.data)
+
+        return references
+
+    def attach_to_shared_data(self, variant, shared_data):
+        """把变体切换到共享骨架数据：重新绑定网格、写入静止偏移、删除原骨架数据"""
+        own_data = variant.data
+
+        # 骨架空间中的静止矩阵修正：变体静止 @ 参考静止⁻¹
+        corrections = {
+            bone.name: bone.matrix_local @ shared_data.bones[bone.name].matrix_local.inverted()
+            for bone in own_data.bones
+        }
+        for mesh_obj in skinned_meshes(variant):
+            self.rebind_mesh(mesh_obj, variant, corrections)
+
+        offsets = {
+            bone.name: parent_space_rest(shared_data.bones[bone.name]).inverted() @ parent_space_rest(bone)
+            for bone in own_data.bones
+        }
+
+        variant.data = shared_data
+        self.write_rest_offsets(variant, offsets)
+
+        if own_data.users == 0:
+            bpy.data.armatures.remove(own_data)
+            self.stats["shared_datablocks_removed"] += 1
+
+    def rebind_mesh(self, mesh_obj, armature_obj, corrections):
+        """按顶点权重把顶点变换到参考骨架的静止空间（静止姿态下形变结果不变）"""
+        mesh_data = mesh_obj.data
+        group_bones = {group.index: group.name for group in mesh_obj.vertex_groups if group.name in corrections}
+        if not group_bones:
+            return
+
+        to_armature = armature_obj.matrix_world.inverted() @ mesh_obj.matrix_world
+        from_armature = to_armature.inverted()
+
+        coordinates = [0.0] * (len(mesh_data.vertices) * 3)
+        mesh_data.vertices.foreach_get('co', coordinates)
+
+        for vertex in mesh_data.vertices:
+            total = 0.0
+            blended = None
+            for element in vertex.groups:
+                bone_name = group_bones.get(element.group)
+                if bone_name is None or element.weight <= 0.0:
+                    continue
+                weighted = corrections[bone_name] * element.weight
+                blended = weighted if blended is None else blended + weighted
+                total += element.weight
+            if blended is None:
+                continue
+
+            blended = blended * (1.0 / total)
+            index = vertex.index * 3
+            position = to_armature @ Vector(coordinates[index:index + 3])
+            position = from_armature @ (blended.inverted_safe() @ position)
+            coordinates[index:index + 3] = position
+
+        mesh_data.vertices.foreach_set('co', coordinates)
+        mesh_data.update()
+        self.stats["rebound_meshes"] += 1
+        self.stats["rebound_vertices"] += len(mesh_data.vertices)
+
+    def write_rest_offsets(self, armature_obj, offsets):
+        """把静止偏移写入单帧动作，放在NLA底层轨道；当前动作以 COMBINE 方式叠加"""
+        action = bpy.data.actions.new(f"{armature_obj.name}_{REST_OFFSET_TRACK}")
+        for bone_name, offset in offsets.items():
+            pose_bone = armature_obj.pose.bones.get(bone_name)
+            if pose_bone is None:
+                continue
+            location, rotation, scale = offset.decompose()
+            if pose_bone.rotation_mode == 'QUATERNION':
+                rotation_path, rotation_values = 'rotation_quaternion', tuple(rotation)
+            elif pose_bone.rotation_mode == 'AXIS_ANGLE':
+                axis, angle = rotation.to_axis_angle()
+                rotation_path, rotation_values = 'rotation_axis_angle', (angle, axis[0], axis[1], axis[2])
+            else:
+                rotation_path, rotation_values = 'rotation_euler', tuple(rotation.to_euler(pose_bone.rotation_mode))
+
+            for property_name, values in (('location', tuple(location)), (rotation_path, rotation_values), ('scale', tuple(scale))):
+                for index, value in enumerate(values):
+                    fcurve = action.fcurves.new(
+                        data_path=f'pose.bones["{bone_name}"].{property_name}', index=index, action_group=bone_name
+                    )
+                    fcurve.keyframe_points.insert(1.0, value)
+
+        animation_data = armature_obj.animation_data or armature_obj.animation_data_create()
+        track = animation_data.nla_tracks.new()
+        track.name = REST_OFFSET_TRACK
+        strip = track.strips.new(action.name, 1, action)
+        strip.blend_type = 'REPLACE'
+        strip.extrapolation = 'HOLD'
+        animation_data.action_blend_type = 'COMBINE'
+
+    def share_actions(self, armature_objects, action):
+        """所有变体播放同一个动作数据块"""
+        for armature_obj in armature_objects:
+            animation_data = armature_obj.animation_data or armature_obj.animation_data_create()
+            animation_data.action = action
+            # 参考骨架没有偏移轨道，也用 COMBINE 保持一致
+            animation_data.action_blend_type = 'COMBINE'
+
+
+def link_action_library(library_path):
+    """从动作库 .blend 链接全部动作（只读，不复制关键帧数据）"""
+    with bpy.data.libraries.load(library_path, link=True) as (data_from, data_to):
+        data_to.actions = list(data_from.actions)
+    actions = [action for action in data_to.actions if action is not None]
+    print(f"✓ 已链接 {len(actions)} 个动作: {library_path}")
+    return actions
+
+
+def build_roster(variants, spacing=1.0, action_library=None):
+    """在一个场景中生成所有变体并共享骨架，返回 (骨架列表, 统计)"""
+    from character_generator import CharacterGenerator, CharacterParameters
+    from character_sweep import apply_parameters
+
+    start = time.time()
+    armatures = []
+    for index, variant in enumerate(variants):
+        params = CharacterParameters()
+        unknown = apply_parameters(params, variant["parameters"])
+        if unknown:
+            print(f"⚠ {variant['name']}: 忽略未知参数 {', '.join(unknown)}")
+
+        generator = CharacterGenerator(params)
+        generator.character_name = variant["name"]
+        # 只在生成第一个变体前清理场景
+        generator.clear_before_create = index == 0
+        mesh, armature = generator.create_character()
+        armature.location.x = index * spacing
+        armatures.append(armature)
+
+    armature_count_before = len(bpy.data.armatures)
+    manager = SharedRigManager()
+    manager.share(armatures)
+
+    if action_library:
+        actions = link_action_library(action_library)
+        if actions:
+            manager.share_actions(armatures, actions[0])
+
+    stats = dict(manager.stats)
+    stats.update({
+        "armature_datablocks_before": armature_count_before,
+        "armature_datablocks_after": len(bpy.data.armatures),
+        "seconds": round(time.time() - start, 3)
+    })
+
+    print(f"\n📊 共享骨架阵容:")
+    print(f"  ├─ 变体: {len(armatures)} 个, 拓扑分组: {stats['groups']}")
+    print(f"  ├─ 骨架数据块: {stats['armature_datablocks_before']} → {stats['armature_datablocks_after']}")
+    print(f"  ├─ 重新绑定网格: {stats['rebound_meshes']} 个 ({stats['rebound_vertices']} 顶点)")
+    print(f"  └─ 耗时: {stats['seconds']:.2f} 秒")
+    return armatures, stats
+
+
+def main():
+    """命令行入口：按扫描配置生成共享骨架的阵容场景"""
+    import json
+    from character_sweep import expand_sweep
+
+    sweep_file = get_cli_value('--sweep')
+    if not sweep_file or not os.path.exists(sweep_file):
+        print("用法: blender -b -P shared_rig.py -- --sweep 扫描配置.json [--output 阵容.blend] [--actions 动作库.blend] [--spacing 1.0]")
+        sys.exit(1)
+
+    with open(sweep_file, 'r', encoding='utf-8') as f:
+        variants = expand_sweep(json.load(f))
+
+    build_roster(
+        variants,
+        spacing=float(get_cli_value('--spacing', 1.0)),
+        action_library=get_cli_value('--actions')
+    )
+
+    output = get_cli_value('--output')
+    if output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(output))
+        print(f"✓ 阵容场景已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+武器批量生成器 - 按 CastleDB weapons 表生成整个武器库
+
+create_sword.py / create_sword_simple.py 通过编辑模式运算符（inset_faces、extrude_region_move、
+transform.resize）逐个构建一把写死参数的剑。这里改为：
+- 从 CastleDB 的 weapons 表读取每种武器
+- weaponType 决定外形（Melee 剑 / Ranged 弓），range 决定剑刃（或弓臂）长度，
+  damageType 决定材质和护手尺寸
+- 每把武器的所有部件在一个 bmesh 中直接构建顶点和面，写入网格数据（不使用运算符和编辑模式），
+  一个进程内几秒即可重新生成整个武器库；重复生成时复用同名的网格、对象和材质
+
+坐标约定：握持点（剑柄/弓把中心）位于对象原点，剑刃/弓臂沿 +Z，
+剑刃宽度和弓的弯曲在 Y/Z 平面内（侧视相机沿 X 轴观察时可见）。
+
+使用方法：
+    blender -b -P weapon_generator.py -- --output armory.blend
+    blender -b -P weapon_generator.py -- --weapons basic_sword,fire_bow --fbx-dir D:\\weapons
+    blender -b -P weapon_generator.py -- --cdb D:\\game\\castle_db.cdb
+"""
+
+import os
+import sys
+import time
+
+import bpy
+import bmesh
+from mathutils import Vector
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from castle_db import load_weapons
+from character_generator import uv_sphere_geometry, cylinder_geometry
+
+try:
+    from scene_reset import reset_scene
+except ImportError:
+    reset_scene = None
+
+ARMORY_COLLECTION = "Armory"
+
+# 材质槽：0 剑刃/弓臂，1 护手/剑首/弓弦，2 握把
+BLADE_SLOT, FITTING_SLOT, GRIP_SLOT = 0, 1, 2
+
+# weaponType → 外形和基础尺寸；长度 = clamp(range × length_per_range + length_base, min, max)
+WEAPON_TYPE_PROFILES = {
+    "Melee": {
+        "shape": "blade",
+        "length_base": 0.0,
+        "length_per_range": 1.5,
+        "min_length": 1.5,
+        "max_length": 4.5,
+        "blade_width": 0.5,
+        "blade_thickness": 0.1,
+        "handle_length": 1.0,
+        "handle_radius": 0.12,
+        "pommel_radius": 0.18
+    },
+    "Ranged": {
+        "shape": "bow",
+        "length_base": 1.0,
+        "length_per_range": 0.15,
+        "min_length": 2.0,
+        "max_length": 4.5,
+        "blade_width": 0.16,
+        "blade_thickness": 0.12,
+        "handle_length": 0.6,
+        "handle_radius": 0.12,
+        "pommel_radius": 0.0
+    }
+}
+
+# damageType → 剑刃材质和护手比例
+DAMAGE_TYPE_PROFILES = {
+    "Physical": {
+        "color": (0.8, 0.8, 0.9, 1.0),
+        "metallic": 0.9,
+        "roughness": 0.1,
+        "emission": 0.0,
+        "guard_scale": 1.0
+    },
+    "Fire": {
+        "color": (0.9, 0.35, 0.1, 1.0),
+        "metallic": 0.6,
+        "roughness": 0.3,
+        "emission": 2.0,
+        "guard_scale": 1.25
+    }
+}
+
+FITTING_MATERIAL = ("Weapon_Fittings", (0.3, 0.3, 0.32, 1.0), 0.8, 0.4)
+GRIP_MATERIAL = ("Weapon_Grip", (0.4, 0.2, 0.1, 1.0), 0.0, 0.8)
+
+
+class WeaponParameters:
+    """单把武器的几何和材质参数"""
+
+    def __init__(self):
+        self.shape = "blade"           # blade 剑 | bow 弓
+        self.damage_type = "Physical"
+
+        # 剑刃（弓：弓臂总长、握把处宽度和厚度）
+        self.blade_length = 3.0
+        self.blade_width = 0.5
+        self.blade_thickness = 0.1
+        self.tip_length = 0.6
+
+        # 护手（弓没有护手）
+        self.guard_width = 1.2
+        self.guard_depth = 0.25
+        self.guard_thickness = 0.1
+
+        # 握把和剑首
+        self.handle_length = 1.0
+        self.handle_radius = 0.12
+        self.pommel_radius = 0.18
+
+        # 弓：弓臂弯曲深度（握把到弓弦的距离）、弓弦粗细
+        self.bow_curve = 0.5
+        self.string_thickness = 0.02
+
+        # 圆形部件的分段数
+        self.segments = 8
+
+
+def parameters_from_weapon(weapon):
+    """把 CastleDB 武器行映射为 WeaponParameters"""
+    weapon_type = weapon.get('weaponType', 'Melee')
+    profile = WEAPON_TYPE_PROFILES.get(weapon_type)
+    if profile is None:
+        print(f"⚠ {weapon.get('id')}: 未知武器类型 '{weapon_type}'，按 Melee 生成")
+        profile = WEAPON_TYPE_PROFILES["Melee"]
+
+    damage_type = weapon.get('damageType', 'Physical')
+    if damage_type not in DAMAGE_TYPE_PROFILES:
+        print(f"⚠ {weapon.get('id')}: 未知伤害类型 '{damage_type}'，使用 Physical 材质")
+        damage_type = "Physical"
+    damage = DAMAGE_TYPE_PROFILES[damage_type]
+
+    params = WeaponParameters()
+    params.shape = profile["shape"]
+    params.damage_type = damage_type
+
+    length = float(weapon.get('range', 1)) * profile["length_per_range"] + profile["length_base"]
+    params.blade_length = max(profile["min_length"], min(profile["max_length"], length))
+    params.blade_width = profile["blade_width"]
+    params.blade_thickness = profile["blade_thickness"]
+    params.tip_length = min(params.blade_width * 1.2, params.blade_length * 0.3)
+
+    params.guard_width = params.blade_width * 2.4 * damage["guard_scale"]
+    params.handle_length = profile["handle_length"]
+    params.handle_radius = profile["handle_radius"]
+    params.pommel_radius = profile["pommel_radius"]
+    params.bow_curve = params.blade_length * 0.18
+    return params
+
+
+# ----------------------------------------------------------------------
+# 部件几何（顶点列表, 面列表），坐标为武器局部空间
+# ----------------------------------------------------------------------
+
+def box_geometry(center, size):
+    """长方体：8个顶点，6个四边形面"""
+    cx, cy, cz = center
+    hx, hy, hz = size[0] / 2, size[1] / 2, size[2] / 2
+    vertices = [
+        (cx + x, cy + y, cz + z)
+        for z in (-hz, hz) for y in (-hy, hy) for x in (-hx, hx)
+    ]
+    faces = [
+        (0, 2, 3, 1), (4, 5, 7, 6),
+        (0, 1, 5, 4), (2, 6, 7, 3),
+        (0, 4, 6, 2), (1, 3, 7, 5)
+    ]
+    return vertices, faces
+
+
+def blade_geometry(base_z, length, tip_length, width, thickness):
+    """菱形截面的剑刃：宽度沿Y，厚度沿X，最后 tip_length 收成剑尖"""
+    shoulder_z = base_z + length - tip_length
+    section = ((0.0, -width / 2), (thickness / 2, 0.0), (0.0, width / 2), (-thickness / 2, 0.0))
+    vertices = [(x, y, base_z) for x, y in section]
+    vertices += [(x, y, shoulder_z) for x, y in section]
+    vertices.append((0.0, 0.0, base_z + length))
+
+    faces = [tuple(reversed(range(4)))]
+    for index in range(4):
+        next_index = (index + 1) % 4
+        faces.append((index, next_index, 4 + next_index, 4 + index))
+        faces.append((4 + index, 4 + next_index, 8))
+    return vertices, faces
+
+
+def limb_geometry(span, curve, width, thickness, samples=16):
+    """弓臂：在Y/Z平面内弯曲的矩形截面带，握把（原点）处最厚，向两端收窄
+
+    中心线 z = t × span/2，y = -curve × t²（t ∈ [-1, 1]），两端落在弓弦所在的 y = -curve。
+    """
+    half = span / 2
+    vertices = []
+    for sample in range(samples + 1):
+        t = -1.0 + 2.0 * sample / samples
+        z = t * half
+        y = -curve * t * t
+        # 截面沿中心线法线方向展开
+        tangent = Vector((0.0, -2.0 * curve * t, half)).normalized()
+        normal = Vector((0.0, tangent.z, -tangent.y))
+        taper = 1.0 - 0.5 * abs(t)
+        for side_x, side_n in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+            offset = normal * (side_n * thickness * taper / 2)
+            vertices.append((side_x * width * taper / 2, y + offset.y, z + offset.z))
+
+    faces = [tuple(reversed(range(4)))]
+    for sample in range(samples):
+        row = sample * 4
+        for index in range(4):
+            next_index = (index + 1) % 4
+            faces.append((row + index, row + next_index, row + 4 + next_index, row + 4 + index))
+    last_row = samples * 4
+    faces.append(tuple(range(last_row, last_row + 4)))
+    return vertices, faces
+
+
+def offset_geometry(geometry, offset):
+    """平移部件几何"""
+    vertices, faces = geometry
+    ox, oy, oz = offset
+    return [(x + ox, y + oy, z + oz) for x, y, z in vertices], faces
+
+
+def weapon_parts(params):
+    """武器的所有部件 [(顶点, 面, 材质槽)]"""
+    grip = cylinder_geometry(params.segments, params.handle_radius, params.handle_length)
+    parts = [(*grip, GRIP_SLOT)]
+
+    if params.shape == "bow":
+        parts.append((*limb_geometry(params.blade_length, params.bow_curve, params.blade_width, params.blade_thickness), BLADE_SLOT))
+        string = box_geometry(
+            (0.0, -params.bow_curve, 0.0),
+            (params.string_thickness, params.string_thickness, params.blade_length)
+        )
+        parts.append((*string, FITTING_SLOT))
+        return parts
+
+    guard_z = params.handle_length / 2 + params.guard_thickness / 2
+    guard = box_geometry((0.0, 0.0, guard_z), (params.guard_depth, params.guard_width, params.guard_thickness))
+    parts.append((*guard, FITTING_SLOT))
+
+    blade = blade_geometry(
+        params.handle_length / 2 + params.guard_thickness, params.blade_length,
+        params.tip_length, params.blade_width, params.blade_thickness
+    )
+    parts.append((*blade, BLADE_SLOT))
+
+    if params.pommel_radius > 0:
+        pommel = uv_sphere_geometry(params.segments, max(3, params.segments // 2), params.pommel_radius)
+        pommel_z = -params.handle_length / 2 - params.pommel_radius * 0.7
+        parts.append((*offset_geometry(pommel, (0.0, 0.0, pommel_z)), FITTING_SLOT))
+    return parts
+
+
+# ----------------------------------------------------------------------
+# 数据级构建
+# ----------------------------------------------------------------------
+
+def set_bsdf_input(bsdf, names, value):
+    """按名称设置Principled BSDF输入（不同Blender版本输入名不同）"""
+    for name in names:
+        if name in bsdf.inputs:
+            bsdf.inputs[name].default_value = value
+            return True
+    return False
+
+
+def get_weapon_material(name, color, metallic, roughness, emission=0.0):
+    """获取或创建武器材质（重复生成时复用同名材质）"""
+    material = bpy.data.materials.get(name)
+    if material is not None:
+        return material
+
+    material = bpy.data.materials.new(name=name)
+    material.diffuse_color = color
+    material.use_nodes = True
+    bsdf = next((node for node in material.node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+    if bsdf:
+        set_bsdf_input(bsdf, ("Base Color",), color)
+        set_bsdf_input(bsdf, ("Metallic",), metallic)
+        set_bsdf_input(bsdf, ("Roughness",), roughness)
+        if emission > 0:
+            set_bsdf_input(bsdf, ("Emission Color", "Emission"), color)
+            set_bsdf_input(bsdf, ("Emission Strength",), emission)
+    return material
+
+
+def weapon_materials(params):
+    """按材质槽顺序返回武器材质"""
+    damage = DAMAGE_TYPE_PROFILES[params.damage_type]
+    blade = get_weapon_material(
+        f"Weapon_{params.damage_type}_Blade", damage["color"],
+        damage["metallic"], damage["roughness"], damage["emission"]
+    )
+    return [blade, get_weapon_material(*FITTING_MATERIAL), get_weapon_material(*GRIP_MATERIAL)]
+
+
+def build_weapon_mesh(name, params):
+    """在一个bmesh中构建所有部件并写入网格数据（同名网格直接覆盖）"""
+    bm = bmesh.new()
+    for vertices, faces, material_index in weapon_parts(params):
+        bm_verts = [bm.verts.new(co) for co in vertices]
+        for face in faces:
+            bm.faces.new([bm_verts[index] for index in face]).material_index = material_index
+    bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+
+    mesh = bpy.data.meshes.get(name) or bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+
+    mesh.materials.clear()
+    for material in weapon_materials(params):
+        mesh.materials.append(material)
+    mesh.update()
+    return mesh
+
+
+def build_weapon(weapon, collection=None):
+    """按CastleDB武器行生成武器对象（握持点在原点），返回对象"""
+    params = parameters_from_weapon(weapon)
+    name = f"Weapon_{weapon['id']}"
+    mesh = build_weapon_mesh(name, params)
+
+    obj = bpy.data.objects.get(name)
+    if obj is None or obj.type != 'MESH':
+        obj = bpy.data.objects.new(name, mesh)
+    else:
+        obj.data = mesh
+
+    collection = collection or bpy.context.scene.collection
+    if obj.name not in collection.objects:
+        collection.objects.link(obj)
+    obj["weapon_id"] = weapon['id']
+    return obj
+
+
+def get_armory_collection():
+    """武器库集合（不存在时创建并链接到场景）"""
+    collection = bpy.data.collections.get(ARMORY_COLLECTION)
+    if collection is None:
+        collection = bpy.data.collections.new(ARMORY_COLLECTION)
+    if collection.name not in bpy.context.scene.collection.children:
+        bpy.context.scene.collection.children.link(collection)
+    return collection
+
+
+def generate_armory(weapons, spacing=1.5):
+    """生成武器库中的所有武器，沿X轴排开；返回 [(武器行, 对象)]"""
+    start = time.time()
+    collection = get_armory_collection()
+
+    results = []
+    for index, weapon in enumerate(weapons):
+        try:
+            obj = build_weapon(weapon, collection)
+        except Exception as e:
+            print(f"  ├─ ❌ {weapon.get('id')}: {e}")
+            continue
+        obj.location = (index * spacing, 0.0, 0.0)
+        results.append((weapon, obj))
+        print(f"  ├─ ✓ {weapon['id']}: {weapon.get('weaponType')} / {weapon.get('damageType')}, {len(obj.data.polygons)} 面")
+
+    print(f"  └─ 生成 {len(results)}/{len(weapons)} 把武器，耗时 {time.time() - start:.2f} 秒")
+    return results
+
+
+def export_weapon_fbx(weapon, obj, fbx_dir):
+    """单独导出一把武器的FBX（文件名取 prefabPath 的最后一段）"""
+    prefab_name = os.path.basename(weapon.get('prefabPath') or weapon['id'])
+    fbx_file = os.path.join(fbx_dir, f"{prefab_name}.fbx")
+
+    location = obj.location.copy()
+    obj.location = (0.0, 0.0, 0.0)
+    for other in bpy.context.view_layer.objects:
+        other.select_set(other == obj)
+    try:
+        bpy.ops.export_scene.fbx(
+            filepath=fbx_file,
+            use_selection=True,
+            object_types={'MESH'},
+            bake_anim=False
+        )
+    finally:
+        obj.location = location
+    return fbx_file
+
+
+def get_cli_value(flag, default=None):
+    """读取 -- 之后的命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def main():
+    """命令行入口：清空场景，按CastleDB生成整个武器库"""
+    weapon_ids = get_cli_value('--weapons')
+    try:
+        weapons = load_weapons(get_cli_value('--cdb'), weapon_ids.split(',') if weapon_ids else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法读取 CastleDB 武器表: {e}")
+        sys.exit(1)
+
+    if reset_scene is not None:
+        reset_scene(verbose=False)
+
+    print(f"⚔ 生成武器库: {len(weapons)} 把武器")
+    results = generate_armory(weapons, spacing=float(get_cli_value('--spacing', 1.5)))
+
+    fbx_dir = get_cli_value('--fbx-dir')
+    if fbx_dir:
+        os.makedirs(fbx_dir, exist_ok=True)
+        for weapon, obj in results:
+            print(f"✓ 已导出: {export_weapon_fbx(weapon, obj, fbx_dir)}")
+
+    output = get_cli_value('--output')
+    if output:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(output))
+        print(f"✓ 武器库已保存: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+武器图标图集 - 批量渲染 CastleDB 武器图标并打包为一张共享图集
+
+CastleDB 的每种武器都有 iconPath（如 Icons/Weapons/basic_sword），这里生成对应的图标：
+- 场景只设置一次：沿用 create_sword_simple.py 的 setup_camera_and_lighting / set_render_settings，
+  相机改为正交、透明背景、固定像素尺寸
+- 只有一个图标对象，逐个换入 weapon_generator.py 生成的武器网格，按包围盒重新取景后渲染
+- 所有图标按 iconPath 的目录打包为图集（Icons/Weapons/basic_sword → Icons/Weapons.png 中名为 basic_sword 的精灵），
+  并生成 Unity 多精灵 .meta；输出目录为 Resources 时可用 Resources.LoadAll<Sprite>("Icons/Weapons") 按名称取用
+
+使用方法：
+    blender -b -P weapon_icon_atlas.py -- --output D:\\MakeDeadCell\\Assets\\Resources
+    blender -b -P weapon_icon_atlas.py -- --weapons basic_sword,fire_bow --size 64
+"""
+
+import os
+import sys
+import math
+import time
+import uuid
+import shutil
+import tempfile
+
+import bpy
+from mathutils import Vector, Matrix
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from castle_db import load_weapons
+from weapon_generator import build_weapon_mesh, parameters_from_weapon
+import create_sword_simple
+
+ICON_OBJECT_NAME = "WeaponIcon"
+DEFAULT_ICON_DIR = "Icons/Weapons"
+
+
+def get_cli_value(flag, default=None):
+    """读取 -- 之后的命令行参数值"""
+    for i, arg in enumerate(sys.argv):
+        if arg == flag and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith(flag + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def split_icon_path(weapon):
+    """iconPath → (图集路径, 精灵名)；没有 iconPath 时使用 Icons/Weapons/<id>"""
+    icon_path = (weapon.get('iconPath') or f"{DEFAULT_ICON_DIR}/{weapon['id']}").replace('\\', '/').strip('/')
+    atlas_path, _, sprite_name = icon_path.rpartition('/')
+    return atlas_path or DEFAULT_ICON_DIR, sprite_name
+
+
+class WeaponIconRenderer:
+    """一次场景设置，逐个换入武器网格渲染图标"""
+
+    def __init__(self, icon_size=128, margin=0.08):
+        self.icon_size = icon_size
+        self.margin = margin
+        self.camera = None
+        self.camera_base = None
+        self.icon_object = None
+
+    def setup_scene(self):
+        """设置相机、灯光和渲染参数（整个批次只执行一次）"""
+        create_sword_simple.setup_camera_and_lighting()
+        try:
+            create_sword_simple.set_render_settings()
+        except (AttributeError, TypeError) as e:
+            print(f"⚠ 渲染设置失败，使用当前渲染引擎: {e}")
+
+        scene = bpy.context.scene
+        self.camera = scene.camera
+        self.camera.data.type = 'ORTHO'
+        self.camera_base = self.camera.matrix_world.copy()
+
+        scene.render.resolution_x = self.icon_size
+        scene.render.resolution_y = self.icon_size
+        scene.render.resolution_percentage = 100
+        scene.render.film_transparent = True
+        scene.render.image_settings.file_format = 'PNG'
+        scene.render.image_settings.color_mode = 'RGBA'
+
+        mesh = bpy.data.meshes.new(ICON_OBJECT_NAME)
+        self.icon_object = bpy.data.objects.new(ICON_OBJECT_NAME, mesh)
+        scene.collection.objects.link(self.icon_object)
+        print(f"✓ 图标场景设置完成: {self.icon_size}x{self.icon_size} 像素")
+
+    def frame_icon(self):
+        """按当前武器的包围盒平移正交相机并调整缩放，使武器居中填满图标"""
+        bpy.context.view_layer.update()
+        to_camera = self.camera_base.inverted()
+        corners = [to_camera @ (self.icon_object.matrix_world @ Vector(corner)) for corner in self.icon_object.bound_box]
+        min_x, max_x = min(c.x for c in corners), max(c.x for c in corners)
+        min_y, max_y = min(c.y for c in corners), max(c.y for c in corners)
+
+        center = Vector(((min_x + max_x) / 2, (min_y + max_y) / 2, 0.0))
+        self.camera.matrix_world = self.camera_base @ Matrix.Translation(center)
+        self.camera.data.ortho_scale = max(max_x - min_x, max_y - min_y) * (1.0 + 2 * self.margin)
+
+    def render_icon(self, weapon, icon_file):
+        """换入武器网格并渲染一个图标"""
+        previous_mesh = self.icon_object.data
+        mesh = build_weapon_mesh(f"Weapon_{weapon['id']}", parameters_from_weapon(weapon))
+        self.icon_object.data = mesh
+        if previous_mesh.users == 0:
+            bpy.data.meshes.remove(previous_mesh)
+
+        self.frame_icon()
+        bpy.context.scene.render.filepath = icon_file
+        bpy.ops.render.render(write_still=True)
+        return icon_file
+
+    def render_all(self, weapons, icon_dir):
+        """渲染所有武器图标，返回 {图集路径: [(精灵名, 图标文件)]}"""
+        atlases = {}
+        for weapon in weapons:
+            atlas_path, sprite_name = split_icon_path(weapon)
+            icon_file = os.path.join(icon_dir, f"{weapon['id']}.png")
+            try:
+                self.render_icon(weapon, icon_file)
+            except Exception as e:
+                print(f"  ├─ ❌ {weapon.get('id')}: {e}")
+                continue
+            atlases.setdefault(atlas_path, []).append((sprite_name, icon_file))
+            print(f"  ├─ ✓ {weapon['id']} → {atlas_path}/{sprite_name}")
+        return atlases
+
+
+def pack_atlas(sprites, atlas_file, icon_size, padding=2):
+    """把图标按网格排入一张图集，返回精灵矩形 [(精灵名, x, y, 宽, 高)]（Unity坐标，左下角为原点）"""
+    from PIL import Image
+
+    cols = math.ceil(math.sqrt(len(sprites)))
+    rows = math.ceil(len(sprites) / cols)
+    cell = icon_size + padding * 2
+    atlas = Image.new('RGBA', (cols * cell, rows * cell), (0, 0, 0, 0))
+
+    rects = []
+    for index, (sprite_name, icon_file) in enumerate(sprites):
+        col, row = index % cols, index // cols
+        x, y = col * cell + padding, row * cell + padding
+        with Image.open(icon_file) as icon:
+            atlas.paste(icon.convert('RGBA').resize((icon_size, icon_size)), (x, y))
+        # Unity Y轴翻转
+        rects.append((sprite_name, x, atlas.height - y - icon_size, icon_size, icon_size))
+
+    os.makedirs(os.path.dirname(atlas_file), exist_ok=True)
+    atlas.save(atlas_file)
+    atlas.close()
+    return rects
+
+
+def read_existing_meta(meta_file):
+    """读取已有 .meta 的 guid 和每个精灵的 (spriteID, internalID)，文件不存在时返回 (None, {})"""
+    if not os.path.exists(meta_file):
+        return None, {}
+
+    guid = None
+    sprites = {}
+    current = None
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, _, value = line.strip().partition(': ')
+            if key == 'guid' and guid is None:
+                guid = value.strip() or None
+            elif key == '- serializedVersion':
+                current = None
+            elif key == 'name':
+                current = {'name': value.strip()}
+            elif current is not None and key in ('spriteID', 'internalID') and value.strip():
+                current[key] = value.strip()
+                if 'spriteID' in current and 'internalID' in current:
+                    sprites[current['name']] = (current['spriteID'], int(current['internalID']))
+                    current = None
+    return guid, sprites
+
+
+def write_unity_meta(atlas_file, rects, pixels_per_unit=100):
+    """生成Unity多精灵 .meta（精灵名与 iconPath 的最后一段一致）
+
+    已有 .meta 时沿用其 guid 和同名精灵的 spriteID / internalID，重新生成图标不会破坏Unity中的引用。
+    """
+    meta_file = f"{atlas_file}.meta"
+    guid, existing_sprites = read_existing_meta(meta_file)
+    used_internal_ids = {internal_id for _, internal_id in existing_sprites.values()}
+
+    meta_content = f"""fileFormatVersion: 2
+guid: {guid or uuid.uuid4().hex}
+TextureImporter:
+  internalIDToNameTable: []
+  externalObjects: {{}}
+  serializedVersion: 12
+  mipmaps:
+    mipMapMode: 0
+    enableMipMap: 0
+    sRGBTexture: 1
+    linearTexture: 0
+  isReadable: 0
+  textureFormat: 1
+  maxTextureSize: 2048
+  textureSettings:
+    serializedVersion: 2
+    filterMode: 0
+    aniso: 1
+    mipBias: 0
+    wrapU: 1
+    wrapV: 1
+    wrapW: 1
+  nPOTScale: 0
+  lightmap: 0
+  compressionQuality: 50
+  spriteMode: 2
+  spriteExtrude: 1
+  spriteMeshType: 1
+  alignment: 0
+  spritePivot: {{x: 0.5, y: 0.5}}
+  spritePixelsPerUnit: {pixels_per_unit}
+  spriteBorder: {{x: 0, y: 0, z: 0, w: 0}}
+  spriteGenerateFallbackPhysicsShape: 1
+  alphaUsage: 1
+  alphaIsTransparency: 1
+  spriteTessellationDetail: -1
+  textureType: 8
+  textureShape: 1
+  platformSettings:
+  - serializedVersion: 3
+    buildTarget: DefaultTexturePlatform
+    maxTextureSize: 2048
+    resizeAlgorithm: 0
+    textureFormat: -1
+    textureCompression: 1
+    compressionQuality: 50
+    crunchedCompression: 0
+    allowsAlphaSplitting: 0
+    overridden: 0
+  spriteSheet:
+    serializedVersion: 2
+    sprites:"""
+
+    next_internal_id = 21300000
+    for sprite_name, x, y, width, height in rects:
+        if sprite_name in existing_sprites:
+            sprite_id, internal_id = existing_sprites[sprite_name]
+        else:
+            # 新精灵：新的 spriteID，internalID 取未被占用的下一个值
+            while next_internal_id in used_internal_ids:
+                next_internal_id += 2
+            sprite_id, internal_id = uuid.uuid4().hex[:16], next_internal_id
+            used_internal_ids.add(internal_id)
+        meta_content += f"""
+    - serializedVersion: 2
+      name: {sprite_name}
+      rect:
+        serializedVersion: 2
+        x: {x}
+        y: {y}
+        width: {width}
+        height: {height}
+      alignment: 0
+      pivot: {{x: 0.5, y: 0.5}}
+      border: {{x: 0, y: 0, z: 0, w: 0}}
+      outline: []
+      physicsShape: []
+      tessellationDetail: 0
+      bones: []
+      spriteID: {sprite_id}
+      internalID: {internal_id}
+      vertices: []
+      indices:
+      edges: []
+      weights: []"""
+
+    meta_content += """
+    outline: []
+    physicsShape: []
+    bones: []
+    spriteID:
+    internalID: 0
+    vertices: []
+    indices:
+    edges: []
+    weights: []
+    secondaryTextures: []
+    nameFileIdTable: {}
+  spritePackingTag:
+  userData:
+  assetBundleName:
+  assetBundleVariant:
+"""
+
+    with open(meta_file, 'w', encoding='utf-8') as f:
+        f.write(meta_content)
+    return meta_file
+
+
+def build_icon_atlases(weapons, output_dir, icon_size=128, keep_icons=False):
+    """渲染所有武器图标并按 iconPath 目录打包图集，返回生成的图集文件列表"""
+    start = time.time()
+    icon_dir = tempfile.mkdtemp(prefix="weapon_icons_")
+
+    renderer = WeaponIconRenderer(icon_size)
+    renderer.setup_scene()
+    print(f"⚔ 渲染武器图标: {len(weapons)} 个")
+    atlases = renderer.render_all(weapons, icon_dir)
+    render_seconds = time.time() - start
+
+    try:
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        print("❌ 需要Pillow库打包图集（可先运行 character_DeadCellTest.py 自动安装）")
+        print(f"💡 单个图标保留在: {icon_dir}")
+        return []
+
+    atlas_files = []
+    for atlas_path, sprites in atlases.items():
+        atlas_file = os.path.join(output_dir, *atlas_path.split('/')) + ".png"
+        rects = pack_atlas(sprites, atlas_file, icon_size)
+        write_unity_meta(atlas_file, rects)
+        atlas_files.append(atlas_file)
+        print(f"  ├─ 📦 图集: {atlas_file} ({len(rects)} 个精灵)")
+
+    if keep_icons:
+        print(f"  ├─ 单个图标: {icon_dir}")
+    else:
+        shutil.rmtree(icon_dir, ignore_errors=True)
+
+    print(f"  └─ 场景设置 1 次，渲染 {sum(len(s) for s in atlases.values())} 个图标，"
+          f"渲染耗时 {render_seconds:.2f} 秒，总耗时 {time.time() - start:.2f} 秒")
+    return atlas_files
+
+
+def main():
+    """命令行入口：清空场景，渲染所有武器图标并打包图集"""
+    weapon_ids = get_cli_value('--weapons')
+    try:
+        weapons = load_weapons(get_cli_value('--cdb'), weapon_ids.split(',') if weapon_ids else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法读取 CastleDB 武器表: {e}")
+        sys.exit(1)
+
+    output_dir = get_cli_value('--output') or os.getenv('DEADCELLS_ICON_OUTPUT') or os.path.join(SCRIPT_DIR, "..", "Assets", "Resources")
+    create_sword_simple.clear_scene()
+    build_icon_atlases(
+        weapons,
+        os.path.normpath(os.path.abspath(output_dir)),
+        icon_size=int(get_cli_value('--size', 128)),
+        keep_icons='--keep-icons' in sys.argv
+    )
+
+
+if __name__ == "__main__":
+    main()
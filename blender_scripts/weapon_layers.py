@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+武器图层 - 角色身体和武器分开渲染，导出手部挂点数据
+
+把每种武器 × 每个动画都烘焙进角色帧时，渲染量是 N×M。这里改为：
+- 角色身体按原流程渲染动画帧（不带武器）
+- 渲染每一帧时顺便记录挂点骨骼（默认右手）在画面中的像素位置和方向（与角色帧使用同一个已评估姿态，不额外采样）
+- 每种武器（CastleDB weapons 表）单独渲染一张精灵，记录握持点像素坐标和像素/单位
+Unity 在运行时把武器精灵按挂点数据放到手上，渲染量变为 N+M。
+
+输出（位于 output_path/Weapons/）：
+    <武器id>.png                 武器精灵（剑刃/弓臂朝上，握持点见 weapons.json）
+    weapons.json                 武器列表：精灵路径、握持点像素、像素/单位
+    Attachments/<动画名>.json    每帧挂点：位置（像素，左下角为原点）、旋转（度，逆时针，0表示朝上）、缩放
+
+由 character_DeadCellTest.py 在 config.json 的 weapon_layers.enabled 为 true 时使用。
+"""
+
+import os
+import json
+import math
+
+import bpy
+from mathutils import Vector
+from bpy_extras.object_utils import world_to_camera_view
+
+from castle_db import load_weapons
+
+# 输出目录名（精灵图集生成时排除）
+WEAPON_LAYER_DIR = "Weapons"
+
+# 自动查找挂点骨骼时依次尝试的名称
+HAND_BONE_CANDIDATES = (
+    'Right_Hand', 'RightHand', 'mixamorig:RightHand', 'Hand_R', 'hand_r', 'hand.R', 'R_Hand', 'Hand.R'
+)
+
+
+def find_attach_bone(armature_obj, preferred=None):
+    """挂点骨骼：配置的名称 > 常见右手骨骼名 > 名称含 hand 且带右侧标记的骨骼"""
+    bones = armature_obj.pose.bones
+    if preferred and preferred in bones:
+        return bones[preferred]
+    for name in HAND_BONE_CANDIDATES:
+        if name in bones:
+            return bones[name]
+    for pose_bone in bones:
+        lower = pose_bone.name.lower()
+        if 'hand' in lower and ('right' in lower or lower.endswith(('_r', '.r'))):
+            return pose_bone
+    return None
+
+
+def build_weapon_mesh(weapon, weapon_scale=0.25):
+    """按武器数据创建网格，返回 (对象, 握持点世界坐标)
+
+    使用 weapon_generator.py 的数据级构建；握持点在对象原点。
+    """
+    from weapon_generator import build_weapon
+
+    weapon_obj = build_weapon(weapon)
+    weapon_obj.location = (0.0, 0.0, 0.0)
+    weapon_obj.scale = (weapon_scale, weapon_scale, weapon_scale)
+    return weapon_obj, Vector((0.0, 0.0, 0.0))
+
+
+class WeaponLayerRenderer:
+    """记录挂点数据并渲染武器精灵"""
+
+    def __init__(self, pipeline, config):
+        self.pipeline = pipeline
+        self.config = config
+        self.output_dir = os.path.join(pipeline.output_path, WEAPON_LAYER_DIR)
+        self.attach_bone_name = config.get('attach_bone') or None
+        self.frames = []
+        self.attach_bone = None
+
+    def pixels_per_unit(self):
+        """当前正交相机下每个场景单位对应的像素数"""
+        scene = bpy.context.scene
+        camera = scene.camera
+        resolution = max(scene.render.resolution_x, scene.render.resolution_y) * scene.render.resolution_percentage / 100.0
+        return resolution / camera.data.ortho_scale
+
+    def project(self, world_point):
+        """世界坐标 → 像素坐标（左下角为原点）"""
+        scene = bpy.context.scene
+        scale = scene.render.resolution_percentage / 100.0
+        projected = world_to_camera_view(scene, scene.camera, world_point)
+        return projected.x * scene.render.resolution_x * scale, projected.y * scene.render.resolution_y * scale
+
+    def begin_animation(self):
+        """开始记录一个动画的挂点数据"""
+        self.frames = []
+        armature = self.pipeline.armature
+        self.attach_bone = find_attach_bone(armature, self.attach_bone_name) if armature else None
+        if self.attach_bone is None:
+            print("  ├─ ⚠ 未找到挂点骨骼（可通过 weapon_layers.attach_bone 指定），不导出挂点数据")
+
+    def record_frame(self, frame):
+        """记录当前帧（已评估姿态）的挂点"""
+        if self.attach_bone is None or bpy.context.scene.camera is None:
+            return
+        world_matrix = self.pipeline.armature.matrix_world
+        head_x, head_y = self.project(world_matrix @ self.attach_bone.head)
+        tail_x, tail_y = self.project(world_matrix @ self.attach_bone.tail)
+
+        # 武器精灵朝上（0度），旋转到骨骼在画面中的方向
+        rotation = math.degrees(math.atan2(tail_y - head_y, tail_x - head_x)) - 90.0
+        self.frames.append({
+            "frame": frame,
+            "position": [round(head_x, 2), round(head_y, 2)],
+            "rotation": round(rotation, 2)
+        })
+
+    def write_animation(self, animation_name, safe_name):
+        """写出一个动画的挂点数据"""
+        if not self.frames:
+            return None
+        attachments_dir = os.path.join(self.output_dir, "Attachments")
+        os.makedirs(attachments_dir, exist_ok=True)
+
+        scene = bpy.context.scene
+        data = {
+            "animation": animation_name,
+            "bone": self.attach_bone.name,
+            "resolution": [scene.render.resolution_x, scene.render.resolution_y],
+            # 每个动画的相机可能不同，Unity按 动画像素/单位 ÷ 武器像素/单位 缩放武器精灵
+            "pixels_per_unit": round(self.pixels_per_unit(), 4),
+            "frames": self.frames
+        }
+        path = os.path.join(attachments_dir, f"{safe_name}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"  ├─ ✓ 挂点数据: {path} ({len(self.frames)} 帧)")
+        return path
+
+    def render_weapon_sprites(self):
+        """每种武器渲染一张精灵，写出 weapons.json"""
+        pipeline = self.pipeline
+        scene = bpy.context.scene
+        if scene.camera is None:
+            print("⚠ 没有相机，跳过武器图层渲染")
+            return []
+
+        try:
+            weapons = load_weapons(self.config.get('castle_db'), self.config.get('weapon_ids'))
+        except (OSError, ValueError) as e:
+            print(f"⚠ 无法读取 CastleDB 武器表: {e}")
+            return []
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"\n⚔ 渲染武器图层: {len(weapons)} 种武器")
+
+        # 武器单独渲染：隐藏角色网格，恢复整幅画布
+        hidden = [obj for obj in (pipeline.original_mesh, pipeline.render_mesh) if obj and not obj.hide_render]
+        for obj in hidden:
+            obj.hide_render = True
+        pipeline.clear_render_border()
+        material = pipeline.create_dead_cells_toon_material("DeadCells_WeaponMaterial", "metal")
+
+        results = []
+        try:
+            for weapon in weapons:
+                try:
+                    result = self.render_weapon(weapon, material)
+                except Exception as e:
+                    print(f"  ├─ ❌ {weapon.get('id')}: {e}")
+                    continue
+                if result:
+                    results.append(result)
+        finally:
+            for obj in hidden:
+                obj.hide_render = False
+
+        manifest_path = os.path.join(self.output_dir, "weapons.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({"weapons": results}, f, indent=2, ensure_ascii=False)
+        print(f"  └─ 武器清单: {manifest_path}")
+        return results
+
+    def render_weapon(self, weapon, material):
+        """渲染单个武器精灵（放在相机中心，使用当前正交缩放）"""
+        pipeline = self.pipeline
+        scene = bpy.context.scene
+        camera = scene.camera
+
+        weapon_obj, grip = build_weapon_mesh(weapon, float(self.config.get('weapon_scale', 0.25)))
+        mesh_data = weapon_obj.data
+
+        # 渲染或后处理失败时也要删除武器，否则它会出现在之后每一张武器精灵中
+        try:
+            for index in range(len(mesh_data.materials)):
+                mesh_data.materials[index] = material
+            if not mesh_data.materials:
+                mesh_data.materials.append(material)
+
+            # 武器包围盒中心移到相机视线上（侧视相机沿X轴观察，画面为Y/Z）
+            bpy.context.view_layer.update()
+            corners = [weapon_obj.matrix_world @ Vector(corner) for corner in weapon_obj.bound_box]
+            center = sum(corners, Vector()) / len(corners)
+            offset = Vector((0.0, camera.location.y - center.y, camera.location.z - center.z))
+            weapon_obj.location += offset
+            grip = grip + offset
+            bpy.context.view_layer.update()
+
+            sprite_path = os.path.join(self.output_dir, f"{pipeline.sanitize_filename(weapon['id'])}.png")
+            scene.render.filepath = sprite_path
+            bpy.ops.render.render(write_still=True)
+            if pipeline.post_process_enabled:
+                pipeline.post_process_frame(sprite_path)
+
+            grip_x, grip_y = self.project(grip)
+            result = {
+                "id": weapon['id'],
+                "name": weapon.get('name', weapon['id']),
+                "weaponType": weapon.get('weaponType'),
+                "sprite": os.path.relpath(sprite_path, self.output_dir),
+                "grip": [round(grip_x, 2), round(grip_y, 2)],
+                "pixels_per_unit": round(self.pixels_per_unit(), 4)
+            }
+        finally:
+            bpy.data.objects.remove(weapon_obj, do_unlink=True)
+            bpy.data.meshes.remove(mesh_data)
+
+        print(f"  ├─ ✓ {weapon['id']}: {sprite_path}")
+        return result